@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'HydroponicSystem_authentication',
     'corsheaders',
     'HydroponicSystem_systems',
+    'HydroponicSystem_jobs',
 ]
 
 REST_FRAMEWORK = {
@@ -51,10 +52,17 @@ REST_FRAMEWORK = {
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'HydroponicSystem_authentication.authentication.JWTAuthentication',
+        'HydroponicSystem_systems.authentication.DeviceKeyAuthentication',
     ),
 
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
+        'HydroponicSystem_systems.authentication.DeviceKeyScope',
+    ),
+
+    'DEFAULT_RENDERER_CLASSES': (
+        'HydroponicSystem_systems.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -150,3 +158,62 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Caches
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    # In-process LRU by default. Entries are versioned by database change markers, so each
+    # process may keep its own; a shared backend (e.g. redis://redis:6379/1) only lets several
+    # worker processes share hits.
+    'measurements': env.cache('MEASUREMENT_CACHE_URL', default='locmemcache://measurements?max_entries=5000&timeout=300'),
+    # Cached listing responses; timeout is the TTL and max_entries the size limit.
+    'responses': env.cache('RESPONSE_CACHE_URL', default='locmemcache://responses?max_entries=1000&timeout=60'),
+    # Authenticated device keys; timeout bounds how long a revoked key stays usable in other
+    # processes unless this is a shared backend.
+    'device_keys': env.cache('DEVICE_KEY_CACHE_URL', default='locmemcache://device-keys?max_entries=1024&timeout=60'),
+}
+
+
+# Measurement ingestion
+
+MEASUREMENT_CONFIG = {
+    'BULK_MAX_ITEMS': env.int('MEASUREMENT_BULK_MAX_ITEMS', default=1000),
+    'FLEET_MAX_ITEMS': env.int('MEASUREMENT_FLEET_MAX_ITEMS', default=5000),
+    'UPLOAD_CHUNK_SIZE': env.int('MEASUREMENT_UPLOAD_CHUNK_SIZE', default=1000),
+    'UPLOAD_MAX_REPORTED_ERRORS': env.int('MEASUREMENT_UPLOAD_MAX_REPORTED_ERRORS', default=100),
+    'WRITE_BEHIND': env.bool('MEASUREMENT_WRITE_BEHIND', default=False),
+    'WRITE_BEHIND_MAX_SIZE': env.int('MEASUREMENT_WRITE_BEHIND_MAX_SIZE', default=10000),
+    'WRITE_BEHIND_BATCH_SIZE': env.int('MEASUREMENT_WRITE_BEHIND_BATCH_SIZE', default=500),
+    'WRITE_BEHIND_FLUSH_INTERVAL': env.float('MEASUREMENT_WRITE_BEHIND_FLUSH_INTERVAL', default=1.0),
+    'AGGREGATE_TARGET_POINTS': env.int('MEASUREMENT_AGGREGATE_TARGET_POINTS', default=500),
+    'AGGREGATE_MAX_BUCKETS': env.int('MEASUREMENT_AGGREGATE_MAX_BUCKETS', default=5000),
+    'DOWNSAMPLE_MAX_POINTS': env.int('MEASUREMENT_DOWNSAMPLE_MAX_POINTS', default=5000),
+    'DOWNSAMPLE_CHUNK_SIZE': env.int('MEASUREMENT_DOWNSAMPLE_CHUNK_SIZE', default=10000),
+    'STATISTICS_MAX_ROWS': env.int('MEASUREMENT_STATISTICS_MAX_ROWS', default=500000),
+    'CACHE_ALIAS': env.str('MEASUREMENT_CACHE_ALIAS', default='measurements'),
+    'LATEST_COUNT': env.int('MEASUREMENT_LATEST_COUNT', default=10),
+    'EXPORT_CHUNK_SIZE': env.int('MEASUREMENT_EXPORT_CHUNK_SIZE', default=2000),
+    'EXPORT_ROW_GROUP_SIZE': env.int('MEASUREMENT_EXPORT_ROW_GROUP_SIZE', default=100000),
+    'PARTITION_MONTHS_AHEAD': env.int('MEASUREMENT_PARTITION_MONTHS_AHEAD', default=3),
+    'RAW_RETENTION_MONTHS': env.int('MEASUREMENT_RAW_RETENTION_MONTHS', default=0),
+    'RAW_RETENTION_DAYS': env.int('MEASUREMENT_RAW_RETENTION_DAYS', default=0),
+    'COMPACTION_BATCH_SIZE': env.int('MEASUREMENT_COMPACTION_BATCH_SIZE', default=5000),
+    'PURGE_BATCH_SIZE': env.int('MEASUREMENT_PURGE_BATCH_SIZE', default=5000),
+    'PURGE_IN_BACKGROUND': env.bool('MEASUREMENT_PURGE_IN_BACKGROUND', default=True),
+    'RESPONSE_CACHE': env.bool('MEASUREMENT_RESPONSE_CACHE', default=True),
+    'RESPONSE_CACHE_ALIAS': env.str('MEASUREMENT_RESPONSE_CACHE_ALIAS', default='responses'),
+}
+
+JOB_CONFIG = {
+    'CONCURRENCY': env.int('JOB_CONCURRENCY', default=2),
+    'POLL_INTERVAL': env.float('JOB_POLL_INTERVAL', default=1.0),
+    'MAX_ATTEMPTS': env.int('JOB_MAX_ATTEMPTS', default=3),
+    'RETRY_DELAY_SECONDS': env.float('JOB_RETRY_DELAY_SECONDS', default=10.0),
+    'LEASE_SECONDS': env.int('JOB_LEASE_SECONDS', default=300),
+}
+
+DEVICE_KEY_CONFIG = {
+    'CACHE_ALIAS': 'device_keys',
+}
@@ -22,6 +22,7 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, Sp
 from HydroponicSystem_authentication import urls as authentication_urls
 from HydroponicSystem_systems.routers import router as systems_routers
 from HydroponicSystem_systems import urls as systems_urls
+from HydroponicSystem_jobs import urls as jobs_urls
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -31,4 +32,5 @@ urlpatterns = [
     path('', include( authentication_urls)),
     path('', include( systems_routers.urls)),
     path('', include( systems_urls)),
+    path('', include( jobs_urls)),
 ]
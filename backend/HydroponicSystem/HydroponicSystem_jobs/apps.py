@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class HydroponicsystemJobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'HydroponicSystem_jobs'
+
+    def ready(self):
+        # Job handlers live in the tasks module of each app.
+        autodiscover_modules('tasks')
@@ -0,0 +1,122 @@
+from rest_framework import serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import PageNumberPagination
+from .models import Job
+from .serializers import JobSerializer, StaffJobSerializer
+from drf_spectacular.utils import (
+    extend_schema, OpenApiExample, OpenApiParameter, inline_serializer, OpenApiResponse
+)
+
+error_response_serializer = inline_serializer(
+    name="ErrorResponse",
+    fields={
+        "detail": serializers.CharField()
+    }
+)
+
+job_example = {
+    "id": 42,
+    "kind": "purge_system",
+    "status": "running",
+    "payload": {"system_id": 7},
+    "attempts": 1,
+    "max_attempts": 3,
+    "progress_done": 150000,
+    "progress_total": 2400000,
+    "result": None,
+    "error": "",
+    "created_at": "2025-02-17T11:56:38.938336Z",
+    "started_at": "2025-02-17T11:56:39.102311Z",
+    "finished_at": None,
+}
+
+
+# Your own jobs; staff see every job.
+def visible_jobs(request):
+    jobs = Job.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(owner=request.user)
+    return jobs
+
+
+# Staff also see the traceback of a failed attempt.
+def job_serializer(request):
+    return StaffJobSerializer if request.user.is_staff else JobSerializer
+
+
+class JobListAPIView(APIView):
+    pagination = PageNumberPagination
+
+    @extend_schema(
+        tags=["Jobs"],
+        summary="List background jobs",
+        description=(
+            "Background jobs started on your behalf (e.g. purging a deleted system), newest first, "
+            "with their progress. `progress_total` is empty while the size of the work is unknown. "
+            "`error` names the exception of a failed attempt; staff also get its `traceback`."
+        ),
+        parameters=[
+            OpenApiParameter(name="status", type=str, location=OpenApiParameter.QUERY, enum=Job.Status.values),
+            OpenApiParameter(name="kind", type=str, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="page", type=int, location=OpenApiParameter.QUERY),
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="Paginated list of jobs",
+                response=JobSerializer(many=True),
+                examples=[
+                    OpenApiExample(
+                        name="Success",
+                        value={"count": 1, "next": None, "previous": None, "results": [job_example]},
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Invalid status", response=error_response_serializer),
+        }
+    )
+    def get(self, request):
+        jobs = visible_jobs(request).order_by("-created_at", "-id")
+
+        status_filter = request.query_params.get("status")
+        if status_filter:
+            if status_filter not in Job.Status.values:
+                raise ParseError(f"Invalid value for 'status'. Use one of: {', '.join(Job.Status.values)}.")
+            jobs = jobs.filter(status=status_filter)
+        kind = request.query_params.get("kind")
+        if kind:
+            jobs = jobs.filter(kind=kind)
+
+        paginator = self.pagination()
+        page = paginator.paginate_queryset(jobs, request)
+        return paginator.get_paginated_response(job_serializer(request)(page, many=True).data)
+
+
+class JobAPIView(APIView):
+
+    @extend_schema(
+        tags=["Jobs"],
+        summary="Get a background job",
+        parameters=[
+            OpenApiParameter(name="job_id", location=OpenApiParameter.PATH, required=True, type=int)
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="The job and its progress",
+                response=JobSerializer,
+                examples=[OpenApiExample(name="Running", value=job_example)]
+            ),
+            404: OpenApiResponse(
+                description="Job not found",
+                response=error_response_serializer,
+                examples=[OpenApiExample(name="Not found", value={"detail": "Job not found."}, status_codes=["404"])]
+            ),
+        }
+    )
+    def get(self, request, job_id):
+        try:
+            job = visible_jobs(request).get(id=job_id)
+        except Job.DoesNotExist:
+            raise NotFound("Job not found.")
+        return Response(job_serializer(request)(job).data)
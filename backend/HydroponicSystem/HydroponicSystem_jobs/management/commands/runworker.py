@@ -0,0 +1,61 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from HydroponicSystem_jobs.queue import claim_job, job_config, run_job
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the job table until stopped (SIGINT/SIGTERM finishes the running jobs first)."
+
+    def add_arguments(self, parser):
+        config = job_config()
+        parser.add_argument("--concurrency", type=int, default=config.get('CONCURRENCY', 2), help="Jobs run at the same time, one thread each (default: JOB_CONCURRENCY).")
+        parser.add_argument("--poll-interval", type=float, default=config.get('POLL_INTERVAL', 1.0), help="Seconds to wait before looking again when no job is due (default: JOB_POLL_INTERVAL).")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be positive.")
+
+        self.stopping = threading.Event()
+        self.finished = 0
+        self.lock = threading.Lock()
+        handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                handlers[signum] = signal.signal(signum, lambda *_: self.stopping.set())
+
+        workers = [
+            threading.Thread(target=self.work, args=(options["poll_interval"], options["burst"]), name=f"job-worker-{number}")
+            for number in range(options["concurrency"])
+        ]
+        self.stdout.write(f"Running jobs with {len(workers)} workers.")
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped after {self.finished} jobs."))
+
+    def work(self, poll_interval, burst):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if burst:
+                        return
+                    self.stopping.wait(poll_interval)
+                    continue
+                run_job(job)
+                with self.lock:
+                    self.finished += 1
+                self.stdout.write(f"Job {job.id} ({job.kind}) {job.status}.")
+        finally:
+            connection.close()
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from HydroponicSystem_authentication.models import User
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = 'queued'
+        RUNNING = 'running'
+        SUCCEEDED = 'succeeded'
+        FAILED = 'failed'
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, blank=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True, related_name='jobs')
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    # A running job whose lease has run out is taken to have lost its worker and is claimed again.
+    locked_until = models.DateTimeField(blank=True, null=True)
+    progress_done = models.BigIntegerField(default=0)
+    progress_total = models.BigIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    # The traceback of the last failure; only staff see it, owners get the one-line error.
+    traceback = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Only queued and running jobs are polled, however long the history of finished ones.
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=Q(status__in=['queued', 'running']),
+                name='job_pending_idx',
+            ),
+        ]
+
+    # Called by handlers as they go; also renews the lease, so a long job is not taken over.
+    def report_progress(self, done, total=None):
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        self.locked_until = timezone.now() + timedelta(seconds=getattr(settings, 'JOB_CONFIG', {}).get('LEASE_SECONDS', 300))
+        Job.objects.filter(id=self.id).update(
+            progress_done=self.progress_done, progress_total=self.progress_total, locked_until=self.locked_until
+        )
@@ -0,0 +1,113 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Jobs are rows of the Job table; workers (manage.py runworker) claim them with
+# SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers share the queue without a broker
+# and without waiting on each other. A job enqueued inside a transaction becomes visible to
+# workers only when that transaction commits.
+
+HANDLERS = {}
+
+
+def job_config():
+    return getattr(settings, 'JOB_CONFIG', {})
+
+
+def task(kind):
+    """Register the decorated function as the handler of jobs of this kind. It is called with
+    the job and the payload as keyword arguments; its return value is stored as the result."""
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def enqueue(kind, payload=None, owner=None, max_attempts=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler is registered for jobs of kind '{kind}'.")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        owner=owner,
+        max_attempts=max_attempts or job_config().get('MAX_ATTEMPTS', 3),
+    )
+
+
+def _lease_end(now):
+    return now + timedelta(seconds=job_config().get('LEASE_SECONDS', 300))
+
+
+# Takes the next due job, or a running one whose worker stopped renewing its lease, and marks
+# it running. Returns None when nothing is due.
+def claim_job():
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(Q(status=Job.Status.QUEUED, run_after__lte=now) | Q(status=Job.Status.RUNNING, locked_until__lt=now))
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == Job.Status.RUNNING and job.attempts >= job.max_attempts:
+                _finish(job, Job.Status.FAILED, error="The worker stopped before the job finished.", failure="")
+                continue
+
+            job.status = Job.Status.RUNNING
+            job.attempts += 1
+            job.started_at = now
+            job.locked_until = _lease_end(now)
+            job.save(update_fields=['status', 'attempts', 'started_at', 'locked_until'])
+            return job
+
+
+def _finish(job, status, result=None, error="", failure=None):
+    job.status = status
+    job.result = result
+    job.error = error
+    if failure is not None:
+        job.traceback = failure
+    job.finished_at = timezone.now()
+    job.locked_until = None
+    job.save(update_fields=['status', 'result', 'error', 'traceback', 'finished_at', 'locked_until'])
+
+
+# Runs a claimed job. A failed attempt is retried after RETRY_DELAY_SECONDS, doubled on every
+# further attempt, until the job has used max_attempts.
+def run_job(job):
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        _finish(job, Job.Status.FAILED, error=f"No handler is registered for jobs of kind '{job.kind}'.", failure="")
+        return job
+
+    try:
+        result = handler(job, **job.payload)
+    except Exception as exc:
+        # The traceback goes to the log and to staff; the error owners see names only the exception.
+        logger.exception("Job %s (%s) failed on attempt %d.", job.id, job.kind, job.attempts)
+        error = f"{type(exc).__name__}: {exc}"
+        failure = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            _finish(job, Job.Status.FAILED, error=error, failure=failure)
+        else:
+            job.status = Job.Status.QUEUED
+            job.error = error
+            job.traceback = failure
+            job.locked_until = None
+            job.run_after = timezone.now() + timedelta(seconds=job_config().get('RETRY_DELAY_SECONDS', 10) * 2 ** (job.attempts - 1))
+            job.save(update_fields=['status', 'error', 'traceback', 'locked_until', 'run_after'])
+    else:
+        _finish(job, Job.Status.SUCCEEDED, result=result)
+    return job
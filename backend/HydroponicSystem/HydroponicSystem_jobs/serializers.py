@@ -0,0 +1,16 @@
+from rest_framework.serializers import ModelSerializer
+from .models import Job
+
+class JobSerializer(ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'payload', 'attempts', 'max_attempts', 'progress_done', 'progress_total',
+            'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+class StaffJobSerializer(JobSerializer):
+    class Meta(JobSerializer.Meta):
+        fields = JobSerializer.Meta.fields + ['traceback']
+        read_only_fields = fields
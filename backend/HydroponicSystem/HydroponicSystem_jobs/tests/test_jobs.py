@@ -0,0 +1,153 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import threading
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from HydroponicSystem_authentication.models import User
+from ..models import Job
+from ..queue import claim_job, enqueue, run_job, task
+
+calls = []
+
+@task("test.record")
+def record(job, value):
+    job.report_progress(1, 2)
+    calls.append(value)
+    return {"value": value}
+
+@task("test.fail")
+def fail(job):
+    raise RuntimeError("sensor offline")
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="otheruser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+
+@pytest.mark.django_db
+def test_claimed_job_runs_and_reports_progress(user1):
+    job = enqueue("test.record", {"value": 7}, owner=user1)
+
+    claimed = claim_job()
+    assert claimed.id == job.id
+    assert (claimed.status, claimed.attempts) == (Job.Status.RUNNING, 1)
+    assert claim_job() is None
+
+    run_job(claimed)
+    job.refresh_from_db()
+    assert job.status == Job.Status.SUCCEEDED
+    assert job.result == {"value": 7}
+    assert (job.progress_done, job.progress_total) == (1, 2)
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_with_backoff_then_fails(settings):
+    settings.JOB_CONFIG = {**settings.JOB_CONFIG, 'RETRY_DELAY_SECONDS': 0}
+    job = enqueue("test.fail", max_attempts=2)
+
+    run_job(claim_job())
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED
+    assert job.error == "RuntimeError: sensor offline"
+    assert "Traceback" in job.traceback
+
+    run_job(claim_job())
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (Job.Status.FAILED, 2)
+    assert claim_job() is None
+
+@pytest.mark.django_db
+def test_job_with_expired_lease_is_claimed_again():
+    job = enqueue("test.record", {"value": 1})
+    claim_job()
+    Job.objects.filter(id=job.id).update(locked_until=timezone.now())
+
+    claimed = claim_job()
+    assert (claimed.id, claimed.attempts) == (job.id, 2)
+
+    with pytest.raises(ValueError):
+        enqueue("test.unknown")
+
+@pytest.mark.django_db(transaction=True)
+def test_workers_skip_locked_jobs():
+    first = enqueue("test.record", {"value": 1})
+    second = enqueue("test.record", {"value": 2})
+    claimed = {}
+
+    def claim_elsewhere():
+        claimed["job"] = claim_job()
+        connection.close()
+
+    with transaction.atomic():
+        Job.objects.select_for_update().get(id=first.id)
+        worker = threading.Thread(target=claim_elsewhere)
+        worker.start()
+        worker.join(10)
+
+    assert claimed["job"].id == second.id
+
+@pytest.mark.django_db(transaction=True)
+def test_runworker_burst_drains_the_queue():
+    calls.clear()
+    for value in range(5):
+        enqueue("test.record", {"value": value})
+
+    output = io.StringIO()
+    call_command("runworker", "--burst", "--concurrency", "3", stdout=output)
+
+    assert sorted(calls) == list(range(5))
+    assert not Job.objects.exclude(status=Job.Status.SUCCEEDED).exists()
+    assert "Worker stopped after 5 jobs." in output.getvalue()
+
+@pytest.mark.django_db
+def test_jobs_are_visible_to_their_owner_only(api_client, user1, user2):
+    job = enqueue("test.record", {"value": 1}, owner=user1)
+    enqueue("test.fail", owner=user2)
+
+    api_client.force_authenticate(user=user1)
+    listing = api_client.get(reverse("job-list"))
+    assert [item["id"] for item in listing.data["results"]] == [job.id]
+    assert api_client.get(reverse("job-detail", args=[job.id])).data["status"] == "queued"
+    assert api_client.get(reverse("job-list"), {"status": "done"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    api_client.force_authenticate(user=user2)
+    assert api_client.get(reverse("job-detail", args=[job.id])).status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_only_staff_see_failure_tracebacks(api_client, user1, user2, settings):
+    settings.JOB_CONFIG = {**settings.JOB_CONFIG, 'RETRY_DELAY_SECONDS': 0}
+    job = enqueue("test.fail", owner=user1, max_attempts=1)
+    run_job(claim_job())
+
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("job-detail", args=[job.id]))
+    assert response.data["error"] == "RuntimeError: sensor offline"
+    assert "traceback" not in response.data
+
+    user2.is_staff = True
+    user2.save()
+    api_client.force_authenticate(user=user2)
+    response = api_client.get(reverse("job-detail", args=[job.id]))
+    assert "Traceback" in response.data["traceback"]
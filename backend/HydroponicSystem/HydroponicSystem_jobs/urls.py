@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .job_view import JobAPIView, JobListAPIView
+
+urlpatterns = [
+    path('jobs/', JobListAPIView.as_view(), name='job-list'),
+    path('jobs/<int:job_id>/', JobAPIView.as_view(), name='job-detail'),
+]
@@ -0,0 +1,145 @@
+from rest_framework import serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from .models import HourlyRollup, HydroponicSystem, Measurement
+from .aggregation import BUCKETS, aggregate_measurements, resolve_bucket
+from .filters import has_value_filters, measurement_filters, rollup_filters
+from .rollups import ROLLUPS, aggregate_rollups
+from .retention import check_value_filters, reaches_compacted
+from .columnar import COLUMNAR_RENDERER_CLASSES, bucket_columns, is_columnar
+from drf_spectacular.utils import (
+    extend_schema, OpenApiExample, OpenApiParameter, inline_serializer, OpenApiResponse
+)
+
+error_response_serializer = inline_serializer(
+    name="ErrorResponse",
+    fields={
+        "detail": serializers.CharField()
+    }
+)
+
+metric_summary_serializer = inline_serializer(
+    name="MetricSummary",
+    fields={
+        "min": serializers.FloatField(),
+        "max": serializers.FloatField(),
+        "avg": serializers.FloatField(),
+    }
+)
+
+
+class MeasurementAggregateAPIView(APIView):
+    renderer_classes = COLUMNAR_RENDERER_CLASSES
+
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Aggregate measurements of a hydroponic system into time buckets",
+        description=(
+            "Returns min, max, average and count of pH, temperature and TDS per time bucket for a "
+            "system you own, computed in the database. Buckets are aligned to UTC. `bucket=auto` "
+            "picks the smallest width that keeps the series to a few hundred points. Accepts the "
+            "same filters as the measurement listing. Hourly and daily buckets are read from "
+            "precomputed rollups unless a pH, temperature or TDS filter is given; like raw readings "
+            "they include the whole `timestamp_before` day. Ranges reaching before the system's "
+            "`raw_compacted_before` are served from the hourly rollups in buckets of an hour or more, "
+            "and reject value filters. `format=columnar` returns `results` as parallel arrays."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int),
+            OpenApiParameter(name="bucket", type=str, location=OpenApiParameter.QUERY, enum=[*BUCKETS, "auto"], description="Bucket width (default: auto)"),
+            OpenApiParameter(name="ph_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="ph_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_min", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_max", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="timestamp_after", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
+            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD, the whole day is included"),
+            OpenApiParameter(name="format", type=str, location=OpenApiParameter.QUERY, enum=["json", "columnar"], description="Response layout (default: json)"),
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="Aggregated measurements",
+                response=inline_serializer(
+                    name="MeasurementAggregateResponse",
+                    fields={
+                        "bucket": serializers.CharField(),
+                        "results": inline_serializer(
+                            name="MeasurementBucket",
+                            fields={
+                                "bucket": serializers.DateTimeField(),
+                                "count": serializers.IntegerField(),
+                                "ph": metric_summary_serializer,
+                                "temperature": metric_summary_serializer,
+                                "tds": metric_summary_serializer,
+                            },
+                            many=True,
+                        ),
+                    }
+                ),
+                examples=[
+                    OpenApiExample(
+                        name="Success",
+                        value={
+                            "bucket": "1h",
+                            "results": [
+                                {
+                                    "bucket": "2025-02-17T12:00:00Z",
+                                    "count": 360,
+                                    "ph": {"min": 6.1, "max": 6.9, "avg": 6.47},
+                                    "temperature": {"min": 21.5, "max": 23.0, "avg": 22.2},
+                                    "tds": {"min": 780, "max": 910, "avg": 842.5}
+                                }
+                            ]
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Bad request (e.g. invalid bucket or timestamp)",
+                response=error_response_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Invalid Bucket",
+                        value={"detail": "Invalid value for 'bucket'. Use one of: 1m, 5m, 1h, 1d, auto."},
+                        status_codes=["400"]
+                    ),
+                    OpenApiExample(
+                        name="Value Filter On Compacted Range",
+                        value={"detail": "Value filters cannot be applied before 2024-05-03 14:00 UTC, where only hourly rollups are kept. Set 'timestamp_after' to a later date."},
+                        status_codes=["400"]
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Permission denied",
+                response=error_response_serializer,
+            )
+        }
+    )
+    def get(self, request, system_id):
+        try:
+            system = HydroponicSystem.objects.get(id=system_id, owner=request.user)
+        except HydroponicSystem.DoesNotExist:
+            raise PermissionDenied("You do not have permission to this system")
+
+        measurements = Measurement.objects.filter(measurement_filters(system, request.query_params))
+        check_value_filters(system, request.query_params)
+        value_filters = has_value_filters(request.query_params)
+
+        if reaches_compacted(system, request.query_params):
+            hourly = HourlyRollup.objects.filter(rollup_filters(system, request.query_params))
+            bucket = resolve_bucket(request.query_params.get("bucket", "auto"), hourly, field="bucket", smallest="1h")
+        else:
+            bucket = resolve_bucket(request.query_params.get("bucket", "auto"), measurements)
+
+        if bucket in ROLLUPS and not value_filters:
+            results = aggregate_rollups(bucket, rollup_filters(system, request.query_params))
+        else:
+            results = aggregate_measurements(measurements, bucket)
+
+        if is_columnar(request):
+            results = bucket_columns(results)
+
+        return Response({"bucket": bucket, "results": results})
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db.models import Avg, Count, DateTimeField, DurationField, Func, Max, Min, Value
+from rest_framework.exceptions import ParseError
+
+BUCKETS = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+BUCKET_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+METRICS = ("ph", "temperature", "tds")
+
+
+class DateBin(Func):
+    function = "date_bin"
+    output_field = DateTimeField()
+
+    def __init__(self, width, expression, **extra):
+        super().__init__(
+            Value(width, output_field=DurationField()),
+            expression,
+            Value(BUCKET_ORIGIN, output_field=DateTimeField()),
+            **extra,
+        )
+
+
+def aggregate_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+def resolve_bucket(bucket, queryset, field="timestamp", smallest="1m"):
+    """
+    Pick the bucket width for a filtered queryset. "auto" takes the smallest width that keeps
+    the series under AGGREGATE_TARGET_POINTS; explicit widths are refused when they would
+    return more than AGGREGATE_MAX_BUCKETS buckets. Widths below `smallest` are raised to it,
+    for data that only exists at that resolution.
+    """
+    if bucket != "auto" and bucket not in BUCKETS:
+        raise ParseError(f"Invalid value for 'bucket'. Use one of: {', '.join(BUCKETS)}, auto.")
+
+    widths = list(BUCKETS)[list(BUCKETS).index(smallest):]
+    if bucket != "auto" and bucket not in widths:
+        bucket = smallest
+
+    bounds = queryset.order_by().aggregate(first=Min(field), last=Max(field))
+    if bounds["first"] is None:
+        return smallest if bucket == "auto" else bucket
+    span = bounds["last"] - bounds["first"]
+
+    if bucket == "auto":
+        target = aggregate_config().get('AGGREGATE_TARGET_POINTS', 500)
+        for name in widths:
+            if span / BUCKETS[name] < target:
+                return name
+        return "1d"
+
+    if span / BUCKETS[bucket] >= aggregate_config().get('AGGREGATE_MAX_BUCKETS', 5000):
+        raise ParseError(f"Bucket '{bucket}' is too small for the requested range. Use a larger bucket or 'auto'.")
+    return bucket
+
+
+def aggregate_measurements(queryset, bucket):
+    aggregates = {"count": Count("id")}
+    for metric in METRICS:
+        aggregates[f"{metric}_min"] = Min(metric)
+        aggregates[f"{metric}_max"] = Max(metric)
+        aggregates[f"{metric}_avg"] = Avg(metric)
+
+    rows = (
+        queryset.order_by()
+        .annotate(bucket=DateBin(BUCKETS[bucket], "timestamp"))
+        .values("bucket")
+        .annotate(**aggregates)
+        .order_by("bucket")
+    )
+
+    return [
+        {
+            "bucket": row["bucket"],
+            "count": row["count"],
+            **{
+                metric: {
+                    "min": row[f"{metric}_min"],
+                    "max": row[f"{metric}_max"],
+                    "avg": row[f"{metric}_avg"],
+                }
+                for metric in METRICS
+            },
+        }
+        for row in rows
+    ]
@@ -0,0 +1,75 @@
+import hashlib
+import secrets
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import authentication, permissions
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import DeviceKey
+
+DeviceKeyPrincipal = namedtuple('DeviceKeyPrincipal', ['key_id', 'system_id'])
+
+
+# Keyed by key hash; TTL and size limits are those of the cache backend (DEVICE_KEY_CACHE_URL).
+# Revoking a key deletes its entry, so a shared backend (e.g. redis://redis:6379/2) makes
+# revocation immediate in every process; the default in-process cache only drops the entry in
+# the process that revoked it, and others accept the key until their entry times out.
+def device_key_cache():
+    return caches[getattr(settings, 'DEVICE_KEY_CONFIG', {}).get('CACHE_ALIAS', 'device_keys')]
+
+
+def hash_device_key(raw_key):
+    # Keys are 256-bit random tokens, so a fast digest is enough; no password hasher needed.
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def generate_device_key():
+    prefix = secrets.token_hex(4)
+    return prefix, f"{prefix}.{secrets.token_urlsafe(32)}"
+
+
+def revoke_device_key(device_key):
+    device_key.revoked_at = timezone.now()
+    device_key.save(update_fields=['revoked_at'])
+    device_key_cache().delete(device_key.key_hash)
+
+
+class DeviceKeyAuthentication(authentication.BaseAuthentication):
+    header = 'HTTP_X_DEVICE_KEY'
+
+    def authenticate(self, request):
+        raw_key = request.META.get(self.header)
+        if not raw_key:
+            return None
+
+        key_hash = hash_device_key(raw_key.strip())
+        cached = device_key_cache().get(key_hash)
+        if cached is not None:
+            return cached
+
+        device_key = (
+            DeviceKey.objects.select_related('system__owner')
+            .filter(key_hash=key_hash, revoked_at__isnull=True, system__deleted_at__isnull=True)
+            .first()
+        )
+        if device_key is None:
+            raise AuthenticationFailed('Invalid or revoked device key.')
+
+        result = (device_key.system.owner, DeviceKeyPrincipal(device_key.id, device_key.system_id))
+        device_key_cache().set(key_hash, result)
+        return result
+
+
+class DeviceKeyScope(permissions.BasePermission):
+    message = "This device key is not allowed to access this resource."
+
+    def has_permission(self, request, view):
+        if not isinstance(request.auth, DeviceKeyPrincipal):
+            return True
+        if not getattr(view, 'device_key_access', False):
+            return False
+        system_id = view.kwargs.get('system_id')
+        return system_id is None or system_id == request.auth.system_id
@@ -0,0 +1,117 @@
+import atexit
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+
+from .ingestion import save_measurements
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    pass
+
+
+class MeasurementBuffer:
+    def __init__(self, max_size=10000, batch_size=500, flush_interval=1.0):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def put_many(self, measurements):
+        with self._condition:
+            if self._stopping:
+                raise BufferFull("Ingestion buffer is shutting down.")
+            if len(self._pending) + len(measurements) > self.max_size:
+                raise BufferFull("Ingestion buffer is full.")
+            self._pending.extend(measurements)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="measurement-buffer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._pending)
+
+    def stop(self, timeout=None):
+        with self._condition:
+            self._stopping = True
+            thread = self._thread
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+        # Anything the flusher did not get to (e.g. it was never started) is written here.
+        while self._write(self._take_batch()):
+            pass
+
+    def _take_batch(self):
+        with self._condition:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    if len(self._pending) < self.batch_size and not self._stopping:
+                        self._condition.wait(self.flush_interval)
+                    stopping = self._stopping
+                if not self._write(self._take_batch()) and stopping:
+                    break
+        finally:
+            connection.close()
+
+    def _write(self, batch):
+        if not batch:
+            return 0
+        close_old_connections()
+        try:
+            save_measurements(batch)
+        except DatabaseError:
+            # One bad row (e.g. its system was deleted meanwhile) must not take the whole batch down.
+            logger.warning("Batch write of %d measurements failed, retrying row by row.", len(batch), exc_info=True)
+            for measurement in batch:
+                try:
+                    save_measurements([measurement])
+                except DatabaseError:
+                    logger.exception("Dropping buffered measurement for system %s.", measurement.system_id)
+        return len(batch)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def write_behind_enabled():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {}).get('WRITE_BEHIND', False)
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+            _buffer = MeasurementBuffer(
+                max_size=config.get('WRITE_BEHIND_MAX_SIZE', 10000),
+                batch_size=config.get('WRITE_BEHIND_BATCH_SIZE', 500),
+                flush_interval=config.get('WRITE_BEHIND_FLUSH_INTERVAL', 1.0),
+            )
+        return _buffer
+
+
+@atexit.register
+def stop_buffer():
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.stop()
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import HydroponicSystem
+
+
+# Change markers back the ETag/Last-Modified validators of the read endpoints and the keys of
+# the response cache. They are read from the database, so a write made by any process (another
+# API worker, a management command, the job runner) shows in them as soon as it commits:
+# - a system's marker is its changed_at, which mark_changed() moves forward in the transaction
+#   that changes the system, its measurements or its rollups;
+# - an owner's marker is the newest updated_at of their systems, deleted ones included until
+#   they are purged, and the number of systems they have, so creating, editing or deleting a
+#   system changes it.
+# A marker is a (version, last modified) pair; the version is exact to the microsecond.
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _marker(changed_at, *parts):
+    changed_at = changed_at or EPOCH
+    return "-".join(str(part) for part in ((changed_at - EPOCH) // timedelta(microseconds=1), *parts)), int(changed_at.timestamp())
+
+
+def system_marker(system):
+    return _marker(system.changed_at)
+
+
+def owner_marker(owner_id):
+    state = HydroponicSystem.all_objects.filter(owner_id=owner_id).aggregate(
+        updated_at=Max("updated_at"), systems=Count("id", filter=Q(deleted_at__isnull=True)),
+    )
+    return _marker(state["updated_at"], state["systems"])
+
+
+# Moves the markers of the given systems forward and returns {system_id: (previous, new
+# changed_at)} for those that exist. Must run in the transaction making the change: the
+# systems' rows stay locked (in id order, FOR NO KEY UPDATE) until it commits, which is also
+# what serializes ingestion and rollup rebuilds of the same system (see rollups.py).
+def mark_changed(system_ids):
+    if not system_ids:
+        return {}
+    table = connection.ops.quote_name(HydroponicSystem._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH locked AS (SELECT id, changed_at FROM {table} WHERE id = ANY(%s) ORDER BY id FOR NO KEY UPDATE) "
+            f"UPDATE {table} AS system SET changed_at = GREATEST(clock_timestamp(), locked.changed_at + interval '1 microsecond') "
+            f"FROM locked WHERE system.id = locked.id RETURNING system.id, locked.changed_at, system.changed_at",
+            [sorted(system_ids)],
+        )
+        return {system_id: (previous, changed_at) for system_id, previous, changed_at in cursor.fetchall()}
+
+
+def validators(marker, *scope):
+    version, last_modified = marker
+    return quote_etag("-".join(str(part) for part in (*scope, version))), last_modified
+
+
+# A 304 (or 412) response when the request's preconditions match the validators, else None.
+def conditional_response(request, etag, last_modified):
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response = with_validators(response, etag, last_modified)
+    return response
+
+
+# no-cache makes browsers revalidate every time instead of guessing a freshness lifetime from
+# Last-Modified; private keeps per-user responses out of shared caches.
+def with_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,53 @@
+from rest_framework.settings import api_settings
+
+from .aggregation import METRICS
+from .renderers import ColumnarJSONRenderer
+
+COLUMNAR_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+
+
+def is_columnar(request):
+    return getattr(request.accepted_renderer, "format", None) == ColumnarJSONRenderer.format
+
+
+# Named rows from values_list(..., named=True) into parallel arrays.
+def measurement_columns(rows):
+    return {
+        "timestamps": [row.timestamp for row in rows],
+        **{metric: [getattr(row, metric) for row in rows] for metric in METRICS},
+    }
+
+
+def bucket_columns(buckets):
+    return {
+        "timestamps": [bucket["bucket"] for bucket in buckets],
+        "count": [bucket["count"] for bucket in buckets],
+        **{
+            metric: {part: [bucket[metric][part] for bucket in buckets] for part in ("min", "max", "avg")}
+            for metric in METRICS
+        },
+    }
+
+
+def series_columns(points):
+    return {
+        "timestamps": [point["timestamp"] for point in points],
+        "values": [point["value"] for point in points],
+    }
+
+
+def statistics_columns(series):
+    return {
+        "timestamps": [point["timestamp"] for point in series],
+        "count": [point["count"] for point in series],
+        **{
+            metric: {
+                **{part: [point[metric][part] for point in series] for part in ("mean", "std", "rate")},
+                "percentiles": {
+                    key: [point[metric]["percentiles"][key] for point in series]
+                    for key in (series[0][metric]["percentiles"] if series else ())
+                },
+            }
+            for metric in METRICS
+        },
+    }
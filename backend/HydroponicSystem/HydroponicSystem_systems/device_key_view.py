@@ -0,0 +1,125 @@
+from rest_framework import status, serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, NotFound
+from .models import HydroponicSystem, DeviceKey
+from .serializers import DeviceKeySerializer
+from .authentication import generate_device_key, hash_device_key, revoke_device_key
+from drf_spectacular.utils import (
+    extend_schema, OpenApiExample, OpenApiParameter, inline_serializer, OpenApiResponse
+)
+
+error_response_serializer = inline_serializer(
+    name="ErrorResponse",
+    fields={
+        "detail": serializers.CharField()
+    }
+)
+
+
+def get_owned_system(request, system_id):
+    try:
+        return HydroponicSystem.objects.get(id=system_id, owner=request.user)
+    except HydroponicSystem.DoesNotExist:
+        raise PermissionDenied("You do not have permission to this system")
+
+
+class DeviceKeyAPIView(APIView):
+
+    @extend_schema(
+        tags=["Device keys"],
+        summary="List device keys of a hydroponic system",
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int)
+        ],
+        responses={
+            200: DeviceKeySerializer(many=True),
+            403: OpenApiResponse(description="Permission denied", response=error_response_serializer),
+        }
+    )
+    def get(self, request, system_id):
+        system = get_owned_system(request, system_id)
+        keys = DeviceKey.objects.filter(system=system).order_by('-created_at')
+        return Response(DeviceKeySerializer(keys, many=True).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        tags=["Device keys"],
+        summary="Create a device key for a hydroponic system",
+        description=(
+            "Creates an API key that lets a sensor device add and read measurements of this system only. "
+            "Send it in the `X-Device-Key` header. The key is returned once and only its hash is stored."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int)
+        ],
+        request=DeviceKeySerializer,
+        responses={
+            201: OpenApiResponse(
+                description="Device key created.",
+                response=inline_serializer(
+                    name="DeviceKeyCreatedResponse",
+                    fields={
+                        "id": serializers.IntegerField(),
+                        "name": serializers.CharField(),
+                        "prefix": serializers.CharField(),
+                        "system": serializers.IntegerField(),
+                        "created_at": serializers.DateTimeField(),
+                        "revoked_at": serializers.DateTimeField(allow_null=True),
+                        "key": serializers.CharField(),
+                    }
+                ),
+                examples=[
+                    OpenApiExample(
+                        name="Created",
+                        value={
+                            "id": 3,
+                            "name": "Gateway A",
+                            "prefix": "9f86d081",
+                            "system": 1,
+                            "created_at": "2025-02-17T12:22:43.652462Z",
+                            "revoked_at": None,
+                            "key": "9f86d081.vQ3m1Q0bq3Xo1Yx3sQ2KpGk9m2xU7xJ4aR5s8kZcW0E"
+                        }
+                    )
+                ]
+            ),
+            403: OpenApiResponse(description="Permission denied", response=error_response_serializer),
+        }
+    )
+    def post(self, request, system_id):
+        system = get_owned_system(request, system_id)
+        serializer = DeviceKeySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        prefix, raw_key = generate_device_key()
+        serializer.save(system=system, prefix=prefix, key_hash=hash_device_key(raw_key))
+        return Response({**serializer.data, "key": raw_key}, status=status.HTTP_201_CREATED)
+
+
+class DeviceKeyRevokeAPIView(APIView):
+
+    @extend_schema(
+        tags=["Device keys"],
+        summary="Revoke a device key",
+        description=(
+            "The key is rejected from then on by every process sharing the device key cache "
+            "(`DEVICE_KEY_CACHE_URL`). With the default in-process cache, other web or worker "
+            "processes may accept it until their cached entry expires (60 seconds by default)."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int),
+            OpenApiParameter(name="key_id", location=OpenApiParameter.PATH, required=True, type=int),
+        ],
+        responses={
+            204: OpenApiResponse(description="Device key revoked."),
+            403: OpenApiResponse(description="Permission denied", response=error_response_serializer),
+            404: OpenApiResponse(description="Not found", response=error_response_serializer),
+        }
+    )
+    def delete(self, request, system_id, key_id):
+        system = get_owned_system(request, system_id)
+        device_key = DeviceKey.objects.filter(id=key_id, system=system, revoked_at__isnull=True).first()
+        if device_key is None:
+            raise NotFound()
+        revoke_device_key(device_key)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ParseError
+
+from .aggregation import METRICS
+
+DOWNSAMPLE_METHODS = ("lttb",)
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of (x, y) that keep the
+    visual shape of the series, including its spikes.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Points 0 and n - 1 are always kept; the rest is split into threshold - 2 buckets.
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # The third triangle vertex is the average of the following bucket (the last point for the final one).
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_starts = np.append(starts[1:], n - 1)
+    next_ends = np.append(ends[1:], n)
+    widths = next_ends - next_starts
+    avg_x = (cum_x[next_ends] - cum_x[next_starts]) / widths
+    avg_y = (cum_y[next_ends] - cum_y[next_starts]) / widths
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = starts[bucket], ends[bucket]
+        ax, ay = x[selected], y[selected]
+        areas = np.abs((ax - avg_x[bucket]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[bucket] - ay))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    return indices
+
+
+class EpochSeconds(Func):
+    template = "EXTRACT(EPOCH FROM %(expressions)s)::float8"
+    output_field = FloatField()
+
+
+SERIES_COLUMNS = ("timestamp", *METRICS)
+# PostgreSQL binary COPY row of float8 columns: field count, then a length and a value per field.
+COPY_ROW = np.dtype(
+    [("fields", ">i2")] + [item for column in SERIES_COLUMNS for item in ((f"{column}_length", ">i4"), (column, ">f8"))]
+)
+COPY_HEADER_SIZE = 19
+
+
+class SeriesCopyReader:
+    """
+    File-like target for COPY ... TO STDOUT (FORMAT binary) that decodes complete rows into
+    float arrays every `chunk_size` rows, so the result set never exists as Python objects.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_bytes = chunk_size * COPY_ROW.itemsize
+        self.pending = bytearray()
+        self.header_skipped = False
+        self.chunks = []
+
+    def write(self, data):
+        self.pending += data
+        if len(self.pending) >= self.chunk_bytes:
+            self.decode()
+
+    def decode(self):
+        if not self.header_skipped:
+            if len(self.pending) < COPY_HEADER_SIZE:
+                return
+            del self.pending[:COPY_HEADER_SIZE]
+            self.header_skipped = True
+        # Whatever is left over after the last complete row is at most the 2-byte trailer.
+        complete = len(self.pending) // COPY_ROW.itemsize * COPY_ROW.itemsize
+        if complete:
+            rows = np.frombuffer(self.pending, dtype=COPY_ROW, count=complete // COPY_ROW.itemsize)
+            self.chunks.append(np.column_stack([rows[column].astype(np.float64) for column in SERIES_COLUMNS]))
+            del rows
+            del self.pending[:complete]
+
+    def result(self):
+        self.decode()
+        if not self.chunks:
+            return np.empty((0, len(SERIES_COLUMNS)))
+        return np.concatenate(self.chunks)
+
+
+def load_series(queryset, chunk_size):
+    rows = queryset.order_by("timestamp", "id").annotate(
+        series_timestamp=EpochSeconds(F("timestamp")),
+        **{f"series_{metric}": Cast(metric, FloatField()) for metric in METRICS},
+    ).values_list(*(f"series_{column}" for column in SERIES_COLUMNS))
+    sql, params = rows.query.sql_with_params()
+
+    reader = SeriesCopyReader(chunk_size)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY ({cursor.mogrify(sql, params).decode()}) TO STDOUT WITH (FORMAT binary)", reader)
+    return reader.result()
+
+
+# Hourly averages of compacted history in the layout of load_series, timestamped at the bucket start.
+def rollup_series(rollups):
+    rows = rollups.order_by("bucket").values_list("bucket", "count", *(f"{metric}_sum" for metric in METRICS))
+    data = np.empty((len(rows), len(SERIES_COLUMNS)))
+    for index, (bucket, count, *sums) in enumerate(rows):
+        data[index] = [bucket.timestamp(), *(total / count for total in sums)]
+    return data
+
+
+def downsample_params(query_params):
+    method = query_params.get("downsample")
+    if method not in DOWNSAMPLE_METHODS:
+        raise ParseError(f"Invalid value for 'downsample'. Use one of: {', '.join(DOWNSAMPLE_METHODS)}.")
+
+    max_points = getattr(settings, 'MEASUREMENT_CONFIG', {}).get('DOWNSAMPLE_MAX_POINTS', 5000)
+    try:
+        points = int(query_params.get("points", 1000))
+    except ValueError:
+        points = 0
+    if not 3 <= points <= max_points:
+        raise ParseError(f"Invalid value for 'points'. Use a number between 3 and {max_points}.")
+    return method, points
+
+
+# history, from rollup_series, goes in front of the raw readings and must end before them.
+def downsample_measurements(queryset, points, history=None):
+    chunk_size = getattr(settings, 'MEASUREMENT_CONFIG', {}).get('DOWNSAMPLE_CHUNK_SIZE', 10000)
+    data = load_series(queryset, chunk_size)
+    if history is not None:
+        data = np.concatenate([history, data])
+    timestamps = data[:, 0]
+
+    series = {}
+    for column, metric in enumerate(METRICS, start=1):
+        values = data[:, column]
+        indices = lttb(timestamps, values, points)
+        cast = int if metric == "tds" else float
+        series[metric] = [
+            {"timestamp": datetime.fromtimestamp(timestamps[i], tz=timezone.utc), "value": cast(values[i])}
+            for i in indices.tolist()
+        ]
+    return len(data), series
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+
+from rest_framework.exceptions import NotAcceptable
+
+from .serializers import datetime_formatter
+
+# The columns the CSV/NDJSON upload accepts, so an export can be uploaded again as is. Fleet
+# exports lead with the system, like the fleet ingestion payload.
+EXPORT_FIELDS = ("timestamp", "ph", "temperature", "tds", "device_id", "sequence")
+FLEET_EXPORT_FIELDS = ("system_id", *EXPORT_FIELDS)
+
+
+# Rows in lists of chunk_size, read through a server-side cursor, so memory stays flat
+# however long the history is.
+def row_chunks(queryset, fields, chunk_size):
+    chunk = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_chunks(queryset, fields, chunk_size):
+    format_datetime = datetime_formatter()
+    position = fields.index("timestamp")
+    for chunk in row_chunks(queryset, fields, chunk_size):
+        yield [(*row[:position], format_datetime(row[position]), *row[position + 1:]) for row in chunk]
+
+
+def csv_stream(queryset, chunk_size, fields=EXPORT_FIELDS):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode()
+    for chunk in export_chunks(queryset, fields, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+
+
+def ndjson_stream(queryset, chunk_size, fields=EXPORT_FIELDS):
+    for chunk in export_chunks(queryset, fields, chunk_size):
+        yield "".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False, separators=(",", ":")) + "\n" for row in chunk).encode()
+
+
+# Write-only file for the Arrow writers: take() hands out what was written since the last
+# call while tell() keeps counting, which Parquet needs for the offsets in its footer.
+class StreamSink(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self.position = 0
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise NotAcceptable("Arrow and Parquet exports require the pyarrow package.")
+    return pyarrow
+
+
+def arrow_schema(pa, fields):
+    types = {
+        "system_id": pa.int64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "ph": pa.float64(),
+        "temperature": pa.float64(),
+        "tds": pa.int32(),
+        "device_id": pa.string(),
+        "sequence": pa.int64(),
+    }
+    return pa.schema([pa.field(name, types[name], nullable=name in ("device_id", "sequence")) for name in fields])
+
+
+def record_batches(pa, schema, queryset, chunk_size):
+    for chunk in row_chunks(queryset, schema.names, chunk_size):
+        columns = zip(*chunk)
+        yield pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+
+
+# Arrow IPC stream format, one record batch per fetched chunk; pyarrow.ipc.open_stream,
+# pandas and DuckDB read it without parsing.
+def arrow_stream(queryset, chunk_size, fields=EXPORT_FIELDS):
+    pa = import_pyarrow()
+    schema = arrow_schema(pa, fields)
+
+    def stream():
+        sink = StreamSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            yield sink.take()
+            for batch in record_batches(pa, schema, queryset, chunk_size):
+                writer.write_batch(batch)
+                yield sink.take()
+        yield sink.take()
+
+    return stream()
+
+
+# Parquet compresses better with larger row groups than the fetch chunks, so batches are
+# collected up to row_group_size rows before each row group is written.
+def parquet_stream(queryset, chunk_size, row_group_size, fields=EXPORT_FIELDS):
+    pa = import_pyarrow()
+    schema = arrow_schema(pa, fields)
+
+    def stream():
+        sink = StreamSink()
+        with pa.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+            pending = []
+            pending_rows = 0
+            for batch in record_batches(pa, schema, queryset, chunk_size):
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= row_group_size:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+                    pending = []
+                    pending_rows = 0
+                    yield sink.take()
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=pending_rows)
+        yield sink.take()
+
+    return stream()
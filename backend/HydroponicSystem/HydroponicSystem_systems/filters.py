@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+
+
+def measurement_filters(system, query_params):
+    return Q(system=system) & reading_filters(query_params)
+
+
+def fleet_measurement_filters(owner, query_params):
+    return Q(system__owner=owner, system__deleted_at__isnull=True) & reading_filters(query_params)
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ParseError("Invalid timestamp format. Expected format: YYYY-MM-DD.")
+
+
+# timestamp_before includes its whole day, which hourly and daily rollup buckets can match exactly.
+def day_end(value):
+    return datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1)
+
+
+def reading_filters(query_params):
+    filters = Q()
+
+    ph_min = query_params.get("ph_min")
+    ph_max = query_params.get("ph_max")
+    temp_min = query_params.get("temperature_min")
+    temp_max = query_params.get("temperature_max")
+    tds_min = query_params.get("tds_min")
+    tds_max = query_params.get("tds_max")
+    timestamp_after = query_params.get("timestamp_after")
+    timestamp_before = query_params.get("timestamp_before")
+
+    if ph_min:
+        filters &= Q(ph__gte=ph_min)
+    if ph_max:
+        filters &= Q(ph__lte=ph_max)
+    if temp_min:
+        filters &= Q(temperature__gte=temp_min)
+    if temp_max:
+        filters &= Q(temperature__lte=temp_max)
+    if tds_min:
+        filters &= Q(tds__gte=tds_min)
+    if tds_max:
+        filters &= Q(tds__lte=tds_max)
+
+    try:
+        if timestamp_after:
+            filters &= Q(timestamp__gte=datetime.strptime(timestamp_after, "%Y-%m-%d"))
+        if timestamp_before:
+            filters &= Q(timestamp__lt=day_end(timestamp_before))
+    except ValueError:
+        raise ParseError("Invalid timestamp format. Expected format: YYYY-MM-DD.")
+
+    return filters
+
+
+VALUE_FILTERS = ("ph_min", "ph_max", "temperature_min", "temperature_max", "tds_min", "tds_max")
+
+
+def has_value_filters(query_params):
+    return any(query_params.get(name) for name in VALUE_FILTERS)
+
+
+# Rollup buckets start on the hour or day, so a bucket is included when it starts inside the range.
+def rollup_filters(system, query_params):
+    filters = Q(system=system)
+
+    timestamp_after = query_params.get("timestamp_after")
+    timestamp_before = query_params.get("timestamp_before")
+
+    try:
+        if timestamp_after:
+            filters &= Q(bucket__gte=datetime.strptime(timestamp_after, "%Y-%m-%d"))
+        if timestamp_before:
+            filters &= Q(bucket__lt=day_end(timestamp_before))
+    except ValueError:
+        raise ParseError("Invalid timestamp format. Expected format: YYYY-MM-DD.")
+
+    return filters
+
+
+MEASUREMENT_SORT_FIELDS = ["timestamp", "id", "ph", "temperature", "tds", "device_id", "sequence"]
+
+
+def measurement_ordering(query_params):
+    sort_by = query_params.get("sort_by", "timestamp")
+    sort_order = query_params.get("sort_order", "asc")
+
+    if sort_by not in MEASUREMENT_SORT_FIELDS:
+        raise ParseError(f"Invalid value for 'sort_by'. Use one of: {', '.join(MEASUREMENT_SORT_FIELDS)}.")
+    if sort_order not in ["asc", "desc"]:
+        raise ParseError("Invalid value for 'sort_order'. Use 'asc' or 'desc'.")
+
+    return f"-{sort_by}" if sort_order == "desc" else sort_by
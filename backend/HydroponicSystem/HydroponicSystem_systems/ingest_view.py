@@ -0,0 +1,157 @@
+from rest_framework import status, serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from django.conf import settings
+from .models import HydroponicSystem, Measurement
+from .serializers import MeasurementSerializer
+from .ingestion import save_measurements
+from .authentication import DeviceKeyPrincipal
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, inline_serializer
+
+error_response_serializer = inline_serializer(
+    name="ErrorResponse",
+    fields={
+        "detail": serializers.CharField()
+    }
+)
+
+fleet_reading_serializer = inline_serializer(
+    name="FleetReading",
+    fields={
+        "system_id": serializers.IntegerField(),
+        "ph": serializers.FloatField(),
+        "temperature": serializers.FloatField(),
+        "tds": serializers.IntegerField(),
+    }
+)
+
+fleet_ingest_response_serializer = inline_serializer(
+    name="FleetIngestResponse",
+    fields={
+        "accepted": serializers.IntegerField(),
+        "rejected": serializers.IntegerField(),
+        "duplicates": serializers.IntegerField(),
+        "systems": serializers.DictField(child=serializers.DictField(child=serializers.IntegerField())),
+        "errors": serializers.ListField(child=serializers.DictField()),
+    }
+)
+
+
+class FleetIngestAPIView(APIView):
+    device_key_access = True
+
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Add measurements to many hydroponic systems at once",
+        description=(
+            "Accepts a JSON array of readings, each tagged with the `system_id` it belongs to. "
+            "Ownership of all referenced systems is resolved in one query and every valid reading "
+            "is stored in one transaction. Readings for systems you do not own, or that fail "
+            "validation, are rejected individually and counted per system. Readings whose "
+            "`device_id` and `sequence` pair is already stored are counted as duplicates."
+        ),
+        request=fleet_reading_serializer,
+        responses={
+            201: OpenApiResponse(
+                description="At least one reading was stored.",
+                response=fleet_ingest_response_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Partially accepted",
+                        value={
+                            "accepted": 2,
+                            "rejected": 1,
+                            "duplicates": 0,
+                            "systems": {
+                                "1": {"accepted": 2, "rejected": 0, "duplicates": 0},
+                                "7": {"accepted": 0, "rejected": 1, "duplicates": 0}
+                            },
+                            "errors": [
+                                {"index": 2, "system_id": 7, "errors": {"detail": "You do not have permission to add measurements in this system."}}
+                            ]
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Malformed payload or no reading was accepted.",
+                response=error_response_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Not a list",
+                        value={"detail": "Expected a list of readings."},
+                        status_codes=["400"]
+                    )
+                ]
+            ),
+        }
+    )
+    def post(self, request):
+        readings = request.data
+        if not isinstance(readings, list) or not readings:
+            return Response({"detail": "Expected a list of readings."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_items = getattr(settings, 'MEASUREMENT_CONFIG', {}).get('FLEET_MAX_ITEMS', 5000)
+        if len(readings) > max_items:
+            return Response(
+                {"detail": f"Ensure this list has no more than {max_items} readings."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        system_ids = set()
+        for reading in readings:
+            system_id = reading.get("system_id") if isinstance(reading, dict) else None
+            if isinstance(system_id, int) and not isinstance(system_id, bool):
+                system_ids.add(system_id)
+
+        if isinstance(request.auth, DeviceKeyPrincipal):
+            system_ids &= {request.auth.system_id}
+
+        owned_ids = set(
+            HydroponicSystem.objects.filter(id__in=system_ids, owner=request.user).values_list("id", flat=True)
+        )
+
+        summary = {}
+        errors = []
+        measurements = []
+
+        for index, reading in enumerate(readings):
+            system_id = reading.get("system_id") if isinstance(reading, dict) else None
+            counts = summary.setdefault(str(system_id), {"accepted": 0, "rejected": 0, "duplicates": 0})
+
+            if system_id not in owned_ids:
+                counts["rejected"] += 1
+                errors.append({
+                    "index": index,
+                    "system_id": system_id,
+                    "errors": {"detail": "You do not have permission to add measurements in this system."},
+                })
+                continue
+
+            serializer = MeasurementSerializer(data=reading)
+            if not serializer.is_valid():
+                counts["rejected"] += 1
+                errors.append({"index": index, "system_id": system_id, "errors": serializer.errors})
+                continue
+
+            measurements.append(Measurement(system_id=system_id, **serializer.validated_data))
+
+        accepted = 0
+        for measurement, created in save_measurements(measurements):
+            accepted += created
+            summary[str(measurement.system_id)]["accepted" if created else "duplicates"] += 1
+
+        response_data = {
+            "accepted": accepted,
+            "rejected": len(readings) - len(measurements),
+            "duplicates": len(measurements) - accepted,
+            "systems": summary,
+            "errors": errors,
+        }
+        if accepted:
+            response_status = status.HTTP_201_CREATED
+        elif measurements:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(response_data, status=response_status)
@@ -0,0 +1,76 @@
+from django.db import transaction
+
+from .models import Measurement
+from .changes import mark_changed
+from .latest import record_latest_measurements
+from .rollups import update_rollups
+
+
+def idempotency_key(measurement):
+    if measurement.device_id is None or measurement.sequence is None:
+        return None
+    return measurement.system_id, measurement.device_id, measurement.sequence
+
+
+# Returns (measurement, created) pairs aligned with the input; a duplicate reading
+# is paired with the row stored first under its (system, device_id, sequence) key.
+def save_measurements(measurements):
+    keyed = {}
+    for measurement in measurements:
+        key = idempotency_key(measurement)
+        if key is not None:
+            keyed.setdefault(key, measurement)
+
+    stored = _stored_measurements(keyed)
+
+    results = []
+    fresh = []
+    for measurement in measurements:
+        key = idempotency_key(measurement)
+        if key is None:
+            fresh.append(measurement)
+            results.append((measurement, True))
+        elif key in stored:
+            results.append((stored[key], False))
+        elif keyed[key] is measurement:
+            fresh.append(measurement)
+            results.append((measurement, True))
+        else:
+            results.append((keyed[key], False))
+
+    if fresh:
+        with transaction.atomic():
+            # mark_changed locks the systems until commit, so the keys are looked up again under
+            # the lock: a concurrent retry has either committed them or waits for this one. The
+            # keys stay unique across partitions, which the per-partition unique indexes cannot do.
+            changes = mark_changed({m.system_id for m in fresh})
+            raced = _stored_measurements({idempotency_key(m) for m in fresh} - {None})
+            fresh = [m for m in fresh if idempotency_key(m) not in raced]
+            Measurement.objects.bulk_create(fresh)
+            update_rollups([m.pk for m in fresh])
+            inserted = fresh
+            transaction.on_commit(lambda: record_latest_measurements(inserted, changes))
+
+        if raced:
+            results = [
+                (raced[idempotency_key(m)], False) if created and idempotency_key(m) in raced else (m, created)
+                for m, created in results
+            ]
+
+    return results
+
+
+def _stored_measurements(keys):
+    if not keys:
+        return {}
+    candidates = Measurement.objects.filter(
+        system_id__in={key[0] for key in keys},
+        device_id__in={key[1] for key in keys},
+        sequence__in={key[2] for key in keys},
+    )
+    stored = {}
+    for measurement in candidates:
+        key = idempotency_key(measurement)
+        if key in keys:
+            stored[key] = measurement
+    return stored
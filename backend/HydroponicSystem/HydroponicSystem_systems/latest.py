@@ -0,0 +1,65 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Measurement
+
+
+def latest_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+def latest_cache():
+    return caches[latest_config().get('CACHE_ALIAS', 'measurements')]
+
+
+def latest_key(system_id):
+    return f"latest_measurements:{system_id}"
+
+
+# Merged by pk: a read may have cached a reading before its batch's on-commit merge runs.
+def _newest_first(measurements):
+    count = latest_config().get('LATEST_COUNT', 10)
+    unique = {m.pk: m for m in measurements}.values()
+    return sorted(unique, key=lambda m: (m.timestamp, m.pk), reverse=True)[:count]
+
+
+# The last LATEST_COUNT readings of a system, newest first; only a cache miss reads the table.
+# Entries carry the system's changed_at (see changes.py) and only serve a system with the same
+# value, so changes committed by any process (compaction, bulk loads, partition drops or
+# another worker's writes) retire them even when each process has its own cache.
+def get_latest_measurements(system):
+    cache = latest_cache()
+    cached = cache.get(latest_key(system.id))
+    if cached is not None and cached[0] == system.changed_at:
+        return cached[1]
+
+    count = latest_config().get('LATEST_COUNT', 10)
+    latest = list(Measurement.objects.filter(system_id=system.id).order_by('-timestamp', '-id')[:count])
+    cache.set(latest_key(system.id), (system.changed_at, latest))
+    return latest
+
+
+# Merges committed readings into the cached lists. changes maps each system to the (previous,
+# new) changed_at of the batch, as returned by mark_changed(). A list cached before another
+# change, or not cached at all, is left alone; the next read refills it.
+def record_latest_measurements(measurements, changes):
+    by_system = defaultdict(list)
+    for measurement in measurements:
+        by_system[measurement.system_id].append(measurement)
+
+    cache = latest_cache()
+    cached = cache.get_many([latest_key(system_id) for system_id in by_system])
+    updates = {}
+    for system_id, fresh in by_system.items():
+        key = latest_key(system_id)
+        previous, changed_at = changes[system_id]
+        if key in cached and cached[key][0] == previous:
+            updates[key] = (changed_at, _newest_first(cached[key][1] + fresh))
+    if updates:
+        cache.set_many(updates)
+
+
+def invalidate_latest_measurements(system_ids):
+    latest_cache().delete_many([latest_key(system_id) for system_id in system_ids])
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+
+from HydroponicSystem_systems.models import Measurement
+from HydroponicSystem_systems.renderers import FastJSONRenderer, orjson
+from HydroponicSystem_systems.serializers import MEASUREMENT_ROW_FIELDS, MeasurementSerializer, measurement_rows
+
+
+class Command(BaseCommand):
+    help = "Compare rows per second of the serializer and fast-path measurement listings (query, serialize and render)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--system", type=int, help="System to read. Defaults to the system with the most measurements.")
+        parser.add_argument("--rows", type=int, default=1000, help="Rows per run, like one listing page (default: 1000).")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per path; the best run is reported (default: 20).")
+
+    def handle(self, *args, **options):
+        system_id = options["system"]
+        if system_id is None:
+            busiest = Measurement.objects.values("system").annotate(rows=Count("id")).order_by("-rows").first()
+            if busiest is None:
+                raise CommandError("There are no measurements to serialize.")
+            system_id = busiest["system"]
+
+        queryset = Measurement.objects.filter(system_id=system_id).order_by("timestamp", "id")[:options["rows"]]
+        rows = queryset.count()
+        if not rows:
+            raise CommandError(f"Hydroponic system {system_id} has no measurements.")
+
+        paths = {
+            "serializer + JSONRenderer": lambda: JSONRenderer().render(MeasurementSerializer(queryset.all(), many=True).data),
+            "rows + JSONRenderer": lambda: JSONRenderer().render(measurement_rows(queryset.values_list(*MEASUREMENT_ROW_FIELDS))),
+            "rows + FastJSONRenderer": lambda: FastJSONRenderer().render(measurement_rows(queryset.values_list(*MEASUREMENT_ROW_FIELDS))),
+        }
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer falls back to JSONRenderer."))
+
+        outputs = {}
+        baseline = None
+        for name, render in paths.items():
+            best = float("inf")
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                outputs[name] = render()
+                best = min(best, time.perf_counter() - started)
+            rows_per_second = rows / best
+            baseline = baseline or rows_per_second
+            self.stdout.write(f"{name:<28} {best * 1000:8.2f} ms  {rows_per_second:12,.0f} rows/s  x{rows_per_second / baseline:.2f}")
+
+        if len(set(outputs.values())) != 1:
+            raise CommandError("The fast path output differs from the serializer output.")
+        self.stdout.write(self.style.SUCCESS(f"All paths rendered identical {len(outputs[name])}-byte bodies."))
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from HydroponicSystem_systems.models import HydroponicSystem
+from HydroponicSystem_systems.retention import compact_system, systems_due_for_compaction
+
+
+class Command(BaseCommand):
+    help = "Delete raw measurements older than each system's retention period, keeping them in the hourly and daily rollups."
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+        parser.add_argument("--system", type=int, action="append", help="System to compact. May be repeated. Defaults to every system with a retention period.")
+        parser.add_argument("--batch-size", type=int, default=config.get('COMPACTION_BATCH_SIZE', 5000), help="Rows deleted per transaction (default: MEASUREMENT_COMPACTION_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        systems = systems_due_for_compaction()
+        if options["system"]:
+            missing = set(options["system"]) - set(HydroponicSystem.objects.filter(id__in=options["system"]).values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Hydroponic system {min(missing)} does not exist.")
+            systems = systems.filter(id__in=options["system"])
+
+        started = time.monotonic()
+        total = 0
+        for system in systems:
+            deleted = compact_system(system, options["batch_size"])
+            if deleted:
+                self.stdout.write(f"System {system.id}: {deleted} readings before {system.raw_compacted_before:%Y-%m-%d %H:%M} compacted.")
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f"Compacted {total} raw measurements in {time.monotonic() - started:.1f}s."))
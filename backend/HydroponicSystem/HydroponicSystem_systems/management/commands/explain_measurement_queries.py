@@ -0,0 +1,84 @@
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max, Min, Q
+
+from HydroponicSystem_systems.filters import measurement_filters, measurement_ordering
+from HydroponicSystem_systems.models import Measurement
+
+EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+
+class Command(BaseCommand):
+    help = "Record EXPLAIN ANALYZE plans for every documented measurement query shape."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--system", type=int, help="System to query. Defaults to the system with the most measurements.")
+        parser.add_argument("--page", type=int, default=1000, help="Page number used for the deep page plans (default: 1000).")
+        parser.add_argument("--output", help="Write the plans to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        system_id = options["system"]
+        if system_id is None:
+            busiest = Measurement.objects.values("system").annotate(rows=Count("id")).order_by("-rows").first()
+            if busiest is None:
+                raise CommandError("There are no measurements to explain.")
+            system_id = busiest["system"]
+
+        bounds = Measurement.objects.filter(system_id=system_id).aggregate(first=Min("timestamp"), last=Max("timestamp"))
+        if bounds["first"] is None:
+            raise CommandError(f"Hydroponic system {system_id} has no measurements.")
+        range_start = bounds["first"].strftime("%Y-%m-%d")
+        range_end = (bounds["first"] + (bounds["last"] - bounds["first"]) / 2 + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        shapes = [
+            ("default listing", {}),
+            ("descending listing", {"sort_order": "desc"}),
+            ("timestamp range", {"timestamp_after": range_start, "timestamp_before": range_end}),
+            ("timestamp range and pH bounds", {"timestamp_after": range_start, "timestamp_before": range_end, "ph_min": "6.0", "ph_max": "7.0"}),
+            ("temperature and TDS bounds", {"temperature_min": "18", "temperature_max": "26", "tds_min": "500", "tds_max": "1500"}),
+            ("sorted by pH", {"sort_by": "ph", "sort_order": "desc"}),
+        ]
+
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+        deep_offset = (options["page"] - 1) * page_size
+        report = []
+
+        for name, params in shapes:
+            queryset = Measurement.objects.filter(measurement_filters(system_id, params)).order_by(measurement_ordering(params))
+            report.append((f"{name}: count", self.explain_count(queryset)))
+            report.append((f"{name}: first page", queryset[:page_size].explain(analyze=True, buffers=True)))
+            report.append((f"{name}: page {options['page']}", queryset[deep_offset:deep_offset + page_size].explain(analyze=True, buffers=True)))
+
+        listing = Measurement.objects.filter(system_id=system_id).order_by("timestamp", "id")
+        boundary = listing.values_list("timestamp", "id")[deep_offset - 1:deep_offset].first() if deep_offset else None
+        if boundary is not None:
+            keyset = listing.filter(Q(timestamp__gte=boundary[0]), Q(timestamp__gt=boundary[0]) | Q(timestamp=boundary[0], id__gt=boundary[1]))
+            report.append((f"default listing: keyset page {options['page']}", keyset[:page_size + 1].explain(analyze=True, buffers=True)))
+
+        latest = Measurement.objects.filter(system_id=system_id).order_by("-timestamp")[:10]
+        report.append(("system detail: latest measurements", latest.explain(analyze=True, buffers=True)))
+
+        lines = [f"EXPLAIN ANALYZE plans for system {system_id}", ""]
+        for title, plan in report:
+            timing = EXECUTION_TIME.search(plan)
+            lines.append(f"== {title} ({timing.group(1) if timing else '?'} ms)")
+            lines.append(plan)
+            lines.append("")
+        output = "\n".join(lines)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(report)} plans to {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+    def explain_count(self, queryset):
+        sql, params = queryset.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) SELECT COUNT(*) FROM ({sql}) subquery", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
@@ -0,0 +1,201 @@
+import csv
+import io
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from HydroponicSystem_systems.models import HydroponicSystem, Measurement
+from HydroponicSystem_systems.changes import mark_changed
+from HydroponicSystem_systems.rollups import rebuild_rollups
+
+VALUE_FIELDS = ("ph", "temperature", "tds")
+MAX_REPORTED_ERRORS = 10
+
+
+class Command(BaseCommand):
+    help = "Bulk load measurements from CSV or Parquet files using PostgreSQL COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="CSV or Parquet files to load.")
+        parser.add_argument("--system", type=int, help="Target system ID for every row. Defaults to a system_id column in the file.")
+        parser.add_argument("--format", choices=["csv", "parquet"], help="Input format. Inferred from the file extension by default.")
+        parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ',').")
+        parser.add_argument(
+            "--column", action="append", default=[], metavar="FIELD=SOURCE",
+            help="Read FIELD (timestamp, ph, temperature, tds, system_id) from the SOURCE column. May be repeated.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=50000, help="Rows sent per COPY statement (default: 50000).")
+        parser.add_argument("--drop-indexes", action="store_true", help="Drop secondary indexes before loading and rebuild them afterwards.")
+
+    def handle(self, *args, **options):
+        columns = {"system_id": "system_id", "timestamp": "timestamp", **{name: name for name in VALUE_FIELDS}}
+        for mapping in options["column"]:
+            field, _, source = mapping.partition("=")
+            if field not in columns or not source:
+                raise CommandError(f"Invalid column mapping '{mapping}'.")
+            columns[field] = source
+
+        system_id = options["system"]
+        if system_id is not None and not HydroponicSystem.objects.filter(id=system_id).exists():
+            raise CommandError(f"Hydroponic system {system_id} does not exist.")
+        known_systems = set(HydroponicSystem.objects.values_list("id", flat=True)) if system_id is None else {system_id}
+
+        self.validators = {name: Measurement._meta.get_field(name).validators for name in VALUE_FIELDS}
+        self.default_timezone = timezone.get_default_timezone()
+
+        table = connection.ops.quote_name(Measurement._meta.db_table)
+        target_columns = ", ".join(
+            connection.ops.quote_name(Measurement._meta.get_field(name).column)
+            for name in ("system", "timestamp", *VALUE_FIELDS)
+        )
+        copy_sql = f"COPY {table} ({target_columns}) FROM STDIN WITH (FORMAT csv)"
+
+        loaded = 0
+        rejected = 0
+        loaded_systems = set()
+        started = time.monotonic()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            dropped_indexes = self.drop_indexes(cursor) if options["drop_indexes"] else []
+
+            for path in options["paths"]:
+                rows = self.read_rows(path, options)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                pending = 0
+
+                for line, row in rows:
+                    try:
+                        record = self.build_record(row, columns, system_id, known_systems)
+                    except ValueError as error:
+                        rejected += 1
+                        if rejected <= MAX_REPORTED_ERRORS:
+                            self.stderr.write(f"{path}:{line}: {error}")
+                        continue
+
+                    writer.writerow(record)
+                    loaded_systems.add(record[0])
+                    pending += 1
+                    if pending >= options["chunk_size"]:
+                        loaded += self.copy_chunk(cursor, copy_sql, buffer)
+                        self.report_progress(loaded, started)
+                        buffer = io.StringIO()
+                        writer = csv.writer(buffer)
+                        pending = 0
+
+                if pending:
+                    loaded += self.copy_chunk(cursor, copy_sql, buffer)
+                    self.report_progress(loaded, started)
+
+            if dropped_indexes:
+                # Foreign keys are deferred; their pending checks block CREATE INDEX.
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                self.stdout.write(f"Rebuilding {len(dropped_indexes)} indexes...")
+                for definition in dropped_indexes:
+                    cursor.execute(definition)
+
+            if loaded:
+                cursor.execute(f"ANALYZE {table}")
+                mark_changed(loaded_systems)
+
+        if loaded:
+            # COPY bypasses the ingestion path, which keeps the rollups current. The rebuild runs
+            # after the load has committed, one system at a time; if it is interrupted, rerun
+            # rebuild_rollups for the loaded systems.
+            self.stdout.write(f"Rebuilding rollups for {len(loaded_systems)} systems...")
+            rebuild_rollups(sorted(loaded_systems))
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {loaded} measurements ({rejected} rejected) in {elapsed:.1f}s, {loaded / elapsed:.0f} rows/s."
+        ))
+
+    def read_rows(self, path, options):
+        file_format = options["format"] or ("parquet" if Path(path).suffix.lower() in (".parquet", ".pq") else "csv")
+
+        if file_format == "parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise CommandError("Loading Parquet files requires the pyarrow package.")
+            line = 0
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=options["chunk_size"]):
+                for row in batch.to_pylist():
+                    line += 1
+                    yield line, row
+            return
+
+        with open(path, newline="", encoding="utf-8") as handle:
+            reader = csv.DictReader(handle, delimiter=options["delimiter"])
+            for row in reader:
+                yield reader.line_num, row
+
+    def build_record(self, row, columns, system_id, known_systems):
+        if system_id is None:
+            try:
+                system_id = int(row.get(columns["system_id"]))
+            except (TypeError, ValueError):
+                raise ValueError("missing or invalid system_id")
+            if system_id not in known_systems:
+                raise ValueError(f"unknown system {system_id}")
+
+        record = [system_id, self.parse_timestamp(row.get(columns["timestamp"]))]
+        for name in VALUE_FIELDS:
+            raw = row.get(columns[name])
+            try:
+                value = int(raw) if name == "tds" else float(raw)
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid {name} value {raw!r}")
+            try:
+                for validator in self.validators[name]:
+                    validator(value)
+            except ValidationError as error:
+                raise ValueError(f"{name}: {' '.join(error.messages)}")
+            record.append(value)
+        return record
+
+    def parse_timestamp(self, raw):
+        if raw in (None, ""):
+            raise ValueError("missing timestamp")
+        if isinstance(raw, datetime):
+            value = raw
+        else:
+            try:
+                value = datetime.fromisoformat(str(raw).strip())
+            except ValueError:
+                raise ValueError(f"invalid timestamp {raw!r}")
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, self.default_timezone)
+        return value.astimezone(dt_timezone.utc).isoformat()
+
+    def copy_chunk(self, cursor, copy_sql, buffer):
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+        return cursor.rowcount
+
+    def drop_indexes(self, cursor):
+        cursor.execute(
+            """
+            SELECT index_class.relname, pg_get_indexdef(index_class.oid)
+            FROM pg_index
+            JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+            """,
+            [connection.ops.quote_name(Measurement._meta.db_table)],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+        if indexes:
+            self.stdout.write(f"Dropped {len(indexes)} indexes.")
+        return [definition for _, definition in indexes]
+
+    def report_progress(self, loaded, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(f"{loaded} rows loaded ({loaded / elapsed:.0f} rows/s)")
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from HydroponicSystem_systems.partitions import (
+    add_months, convert_to_partitioned, create_partitions, expired_partitions, is_partitioned, remove_partition, upcoming_months
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly measurement partitions and drop (or detach) those past the retention period."
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+        parser.add_argument("--convert", action="store_true", help="Convert the plain measurement table into a partitioned one first (locks the table while rows are copied).")
+        parser.add_argument("--ahead", type=int, default=config.get('PARTITION_MONTHS_AHEAD', 3), help="Months to create ahead of the current one (default: MEASUREMENT_PARTITION_MONTHS_AHEAD).")
+        parser.add_argument("--retention-months", type=int, default=config.get('RAW_RETENTION_MONTHS', 0), help="Months of raw measurements to keep before the current one; 0 keeps everything (default: MEASUREMENT_RAW_RETENTION_MONTHS).")
+        parser.add_argument("--detach-only", action="store_true", help="Detach expired partitions and keep them as standalone tables instead of dropping them.")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be created and removed.")
+
+    def handle(self, *args, **options):
+        if options["ahead"] < 0 or options["retention_months"] < 0:
+            raise CommandError("--ahead and --retention-months must not be negative.")
+
+        if not is_partitioned():
+            if not options["convert"]:
+                raise CommandError("The measurement table is not partitioned. Run with --convert to convert it.")
+            if options["dry_run"]:
+                self.stdout.write("Would convert the measurement table into monthly partitions.")
+                return
+            self.stdout.write("Converting the measurement table into monthly partitions...")
+            convert_to_partitioned(options["ahead"])
+
+        if options["dry_run"]:
+            for month in upcoming_months(options["ahead"]):
+                self.stdout.write(f"Would create the partition for {month:%Y-%m} if missing.")
+        else:
+            for name in create_partitions(upcoming_months(options["ahead"])):
+                self.stdout.write(f"Created {name}.")
+
+        if not options["retention_months"]:
+            return
+
+        verb, action = ("detach", "Detached") if options["detach_only"] else ("drop", "Dropped")
+        changed_systems = set()
+        for month, name in expired_partitions(options["retention_months"]):
+            if options["dry_run"]:
+                self.stdout.write(f"Would {verb} {name}.")
+                continue
+            system_ids = remove_partition(name, add_months(month, 1), detach_only=options["detach_only"])
+            changed_systems.update(system_ids)
+            self.stdout.write(f"{action} {name}.")
+
+        self.stdout.write(self.style.SUCCESS(f"Partitions up to date; {len(changed_systems)} systems lost expired readings."))
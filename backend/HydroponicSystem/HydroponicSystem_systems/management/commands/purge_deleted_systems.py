@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from HydroponicSystem_systems.models import HydroponicSystem
+from HydroponicSystem_systems.purge import purge_system
+
+
+class Command(BaseCommand):
+    help = "Delete the measurements, rollups and rows of deleted systems whose background purge did not finish."
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+        parser.add_argument("--batch-size", type=int, default=config.get('PURGE_BATCH_SIZE', 5000), help="Measurements deleted per transaction (default: MEASUREMENT_PURGE_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        started = time.monotonic()
+        system_ids = list(HydroponicSystem.all_objects.filter(deleted_at__isnull=False).order_by("id").values_list("id", flat=True))
+        for system_id in system_ids:
+            deleted = purge_system(system_id, options["batch_size"])
+            self.stdout.write(f"System {system_id} purged ({deleted} measurements).")
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {len(system_ids)} deleted systems in {time.monotonic() - started:.1f}s."))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HydroponicSystem_jobs.queue import enqueue
+from HydroponicSystem_systems.models import HydroponicSystem, Measurement
+from HydroponicSystem_systems.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute hourly and daily rollups from raw measurements, e.g. after a backfill."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--system", type=int, action="append", help="System to rebuild. May be repeated. Defaults to every system with measurements.")
+        parser.add_argument("--enqueue", action="store_true", help="Queue the rebuild for manage.py runworker instead of running it here.")
+
+    def handle(self, *args, **options):
+        system_ids = options["system"]
+        if system_ids:
+            missing = set(system_ids) - set(HydroponicSystem.objects.filter(id__in=system_ids).values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Hydroponic system {min(missing)} does not exist.")
+        else:
+            system_ids = list(
+                Measurement.objects.filter(system__deleted_at__isnull=True)
+                .order_by("system_id").values_list("system_id", flat=True).distinct()
+            )
+
+        if options["enqueue"]:
+            job = enqueue("rebuild_rollups", {"system_ids": system_ids})
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.id} to rebuild rollups for {len(system_ids)} systems."))
+            return
+
+        started = time.monotonic()
+        rebuilt = 0
+        for system_id in system_ids:
+            rebuilt += rebuild_rollups([system_id])
+            self.stdout.write(f"System {system_id} rebuilt.")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {rebuilt} systems in {time.monotonic() - started:.1f}s."))
@@ -1,12 +1,32 @@
+import codecs
+import csv
+import json
+import re
 from rest_framework import status, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, UnsupportedMediaType, Throttled
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
 from django.db.models import Q
-from datetime import datetime
-from .models import HydroponicSystem, Measurement
-from .serializers import MeasurementSerializer
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from .models import HourlyRollup, HydroponicSystem, Measurement
+from .serializers import MEASUREMENT_ROW_FIELDS, MeasurementSerializer, MeasurementUploadSerializer, measurement_rows
+from .buffer import BufferFull, get_buffer, write_behind_enabled
+from .ingestion import save_measurements
+from .filters import MEASUREMENT_SORT_FIELDS, fleet_measurement_filters, measurement_filters, measurement_ordering, rollup_filters
+from .pagination import MeasurementCursorPagination
+from .downsampling import downsample_measurements, downsample_params, rollup_series
+from .retention import check_value_filters, reaches_compacted
+from .changes import conditional_response, system_marker, validators, with_validators
+from .response_cache import cached_response
+from .export import EXPORT_FIELDS, FLEET_EXPORT_FIELDS, arrow_stream, csv_stream, ndjson_stream, parquet_stream
+from .renderers import ArrowStreamRenderer, CSVStreamRenderer, NDJSONStreamRenderer, ParquetRenderer
+from .columnar import COLUMNAR_RENDERER_CLASSES, is_columnar, measurement_columns, series_columns
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema, OpenApiExample, OpenApiParameter, inline_serializer, OpenApiResponse
 )
@@ -19,12 +39,24 @@ error_response_serializer = inline_serializer(
 )
 
 class MeasurementAPIView(APIView):
+    device_key_access = True
+    renderer_classes = COLUMNAR_RENDERER_CLASSES
     pagination = PageNumberPagination
+    cursor_pagination = MeasurementCursorPagination
 
     @extend_schema(
         tags=["Measurements"],
-        summary="Add a measurement to a hydroponic system",
-        description="Add a new measurement (pH, temperature, TDS) to a hydroponic system you own.",
+        summary="Add measurements to a hydroponic system",
+        description=(
+            "Add a new measurement (pH, temperature, TDS) to a hydroponic system you own. "
+            "A JSON array of measurements is also accepted and stored in a single batch; "
+            "if any item is invalid nothing is stored and errors are reported per item. "
+            "Readings may carry a `device_id` and `sequence` pair: a reading whose pair is already "
+            "stored for the system is not inserted again and is reported as a duplicate. "
+            "When write-behind ingestion is enabled, valid readings are queued and written "
+            "in batches; the response is then 202 with the number of accepted readings, "
+            "or 429 while the queue is full."
+        ),
         parameters=[
             OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int, description="ID of the hydroponic system")
         ],
@@ -42,8 +74,39 @@ class MeasurementAPIView(APIView):
                             "ph": 6.5,
                             "temperature": 22.5,
                             "tds": 900,
+                            "device_id": None,
+                            "sequence": None,
                             "system": 1
                         }
+                    ),
+                    OpenApiExample(
+                        name="Created Batch",
+                        value={
+                            "created": 1,
+                            "duplicates": [1],
+                            "results": [
+                                {"id": 18, "timestamp": "2025-02-17T12:22:43.652462Z", "ph": 6.5, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 42, "system": 1},
+                                {"id": 17, "timestamp": "2025-02-17T12:22:33.652462Z", "ph": 6.4, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 41, "system": 1}
+                            ]
+                        }
+                    )
+                ]
+            ),
+            200: OpenApiResponse(
+                description="Duplicate reading; the previously stored measurement is returned.",
+                response=MeasurementSerializer,
+            ),
+            202: OpenApiResponse(
+                description="Measurements queued for a batched write (write-behind mode).",
+                response=inline_serializer(
+                    name="MeasurementAcceptedResponse",
+                    fields={"accepted": serializers.IntegerField()}
+                ),
+                examples=[
+                    OpenApiExample(
+                        name="Accepted",
+                        value={"accepted": 1},
+                        status_codes=["202"]
                     )
                 ]
             ),
@@ -55,6 +118,11 @@ class MeasurementAPIView(APIView):
                         name="Missing Field",
                         value={"ph": ["This field is required."]},
                         status_codes=["400"]
+                    ),
+                    OpenApiExample(
+                        name="Invalid Batch Item",
+                        value=[{}, {"ph": ["Ensure this value is less than or equal to 14.0."]}],
+                        status_codes=["400"]
                     )
                 ]
             ),
@@ -68,6 +136,17 @@ class MeasurementAPIView(APIView):
                         status_codes=["403"]
                     )
                 ]
+            ),
+            429: OpenApiResponse(
+                description="Write-behind queue is full, retry later",
+                response=error_response_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Buffer Full",
+                        value={"detail": "Ingestion buffer is full."},
+                        status_codes=["429"]
+                    )
+                ]
             )
         }
     )
@@ -77,17 +156,58 @@ class MeasurementAPIView(APIView):
         except HydroponicSystem.DoesNotExist:
             raise PermissionDenied("You do not have permission to add measurements in this system.")
 
-        serializer = MeasurementSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(system=system)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        many = isinstance(request.data, list)
+        if many:
+            serializer = MeasurementSerializer(
+                data=request.data,
+                many=True,
+                allow_empty=False,
+                max_length=getattr(settings, 'MEASUREMENT_CONFIG', {}).get('BULK_MAX_ITEMS', 1000),
+            )
+        else:
+            serializer = MeasurementSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data if many else [serializer.validated_data]
+        measurements = [Measurement(system=system, **item) for item in items]
+
+        if write_behind_enabled():
+            buffer = get_buffer()
+            try:
+                buffer.put_many(measurements)
+            except BufferFull as error:
+                raise Throttled(wait=buffer.flush_interval, detail=str(error))
+            return Response({"accepted": len(measurements)}, status=status.HTTP_202_ACCEPTED)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        results = save_measurements(measurements)
+        created = sum(1 for _, is_new in results if is_new)
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+
+        if not many:
+            return Response(MeasurementSerializer(results[0][0]).data, status=response_status)
+
+        return Response({
+            "created": created,
+            "duplicates": [index for index, (_, is_new) in enumerate(results) if not is_new],
+            "results": MeasurementSerializer([measurement for measurement, _ in results], many=True).data,
+        }, status=response_status)
 
     @extend_schema(
         tags=["Measurements"],
         summary="List measurements for a hydroponic system",
-        description="Returns a paginated, filterable list of measurements for a system you own.",
+        description=(
+            "Returns a paginated, filterable list of measurements for a system you own. "
+            "Pass `pagination=cursor` to page with opaque `next`/`previous` cursors instead of page "
+            "numbers; cursor pages cost the same at any depth. Add `count=false` to skip the total count. "
+            "With `downsample=lttb&points=N` the filtered range is instead returned unpaginated as one "
+            "series per metric, reduced to N points with Largest-Triangle-Three-Buckets. "
+            "Readings before the system's `raw_compacted_before` were compacted into hourly rollups: "
+            "pages no longer list them, and downsampled series use their hourly averages (a pH, "
+            "temperature or TDS filter is then rejected). "
+            "`format=columnar` returns `results` (or each series) as parallel arrays."
+        ),
         parameters=[
             OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int),
             OpenApiParameter(name="ph_min", type=float, location=OpenApiParameter.QUERY),
@@ -97,9 +217,15 @@ class MeasurementAPIView(APIView):
             OpenApiParameter(name="tds_min", type=int, location=OpenApiParameter.QUERY),
             OpenApiParameter(name="tds_max", type=int, location=OpenApiParameter.QUERY),
             OpenApiParameter(name="timestamp_after", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
-            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
-            OpenApiParameter(name="sort_by", type=str, location=OpenApiParameter.QUERY, description="Field to sort by (default: timestamp)"),
-            OpenApiParameter(name="sort_order", type=str, location=OpenApiParameter.QUERY, description="asc or desc (default: asc)")
+            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD, the whole day is included"),
+            OpenApiParameter(name="sort_by", type=str, location=OpenApiParameter.QUERY, enum=MEASUREMENT_SORT_FIELDS, description="Field to sort by (default: timestamp)"),
+            OpenApiParameter(name="sort_order", type=str, location=OpenApiParameter.QUERY, description="asc or desc (default: asc)"),
+            OpenApiParameter(name="pagination", type=str, location=OpenApiParameter.QUERY, description="page or cursor (default: page)"),
+            OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY, description="Cursor taken from a previous `next` or `previous` link"),
+            OpenApiParameter(name="count", type=bool, location=OpenApiParameter.QUERY, description="Include the total count with cursor pagination (default: true)"),
+            OpenApiParameter(name="downsample", type=str, location=OpenApiParameter.QUERY, enum=["lttb"], description="Return a downsampled series per metric instead of a page"),
+            OpenApiParameter(name="points", type=int, location=OpenApiParameter.QUERY, description="Points per downsampled series (default: 1000)"),
+            OpenApiParameter(name="format", type=str, location=OpenApiParameter.QUERY, enum=["json", "columnar"], description="Response layout (default: json)")
         ],
         responses={
             200: OpenApiResponse(
@@ -139,17 +265,53 @@ class MeasurementAPIView(APIView):
                                 }
                             ]
                         }
+                    ),
+                    OpenApiExample(
+                        name="Downsampled",
+                        value={
+                            "downsample": "lttb",
+                            "points": 3,
+                            "count": 8640,
+                            "series": {
+                                "ph": [
+                                    {"timestamp": "2025-02-16T00:00:00Z", "value": 6.4},
+                                    {"timestamp": "2025-02-16T13:41:20Z", "value": 7.9},
+                                    {"timestamp": "2025-02-16T23:59:50Z", "value": 6.5}
+                                ],
+                                "temperature": ["..."],
+                                "tds": ["..."]
+                            }
+                        }
+                    ),
+                    OpenApiExample(
+                        name="Columnar",
+                        value={
+                            "count": 2,
+                            "next": None,
+                            "previous": None,
+                            "results": {
+                                "timestamps": ["2025-02-17T11:56:38.938336Z", "2025-02-17T12:00:00Z"],
+                                "ph": [6.4, 6.8],
+                                "temperature": [24.5, 25.0],
+                                "tds": [500, 480]
+                            }
+                        }
                     )
                 ]
             ),
             400: OpenApiResponse(
-                description="Bad request (e.g. invalid timestamp)",
+                description="Bad request (e.g. invalid timestamp or cursor)",
                 response=error_response_serializer,
                 examples=[
                     OpenApiExample(
                         name="Invalid Timestamp",
                         value={"detail": "Invalid timestamp format. Expected format: YYYY-MM-DD."},
                         status_codes=["400"]
+                    ),
+                    OpenApiExample(
+                        name="Invalid Cursor",
+                        value={"detail": "Invalid cursor."},
+                        status_codes=["400"]
                     )
                 ]
             ),
@@ -172,57 +334,322 @@ class MeasurementAPIView(APIView):
         except HydroponicSystem.DoesNotExist:
             raise PermissionDenied("You do not have permission to this system")
 
-        filters = Q(system=system)
-
-        ph_min = request.query_params.get("ph_min")
-        ph_max = request.query_params.get("ph_max")
-        temp_min = request.query_params.get("temperature_min")
-        temp_max = request.query_params.get("temperature_max")
-        tds_min = request.query_params.get("tds_min")
-        tds_max = request.query_params.get("tds_max")
-        timestamp_after = request.query_params.get("timestamp_after")
-        timestamp_before = request.query_params.get("timestamp_before")
-
-        if ph_min:
-            filters &= Q(ph__gte=ph_min)
-        if ph_max:
-            filters &= Q(ph__lte=ph_max)
-        if temp_min:
-            filters &= Q(temperature__gte=temp_min)
-        if temp_max:
-            filters &= Q(temperature__lte=temp_max)
-        if tds_min:
-            filters &= Q(tds__gte=tds_min)
-        if tds_max:
-            filters &= Q(tds__lte=tds_max)
+        filters = measurement_filters(system, request.query_params)
+        marker = system_marker(system)
+        etag, last_modified = validators(marker, "measurements", system.id, request.accepted_renderer.format)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = cached_response(request, marker, ("measurements", system.id), lambda: self.list_measurements(request, system, filters))
+        return with_validators(response, etag, last_modified)
+
+    def list_measurements(self, request, system, filters):
+        if "downsample" in request.query_params:
+            method, points = downsample_params(request.query_params)
+            measurements = Measurement.objects.filter(filters)
+            history = None
+            check_value_filters(system, request.query_params)
+            if reaches_compacted(system, request.query_params):
+                compacted = rollup_filters(system, request.query_params) & Q(bucket__lt=system.raw_compacted_before)
+                history = rollup_series(HourlyRollup.objects.filter(compacted))
+                measurements = measurements.filter(timestamp__gte=system.raw_compacted_before)
+            count, series = downsample_measurements(measurements, points, history)
+            if is_columnar(request):
+                series = {metric: series_columns(points) for metric, points in series.items()}
+            return Response({"downsample": method, "points": points, "count": count, "series": series})
+
+        ordering = measurement_ordering(request.query_params)
+
+        measurements = Measurement.objects.filter(filters).order_by(ordering).values_list(*MEASUREMENT_ROW_FIELDS, named=True)
+
+        if request.query_params.get("pagination") == "cursor" or "cursor" in request.query_params:
+            paginator = self.cursor_pagination()
+        else:
+            paginator = self.pagination()
+        paginated_measurements = paginator.paginate_queryset(measurements, request)
+
+        if is_columnar(request):
+            return paginator.get_paginated_response(measurement_columns(paginated_measurements))
+        return paginator.get_paginated_response(measurement_rows(paginated_measurements))
+
+
+upload_summary_serializer = inline_serializer(
+    name="MeasurementUploadSummary",
+    fields={
+        "inserted": serializers.IntegerField(),
+        "rejected": serializers.IntegerField(),
+        "duplicates": serializers.IntegerField(),
+        "errors": serializers.ListField(child=serializers.DictField()),
+    }
+)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+
+
+class MeasurementUploadAPIView(APIView):
+    device_key_access = True
 
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Upload historical measurements",
+        description=(
+            "Backfill a hydroponic system you own from an NDJSON (`application/x-ndjson`) or "
+            "CSV (`text/csv`, with a header row) request body. The body is consumed as a stream "
+            "and rows are stored in fixed-size chunks. Every row needs its own `timestamp`; "
+            "rows failing validation are skipped and reported with their line number. A leading "
+            "UTF-8 byte order mark, as written by Excel, is ignored."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int, description="ID of the hydroponic system")
+        ],
+        request={
+            "application/x-ndjson": OpenApiTypes.STR,
+            "text/csv": OpenApiTypes.STR,
+        },
+        responses={
+            201: OpenApiResponse(
+                description="Upload processed, at least one row stored.",
+                response=upload_summary_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Processed",
+                        value={
+                            "inserted": 1439,
+                            "rejected": 1,
+                            "duplicates": 0,
+                            "errors": [{"line": 17, "errors": {"ph": ["Ensure this value is less than or equal to 14.0."]}}]
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Nothing could be stored",
+                response=upload_summary_serializer,
+            ),
+            403: OpenApiResponse(
+                description="User does not own the system",
+                response=error_response_serializer,
+            ),
+            415: OpenApiResponse(
+                description="Unsupported content type",
+                response=error_response_serializer,
+            ),
+        }
+    )
+    def post(self, request, system_id):
         try:
-            if timestamp_after:
-                filters &= Q(timestamp__gte=datetime.strptime(timestamp_after, "%Y-%m-%d"))
-            if timestamp_before:
-                filters &= Q(timestamp__lte=datetime.strptime(timestamp_before, "%Y-%m-%d"))
-        except ValueError:
-            return Response(
-                {"detail": "Invalid timestamp format. Expected format: YYYY-MM-DD."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+            system = HydroponicSystem.objects.get(id=system_id, owner=request.user)
+        except HydroponicSystem.DoesNotExist:
+            raise PermissionDenied("You do not have permission to add measurements in this system.")
 
-        sort_by = request.query_params.get("sort_by", "timestamp")
-        sort_order = request.query_params.get("sort_order", "asc")
+        media_type = (request.content_type or "").split(";")[0].strip().lower()
+        if media_type in NDJSON_MEDIA_TYPES:
+            rows = self.read_ndjson(request.stream)
+        elif media_type in CSV_MEDIA_TYPES:
+            rows = self.read_csv(request.stream)
+        else:
+            raise UnsupportedMediaType(media_type)
 
-        if sort_order not in ["asc", "desc"]:
-            return Response(
-                {"detail": "Invalid value for 'sort_order'. Use 'asc' or 'desc'."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+        chunk_size = config.get('UPLOAD_CHUNK_SIZE', 1000)
+        max_reported_errors = config.get('UPLOAD_MAX_REPORTED_ERRORS', 100)
 
-        if sort_order == "desc":
-            sort_by = f"-{sort_by}"
+        inserted = 0
+        rejected = 0
+        duplicates = 0
+        errors = []
+        chunk = []
 
-        measurements = Measurement.objects.filter(filters).order_by(sort_by)
+        for line, row in rows:
+            if isinstance(row, dict):
+                serializer = MeasurementUploadSerializer(data=row)
+                if serializer.is_valid():
+                    chunk.append(Measurement(system=system, **serializer.validated_data))
+                    if len(chunk) >= chunk_size:
+                        created = self.save_chunk(chunk)
+                        inserted += created
+                        duplicates += len(chunk) - created
+                        chunk = []
+                    continue
+                row_errors = serializer.errors
+            else:
+                row_errors = {"detail": row}
 
-        paginator = self.pagination()
-        paginated_measurements = paginator.paginate_queryset(measurements, request)
+            rejected += 1
+            if len(errors) < max_reported_errors:
+                errors.append({"line": line, "errors": row_errors})
+
+        if chunk:
+            created = self.save_chunk(chunk)
+            inserted += created
+            duplicates += len(chunk) - created
+
+        if inserted:
+            response_status = status.HTTP_201_CREATED
+        elif duplicates:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"inserted": inserted, "rejected": rejected, "duplicates": duplicates, "errors": errors},
+            status=response_status,
+        )
+
+    @staticmethod
+    def save_chunk(chunk):
+        return sum(1 for _, created in save_measurements(chunk) if created)
+
+    @staticmethod
+    def read_ndjson(stream):
+        if stream is None:
+            return
+        for line, raw in enumerate(codecs.iterdecode(stream, "utf-8-sig"), start=1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                row = json.loads(raw)
+            except ValueError:
+                yield line, "Invalid JSON."
+                continue
+            yield line, row if isinstance(row, dict) else "Expected a JSON object."
+
+    @staticmethod
+    def read_csv(stream):
+        if stream is None:
+            return
+        reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+        for row in reader:
+            row = {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+            if row:
+                yield reader.line_num, row
+
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+EXPORT_FORMATS = [renderer.format for renderer in (CSVStreamRenderer, NDJSONStreamRenderer, ArrowStreamRenderer, ParquetRenderer)]
+
+
+class MeasurementExportAPIView(APIView):
+    renderer_classes = [CSVStreamRenderer, NDJSONStreamRenderer, ArrowStreamRenderer, ParquetRenderer]
+
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Export the measurement history of a hydroponic system",
+        description=(
+            "Streams every measurement matching the filters of the measurement listing as CSV "
+            "(`text/csv`, with a header row), NDJSON (`application/x-ndjson`), an Arrow IPC stream "
+            "(`application/vnd.apache.arrow.stream`) or Parquet (`application/vnd.apache.parquet`), "
+            "chosen with the `Accept` header or `format`. The columns are those accepted by the "
+            "upload endpoint; Arrow and Parquet columns are typed, with UTC timestamps, and need "
+            "pyarrow on the server. Except for Parquet, the body is gzip-encoded when the request "
+            "sends `Accept-Encoding: gzip`."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int),
+            OpenApiParameter(name="ph_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="ph_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_min", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_max", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="timestamp_after", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
+            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD, the whole day is included"),
+            OpenApiParameter(name="sort_by", type=str, location=OpenApiParameter.QUERY, enum=MEASUREMENT_SORT_FIELDS, description="Field to sort by (default: timestamp)"),
+            OpenApiParameter(name="sort_order", type=str, location=OpenApiParameter.QUERY, description="asc or desc (default: asc)"),
+            OpenApiParameter(name="format", type=str, location=OpenApiParameter.QUERY, enum=EXPORT_FORMATS, description="Export format (default: csv)"),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, "application/vnd.apache.arrow.stream"): OpenApiTypes.BINARY,
+            (200, "application/vnd.apache.parquet"): OpenApiTypes.BINARY,
+            400: OpenApiResponse(description="Invalid filter", response=error_response_serializer),
+            403: OpenApiResponse(description="Permission denied", response=error_response_serializer),
+            406: OpenApiResponse(description="Format not available", response=error_response_serializer),
+        }
+    )
+    def get(self, request, system_id):
+        try:
+            system = HydroponicSystem.objects.get(id=system_id, owner=request.user)
+        except HydroponicSystem.DoesNotExist:
+            raise PermissionDenied("You do not have permission to this system")
+
+        filters = measurement_filters(system, request.query_params)
+        measurements = Measurement.objects.filter(filters).order_by(measurement_ordering(request.query_params))
+        return self.export(request, measurements, EXPORT_FIELDS, f"system-{system.id}-measurements")
+
+    def export(self, request, measurements, fields, filename):
+        config = getattr(settings, 'MEASUREMENT_CONFIG', {})
+        chunk_size = config.get('EXPORT_CHUNK_SIZE', 2000)
+
+        renderer = request.accepted_renderer
+        if renderer.format == ParquetRenderer.format:
+            stream = parquet_stream(measurements, chunk_size, config.get('EXPORT_ROW_GROUP_SIZE', 100000), fields)
+        else:
+            stream = {
+                CSVStreamRenderer.format: csv_stream,
+                NDJSONStreamRenderer.format: ndjson_stream,
+                ArrowStreamRenderer.format: arrow_stream,
+            }[renderer.format](measurements, chunk_size, fields)
+
+        content_type = f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+        # Parquet pages are compressed already.
+        if renderer.format != ParquetRenderer.format and ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            response = StreamingHttpResponse(compress_sequence(stream), content_type=content_type)
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = StreamingHttpResponse(stream, content_type=content_type)
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{renderer.format}"'
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
 
-        serializer = MeasurementSerializer(paginated_measurements, many=True)
-        return paginator.get_paginated_response(serializer.data)
+    # The export renderers cannot render error details; errors are always JSON.
+    def handle_exception(self, exc):
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+
+class FleetExportAPIView(MeasurementExportAPIView):
+
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Export the measurement history of all your hydroponic systems",
+        description=(
+            "Like the export of one system, for every system you own, ordered by system first and "
+            "with a leading `system_id` column. Streams the measurements as CSV "
+            "(`text/csv`, with a header row), NDJSON (`application/x-ndjson`), an Arrow IPC stream "
+            "(`application/vnd.apache.arrow.stream`) or Parquet (`application/vnd.apache.parquet`), "
+            "chosen with the `Accept` header or `format`. The columns are those accepted by the "
+            "upload endpoint; Arrow and Parquet columns are typed, with UTC timestamps, and need "
+            "pyarrow on the server. Except for Parquet, the body is gzip-encoded when the request "
+            "sends `Accept-Encoding: gzip`."
+        ),
+        parameters=[
+            OpenApiParameter(name="ph_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="ph_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_min", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_max", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="timestamp_after", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
+            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD, the whole day is included"),
+            OpenApiParameter(name="sort_by", type=str, location=OpenApiParameter.QUERY, enum=MEASUREMENT_SORT_FIELDS, description="Field to sort by within each system (default: timestamp)"),
+            OpenApiParameter(name="sort_order", type=str, location=OpenApiParameter.QUERY, description="asc or desc (default: asc)"),
+            OpenApiParameter(name="format", type=str, location=OpenApiParameter.QUERY, enum=EXPORT_FORMATS, description="Export format (default: csv)"),
+        ],
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, "application/vnd.apache.arrow.stream"): OpenApiTypes.BINARY,
+            (200, "application/vnd.apache.parquet"): OpenApiTypes.BINARY,
+            400: OpenApiResponse(description="Invalid filter", response=error_response_serializer),
+            406: OpenApiResponse(description="Format not available", response=error_response_serializer),
+        }
+    )
+    def get(self, request):
+        filters = fleet_measurement_filters(request.user, request.query_params)
+        measurements = Measurement.objects.filter(filters).order_by("system_id", measurement_ordering(request.query_params))
+        return self.export(request, measurements, FLEET_EXPORT_FIELDS, "measurements")
@@ -1,17 +1,56 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import F, Func
+from django.db.models.functions import Greatest
+from django.contrib.postgres.indexes import BrinIndex
+from django.utils import timezone
 
 from HydroponicSystem_authentication.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+class ActiveSystemManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class HydroponicSystem(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     location = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Days of raw measurements to keep; older ones are compacted into the hourly rollups.
+    # Empty uses MEASUREMENT_RAW_RETENTION_DAYS.
+    raw_retention_days = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(1)])
+    # Raw measurements before this time have been compacted; reads of that range use the rollups.
+    raw_compacted_before = models.DateTimeField(blank=True, null=True)
+    # Set when the system is deleted; its rows are purged in the background, see purge.py.
+    deleted_at = models.DateTimeField(blank=True, null=True)
+    # Change markers (see changes.py): updated_at follows the system's own fields, changed_at
+    # also every change to its measurements and rollups.
+    updated_at = models.DateTimeField(auto_now=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    objects = ActiveSystemManager()
+    all_objects = models.Manager()
+
+    # Saving moves changed_at forward in the database rather than writing back the value the
+    # instance was loaded with, which a concurrent mark_changed() may have moved past.
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.changed_at = Greatest(
+                Func(function="clock_timestamp", output_field=models.DateTimeField()),
+                F("changed_at") + timedelta(microseconds=1),
+            )
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "changed_at", "updated_at"}
+        super().save(*args, **kwargs)
+        if isinstance(self.changed_at, Greatest):
+            self.refresh_from_db(fields=["changed_at"])
 
 class Measurement(models.Model):
-    system = models.ForeignKey(HydroponicSystem, on_delete=models.CASCADE)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Indexed through measurement_system_ts_idx below, whose leading column is system.
+    system = models.ForeignKey(HydroponicSystem, on_delete=models.CASCADE, db_index=False)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     ph = models.FloatField(
         validators=[MinValueValidator(0.0), MaxValueValidator(14.0)],
@@ -23,4 +62,67 @@ class Measurement(models.Model):
 
     tds = models.IntegerField(
         validators=[MinValueValidator(0)],
-    )
\ No newline at end of file
+    )
+
+    device_id = models.CharField(max_length=64, blank=True, null=True)
+    sequence = models.BigIntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['system', 'device_id', 'sequence'],
+                name='unique_measurement_device_sequence',
+            ),
+        ]
+        indexes = [
+            # Serves per-system time ranges in either direction, with id as the tie-breaker, and
+            # lets value filters and aggregates be answered from the index alone.
+            models.Index(
+                fields=['system', 'timestamp', 'id'],
+                include=['ph', 'temperature', 'tds'],
+                name='measurement_system_ts_idx',
+            ),
+            # A few pages per gigabyte; used for fleet-wide time range scans on very large tables.
+            BrinIndex(fields=['timestamp'], autosummarize=True, name='measurement_ts_brin'),
+        ]
+
+class DeviceKey(models.Model):
+    system = models.ForeignKey(HydroponicSystem, on_delete=models.CASCADE, related_name='device_keys')
+    name = models.CharField(max_length=255, blank=True)
+    prefix = models.CharField(max_length=16)
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    revoked_at = models.DateTimeField(blank=True, null=True)
+
+class MeasurementRollup(models.Model):
+    # Indexed through the (system, bucket) unique constraint below.
+    system = models.ForeignKey(HydroponicSystem, on_delete=models.CASCADE, related_name='%(class)ss', db_index=False)
+    bucket = models.DateTimeField()
+    count = models.BigIntegerField()
+
+    ph_sum = models.FloatField()
+    ph_sum_sq = models.FloatField()
+    ph_min = models.FloatField()
+    ph_max = models.FloatField()
+
+    temperature_sum = models.FloatField()
+    temperature_sum_sq = models.FloatField()
+    temperature_min = models.FloatField()
+    temperature_max = models.FloatField()
+
+    tds_sum = models.FloatField()
+    tds_sum_sq = models.FloatField()
+    tds_min = models.IntegerField()
+    tds_max = models.IntegerField()
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(fields=['system', 'bucket'], name='%(class)s_system_bucket'),
+        ]
+
+class HourlyRollup(MeasurementRollup):
+    pass
+
+class DailyRollup(MeasurementRollup):
+    pass
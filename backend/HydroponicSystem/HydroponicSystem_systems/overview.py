@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.db.models import Max, Min, OuterRef, Subquery
+from django.db.models.functions import JSONObject
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .aggregation import METRICS
+from .models import HourlyRollup, Measurement
+
+
+# Annotates each system with its newest reading and its last-24h ranges as correlated
+# subqueries, so a whole page of systems is read in a single statement. The ranges come
+# from the hourly rollups and cover the 24 whole hours before the current one, plus the
+# current hour so far.
+def with_overview(queryset):
+    now = timezone.now()
+    since = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=24)
+
+    latest = Measurement.objects.filter(system=OuterRef("pk")).order_by("-timestamp", "-id").values(
+        reading=JSONObject(id="id", timestamp="timestamp", ph="ph", temperature="temperature", tds="tds")
+    )[:1]
+    ranges = HourlyRollup.objects.filter(system=OuterRef("pk"), bucket__gte=since).values("system").annotate(
+        ranges=JSONObject(**{
+            metric: JSONObject(min=Min(f"{metric}_min"), max=Max(f"{metric}_max"))
+            for metric in METRICS
+        })
+    ).values("ranges")
+
+    return queryset.annotate(latest_reading=Subquery(latest), last_24h=Subquery(ranges))
+
+
+def overview_item(system, system_data):
+    latest = system.latest_reading
+    if latest is not None:
+        latest["timestamp"] = parse_datetime(latest["timestamp"])
+    return {**system_data, "latest_measurement": latest, "last_24h": system.last_24h}
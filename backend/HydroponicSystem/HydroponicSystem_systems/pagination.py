@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+CURSOR_FIELDS = ("timestamp", "id", "ph", "temperature", "tds")
+
+
+class MeasurementCursorPagination:
+    """
+    Keyset pagination over (sort field, id): every page is an index range scan that starts
+    where the previous one stopped, so page 5000 costs the same as page 1.
+    """
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        ordering = queryset.query.order_by[0] if queryset.query.order_by else "timestamp"
+        self.descending = ordering.startswith("-")
+        self.field = ordering.lstrip("-")
+        if self.field not in CURSOR_FIELDS:
+            raise ParseError(f"Cursor pagination cannot sort by '{self.field}'. Use one of: {', '.join(CURSOR_FIELDS)}.")
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, "true").lower() not in ("false", "0", "no"):
+            self.count = queryset.order_by().count()
+
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        backwards = cursor is not None and cursor["d"] == "prev"
+        # Walking backwards reverses the order so the same index range scan can be used.
+        descending = self.descending != backwards
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}id")
+
+        if cursor is not None:
+            value = cursor["v"]
+            if self.field == "timestamp":
+                value = datetime.fromisoformat(value)
+            if descending:
+                queryset = queryset.filter(
+                    Q(**{f"{self.field}__lte": value}),
+                    Q(**{f"{self.field}__lt": value}) | Q(**{self.field: value, "id__lt": cursor["id"]}),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{self.field}__gte": value}),
+                    Q(**{f"{self.field}__gt": value}) | Q(**{self.field: value, "id__gt": cursor["id"]}),
+                )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        response_data = {}
+        if self.count is not None:
+            response_data["count"] = self.count
+        response_data["next"] = self.get_next_link()
+        response_data["previous"] = self.get_previous_link()
+        response_data["results"] = data
+        return Response(response_data)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], "next")
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_link(self.page[0], "prev")
+
+    def build_link(self, measurement, direction):
+        value = getattr(measurement, self.field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        token = {
+            "f": self.field,
+            "o": "desc" if self.descending else "asc",
+            "v": value,
+            "id": measurement.id,
+            "d": direction,
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(token, separators=(",", ":")).encode()).decode().rstrip("=")
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            token = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+            valid = (
+                token["f"] == self.field
+                and token["o"] == ("desc" if self.descending else "asc")
+                and token["d"] in ("next", "prev")
+                and isinstance(token["id"], int)
+            )
+            if valid and self.field == "timestamp":
+                datetime.fromisoformat(token["v"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            valid = False
+        if not valid:
+            raise ParseError("Invalid cursor.")
+        return token
+
+
+# Large enough for a whole account's fleet in one request.
+class SystemOverviewPagination(PageNumberPagination):
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 1000
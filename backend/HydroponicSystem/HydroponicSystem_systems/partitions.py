@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from .changes import mark_changed
+from .models import Measurement
+from .retention import advance_compaction_mark
+
+# Monthly range partitions of the measurement table by timestamp (UTC months), named
+# <table>_pYYYY_MM, plus a default partition for readings outside every month created so far.
+#
+# PostgreSQL requires unique constraints on a partitioned table to include the partition key,
+# so the primary key becomes (id, timestamp) and the (system, device_id, sequence) key is a
+# unique index on each partition. save_measurements keeps the key unique across partitions by
+# looking it up while holding the system's lock; rows written around it with raw SQL are only
+# checked within their month. Measurement's model state still declares the single-column key
+# and the UniqueConstraint, so migrations must not alter them on a converted table.
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def measurement_table():
+    return Measurement._meta.db_table
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month):
+    return f"{measurement_table()}_p{month:%Y_%m}"
+
+
+def default_partition_name():
+    return f"{measurement_table()}_default"
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [qn(measurement_table())])
+        return cursor.fetchone() is not None
+
+
+# Month partitions of the table, oldest first, as (month, name) pairs.
+def month_partitions():
+    prefix = f"{measurement_table()}_p"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [qn(measurement_table())],
+        )
+        names = [name for name, in cursor.fetchall() if name.startswith(prefix)]
+    return sorted(
+        (datetime.strptime(name[len(prefix):], "%Y_%m").replace(tzinfo=timezone.utc), name)
+        for name in names
+    )
+
+
+# Django's foreign keys are checked at commit; a table with checks still pending from earlier
+# writes in the transaction cannot be dropped, so they run first.
+def flush_deferred_checks(cursor):
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+def _device_sequence_index(cursor, partition):
+    cursor.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {qn(partition + '_device_seq')} "
+        f"ON {qn(partition)} (system_id, device_id, sequence)"
+    )
+
+
+# Readings that arrived in the default partition before their month existed are moved into
+# the new partition; PostgreSQL refuses to create it while the default holds rows of its range.
+def _create_partition(cursor, month):
+    table, name, default = measurement_table(), partition_name(month), default_partition_name()
+    bounds = [month, add_months(month, 1)]
+    cursor.execute(f"CREATE TEMPORARY TABLE early_readings (LIKE {qn(table)}) ON COMMIT DROP")
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {qn(default)} WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+        f"INSERT INTO early_readings SELECT * FROM moved",
+        bounds,
+    )
+    cursor.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)", bounds)
+    _device_sequence_index(cursor, name)
+    cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM early_readings")
+    cursor.execute("DROP TABLE early_readings")
+
+
+# Creates the partitions of the given months that do not exist yet; returns their names.
+def create_partitions(months):
+    existing = {name for _, name in month_partitions()}
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month in months:
+            if partition_name(month) not in existing:
+                _create_partition(cursor, month)
+                created.append(partition_name(month))
+    return created
+
+
+def upcoming_months(months_ahead, now=None):
+    current = month_start(now or datetime.now(timezone.utc))
+    return [add_months(current, offset) for offset in range(months_ahead + 1)]
+
+
+# Months whose partitions fall entirely before the retention window: the current month plus
+# the retention_months before it are kept.
+def expired_partitions(retention_months, now=None):
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -retention_months)
+    return [(month, name) for month, name in month_partitions() if add_months(month, 1) <= cutoff]
+
+
+# Detaches a month partition and, unless detach_only, drops it. Returns the ids of the systems
+# that had rows in it, so their caches can be invalidated.
+# The systems with readings in the partition switch that range to the rollups, which keep
+# its history, in the same transaction: raw_compacted_before moves to compacted_before.
+def remove_partition(name, compacted_before, detach_only=False):
+    with transaction.atomic(), connection.cursor() as cursor:
+        flush_deferred_checks(cursor)
+        cursor.execute(f"SELECT DISTINCT system_id FROM {qn(name)}")
+        system_ids = [system_id for system_id, in cursor.fetchall()]
+        # Before the DDL: ingestion locks its systems before it takes table locks.
+        mark_changed(system_ids)
+        advance_compaction_mark(system_ids, compacted_before)
+        cursor.execute(f"ALTER TABLE {qn(measurement_table())} DETACH PARTITION {qn(name)}")
+        if not detach_only:
+            cursor.execute(f"DROP TABLE {qn(name)}")
+    return system_ids
+
+
+# One-time conversion of the plain measurement table: the rows are copied into a partitioned
+# table with a partition per month from the oldest reading through months_ahead, then the
+# indexes and foreign keys are recreated on the parent. Runs in one transaction holding an
+# exclusive lock on the table, so plan a maintenance window for large tables.
+def convert_to_partitioned(months_ahead, now=None):
+    table = measurement_table()
+    staging = f"{table}_unpartitioned"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        flush_deferred_checks(cursor)
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+        bounds = Measurement.objects.aggregate(first=Min("timestamp"), last_id=Max("id"))
+
+        cursor.execute(
+            """
+            SELECT pg_get_indexdef(pg_index.indexrelid)
+            FROM pg_index
+            WHERE pg_index.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+            """,
+            [qn(table)],
+        )
+        indexes = [definition for definition, in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [qn(table)],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(staging)}")
+        cursor.execute(f'CREATE TABLE {qn(table)} (LIKE {qn(staging)} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+        cursor.execute(f"CREATE TABLE {qn(default_partition_name())} PARTITION OF {qn(table)} DEFAULT")
+        _device_sequence_index(cursor, default_partition_name())
+
+        current = month_start(now or datetime.now(timezone.utc))
+        month = month_start(bounds["first"]) if bounds["first"] else current
+        last = add_months(current, months_ahead)
+        while month <= last:
+            _create_partition(cursor, month)
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(staging)}")
+        cursor.execute(f"DROP TABLE {qn(staging)}")
+
+        # The id identity went with the old table; ids continue from a sequence owned by the new one.
+        sequence = f"{table}_id_seq"
+        cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{qn(sequence)}')")
+        if bounds["last_id"]:
+            cursor.execute("SELECT setval(%s, %s)", [qn(sequence), bounds["last_id"]])
+
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, "timestamp")')
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+        for definition in indexes:
+            cursor.execute(definition.replace(qn(staging), qn(table)))
+        cursor.execute(f"ANALYZE {qn(table)}")
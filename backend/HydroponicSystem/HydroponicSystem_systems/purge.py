@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from HydroponicSystem_jobs.queue import enqueue
+
+from .authentication import device_key_cache
+from .changes import mark_changed
+from .latest import invalidate_latest_measurements
+from .models import DailyRollup, HourlyRollup, HydroponicSystem, Measurement
+
+# Deleting a system only marks it deleted, which hides it (the default manager skips it) and
+# its device keys at once. Its rows go afterwards in short batches, in a purge_system job:
+# letting the ORM cascade would delete a long history in one transaction. A purge that stops
+# halfway is retried by the job runner, or finished by the purge_deleted_systems command.
+
+
+def purge_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+def soft_delete_system(system):
+    with transaction.atomic():
+        now = timezone.now()
+        HydroponicSystem.objects.filter(id=system.id).update(deleted_at=now, updated_at=now)
+        mark_changed([system.id])
+        key_hashes = list(system.device_keys.values_list('key_hash', flat=True))
+        if purge_config().get('PURGE_IN_BACKGROUND', True):
+            enqueue("purge_system", {"system_id": system.id}, owner=system.owner)
+        else:
+            transaction.on_commit(lambda: purge_system(system.id, purge_config().get('PURGE_BATCH_SIZE', 5000)))
+
+    for key_hash in key_hashes:
+        device_key_cache().delete(key_hash)
+    invalidate_latest_measurements([system.id])
+
+
+def delete_measurement_batch(system_id, batch_size):
+    qn = connection.ops.quote_name
+    table = qn(Measurement._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE system_id = %s AND id IN ("
+            f"SELECT id FROM {table} WHERE system_id = %s LIMIT %s)",
+            [system_id, system_id, batch_size],
+        )
+        return cursor.rowcount
+
+
+# Deletes a deleted system's measurements batch_size rows per transaction, then its rollups,
+# keys and the system row itself. progress, if given, is called with the running count after
+# each batch. Returns the number of measurements deleted.
+def purge_system(system_id, batch_size, progress=None):
+    deleted = 0
+    while True:
+        batch = delete_measurement_batch(system_id, batch_size)
+        deleted += batch
+        if progress is not None:
+            progress(deleted)
+        if batch < batch_size:
+            break
+
+    with transaction.atomic():
+        HourlyRollup.objects.filter(system_id=system_id).delete()
+        DailyRollup.objects.filter(system_id=system_id).delete()
+        HydroponicSystem.all_objects.filter(id=system_id, deleted_at__isnull=False).delete()
+    return deleted
+
@@ -0,0 +1,71 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Drop-in JSONRenderer that encodes with orjson when it is installed. The output matches
+# JSONRenderer with the default UNICODE_JSON/COMPACT_JSON settings; anything orjson does not
+# encode natively (datetimes included, so their format stays DRF's) goes through the DRF
+# encoder. Indented output, non-default JSON settings and encode errors use JSONRenderer.
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not (api_settings.UNICODE_JSON and api_settings.COMPACT_JSON):
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+# Selected with ?format=columnar; views check request.accepted_renderer.format and return
+# parallel arrays instead of one object per row. The body itself is plain JSON.
+class ColumnarJSONRenderer(FastJSONRenderer):
+    format = "columnar"
+
+
+# Content negotiation only: views answering with these formats stream the body themselves
+# (StreamingHttpResponse), so there is nothing to render.
+class CSVStreamRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class NDJSONStreamRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class ParquetRenderer(BaseRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
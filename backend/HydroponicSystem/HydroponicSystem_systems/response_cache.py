@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+STATS = ("hits", "misses")
+
+
+def response_cache_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+# TTL and size limits are those of the cache backend (timeout and max_entries in
+# RESPONSE_CACHE_URL for the default in-process cache).
+def response_cache():
+    return caches[response_cache_config().get('RESPONSE_CACHE_ALIAS', 'responses')]
+
+
+# Entries are keyed by the change marker of the system or owner (see changes.py). Markers are
+# read from the database, so a committed write from any process makes the old entries
+# unreachable instead of deleting them; they age out of the cache. Every process may keep its
+# own in-process cache. The absolute path is part of the key because pagination links embed
+# the host.
+def response_key(request, marker, *scope):
+    params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+    identity = [*scope, marker, request.build_absolute_uri(request.path), request.accepted_media_type, params]
+    return "response:" + hashlib.sha256(json.dumps(identity, default=str).encode()).hexdigest()
+
+
+# Serves the data of an earlier identical response when there is one, else build() and stores
+# its data. The rendered body is not cached: rendering cached data is cheap, and keeping the
+# data lets every renderer, the browsable API included, serve a hit.
+def cached_response(request, marker, scope, build):
+    if not response_cache_config().get('RESPONSE_CACHE', True):
+        return build()
+
+    cache = response_cache()
+    key = response_key(request, marker, *scope)
+    data = cache.get(key)
+    if data is not None:
+        _count(cache, "hits")
+        response = Response(data)
+        response.headers["X-Cache"] = "HIT"
+        return response
+
+    _count(cache, "misses")
+    response = build()
+    if response.status_code == 200:
+        cache.set(key, response.data)
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+def _count(cache, stat):
+    try:
+        cache.incr(f"response_stats:{stat}")
+    except ValueError:
+        cache.add(f"response_stats:{stat}", 1, timeout=None)
+
+
+def response_cache_stats():
+    counts = response_cache().get_many([f"response_stats:{stat}" for stat in STATS])
+    return {stat: counts.get(f"response_stats:{stat}", 0) for stat in STATS}
+
+
+def reset_response_cache_stats():
+    response_cache().delete_many([f"response_stats:{stat}" for stat in STATS])
@@ -0,0 +1,47 @@
+from rest_framework import status, serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from .authentication import DeviceKeyScope
+from .response_cache import reset_response_cache_stats, response_cache_stats
+from drf_spectacular.utils import extend_schema, OpenApiExample, inline_serializer
+
+
+class ResponseCacheStatsAPIView(APIView):
+    permission_classes = [IsAdminUser, DeviceKeyScope]
+
+    @extend_schema(
+        tags=["Operations"],
+        summary="Response cache hit and miss counters",
+        description=(
+            "Counts of system and measurement listings served from the response cache (hits) and "
+            "built from the database (misses) since the last reset. Staff only. With the default "
+            "in-process cache the counters are per worker process."
+        ),
+        responses={
+            200: inline_serializer(
+                name="ResponseCacheStats",
+                fields={
+                    "hits": serializers.IntegerField(),
+                    "misses": serializers.IntegerField(),
+                    "hit_ratio": serializers.FloatField(allow_null=True),
+                }
+            ),
+        },
+        examples=[
+            OpenApiExample(name="Stats", value={"hits": 930, "misses": 70, "hit_ratio": 0.93}, response_only=True)
+        ]
+    )
+    def get(self, request):
+        stats = response_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        return Response({**stats, "hit_ratio": round(stats["hits"] / total, 4) if total else None})
+
+    @extend_schema(
+        tags=["Operations"],
+        summary="Reset the response cache counters",
+        responses={204: None},
+    )
+    def delete(self, request):
+        reset_response_cache_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+from .changes import mark_changed
+from .filters import has_value_filters, parse_date
+from .models import HydroponicSystem, Measurement
+from .rollups import replace_rollups
+
+# Raw measurements older than a system's retention period are deleted once the hourly and
+# daily rollups hold them. Ingestion keeps the rollups current for every reading it stores,
+# but rows stored any other way (before the rollups existed, by raw SQL, from a restored
+# dump) are missing from them. So each batch first recomputes the buckets of its hours from
+# the raw rows it is about to delete, for every hour at or after the system's
+# raw_compacted_before: all of such an hour's data is still raw. Rows before the mark arrived
+# late and were counted by ingestion. The rows are then deleted and the mark moved past them
+# in the same transaction, so reads switch each range to the rollups as its raw rows go, and
+# a run that stops halfway is finished by the next one.
+
+
+def retention_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+def retention_days(system):
+    if system.raw_retention_days is not None:
+        return system.raw_retention_days
+    return retention_config().get('RAW_RETENTION_DAYS', 0)
+
+
+# Compaction happens in whole hours, so no hourly bucket is left half raw, half compacted.
+def compaction_cutoff(days, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return cutoff.replace(minute=0, second=0, microsecond=0)
+
+
+def systems_due_for_compaction():
+    systems = HydroponicSystem.objects.order_by("id")
+    if not retention_config().get('RAW_RETENTION_DAYS', 0):
+        systems = systems.filter(raw_retention_days__isnull=False)
+    return systems
+
+
+# Moves the mark forward only; data compacted under a shorter retention period is gone.
+def advance_compaction_mark(system_ids, cutoff):
+    return HydroponicSystem.objects.filter(id__in=system_ids).filter(
+        Q(raw_compacted_before__isnull=True) | Q(raw_compacted_before__lt=cutoff)
+    ).update(raw_compacted_before=cutoff, updated_at=timezone.now())
+
+
+# Compacts the system's oldest raw rows before cutoff: batch_size of them, rounded up to whole
+# hours so no hour is left half raw. Returns the number of rows deleted and the new mark.
+def compact_batch(system_id, cutoff, batch_size):
+    table = connection.ops.quote_name(Measurement._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        mark_changed([system_id])
+        compacted_before = HydroponicSystem.all_objects.filter(id=system_id).values_list("raw_compacted_before", flat=True).get()
+        oldest = Measurement.objects.filter(system_id=system_id, timestamp__lt=cutoff).order_by("timestamp")
+        last = list(oldest.values_list("timestamp", flat=True)[batch_size - 1:batch_size])
+        before = min(cutoff, last[0].replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)) if last else cutoff
+
+        replace_rollups(system_id, compacted_before, before)
+        cursor.execute(f'DELETE FROM {table} WHERE system_id = %s AND "timestamp" < %s', [system_id, before])
+        deleted = cursor.rowcount
+        advance_compaction_mark([system_id], before)
+    return deleted, before
+
+
+# Deletes the system's raw measurements before its retention cutoff, about batch_size rows
+# per transaction so row locks stay short and ingestion into the same table carries on.
+# Returns the number of rows deleted.
+def compact_system(system, batch_size, now=None):
+    days = retention_days(system)
+    if not days:
+        return 0
+    cutoff = compaction_cutoff(days, now)
+
+    deleted, before = 0, None
+    while before != cutoff:
+        batch, before = compact_batch(system.id, cutoff, batch_size)
+        deleted += batch
+    system.refresh_from_db(fields=["raw_compacted_before"])
+    return deleted
+
+
+# Value filters need the raw readings, which the compacted range no longer has.
+def check_value_filters(system, query_params):
+    if has_value_filters(query_params) and reaches_compacted(system, query_params):
+        raise ParseError(
+            f"Value filters cannot be applied before {system.raw_compacted_before:%Y-%m-%d %H:%M} UTC, "
+            "where only hourly rollups are kept. Set 'timestamp_after' to a later date."
+        )
+
+
+# True when the range requested by the filters starts before the system's compacted mark.
+def reaches_compacted(system, query_params):
+    if system.raw_compacted_before is None:
+        return False
+    timestamp_after = query_params.get("timestamp_after")
+    if not timestamp_after:
+        return True
+    return timezone.make_aware(parse_date(timestamp_after)) < system.raw_compacted_before
@@ -0,0 +1,241 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from rest_framework.exceptions import ParseError
+
+from .aggregation import BUCKET_ORIGIN, BUCKETS, METRICS
+from .downsampling import load_series
+
+WINDOWS = {
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+}
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# Cells of the NaN-padded matrix the rolling percentiles of a block of windows are taken from.
+PERCENTILE_BLOCK_CELLS = 1000000
+
+# Rolling statistics are evaluated at the end of every step bucket (aligned like the aggregate
+# buckets) that holds readings, over the readings of the window before it: mean, standard
+# deviation (population), percentiles (interpolated like percentile_cont) and rate of change,
+# the difference to the previous window's mean per hour. The window is a whole number of steps,
+# so the NumPy and SQL paths see the same rows.
+
+
+def statistics_config():
+    return getattr(settings, 'MEASUREMENT_CONFIG', {})
+
+
+def statistics_params(query_params):
+    window = query_params.get("window", "1h")
+    if window not in WINDOWS:
+        raise ParseError(f"Invalid value for 'window'. Use one of: {', '.join(WINDOWS)}.")
+
+    raw = query_params.get("percentiles")
+    try:
+        percentiles = sorted({float(value) for value in raw.split(",")}) if raw else list(DEFAULT_PERCENTILES)
+    except ValueError:
+        percentiles = []
+    if not percentiles or not all(0 <= value <= 100 for value in percentiles):
+        raise ParseError("Invalid value for 'percentiles'. Use comma-separated numbers between 0 and 100.")
+    return window, percentiles
+
+
+# The window used for a step: at least one step long and a multiple of it.
+def effective_window(window, step):
+    width, step_width = WINDOWS[window], BUCKETS[step]
+    if width <= step_width:
+        return step_width
+    return width // step_width * step_width
+
+
+def percentile_key(value):
+    return f"{value:g}"
+
+
+# NumPy scalars, Decimals from PostgreSQL and NaN (no data) to JSON numbers or null.
+def _number(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _summary(count, means, stds, lows, highs, percentiles, quantiles):
+    return {
+        metric: {
+            "mean": _number(means[index]) if count else None,
+            "std": _number(stds[index]) if count else None,
+            "min": _number(lows[index]) if count else None,
+            "max": _number(highs[index]) if count else None,
+            "percentiles": {
+                percentile_key(value): _number(quantiles[position][index]) if count else None
+                for position, value in enumerate(percentiles)
+            },
+        }
+        for index, metric in enumerate(METRICS)
+    }
+
+
+# quantiles holds one row per window for every percentile.
+def _series(ends, counts, means, stds, rates, percentiles, quantiles):
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(end, tz=timezone.utc),
+            "count": int(count),
+            **{
+                metric: {
+                    "mean": _number(means[position][index]),
+                    "std": _number(stds[position][index]),
+                    "rate": _number(rates[position][index]),
+                    "percentiles": {
+                        percentile_key(value): _number(quantiles[rank][position][index])
+                        for rank, value in enumerate(percentiles)
+                    },
+                }
+                for index, metric in enumerate(METRICS)
+            },
+        }
+        for position, (end, count) in enumerate(zip(ends.tolist(), counts.tolist()))
+    ]
+
+
+# Percentiles of values[start:end] for every window. Windows differ in length, so each block of
+# windows is gathered into a matrix as wide as the longest one, padded with NaN.
+def _window_percentiles(values, start, end, percentiles):
+    quantiles = np.empty((len(percentiles), len(start), values.shape[1]))
+    longest = int((end - start).max())
+    offsets = np.arange(longest)
+    rows = max(1, PERCENTILE_BLOCK_CELLS // longest)
+    for first in range(0, len(start), rows):
+        block = slice(first, first + rows)
+        index = start[block, None] + offsets
+        windows = values[np.minimum(index, len(values) - 1)]
+        windows[index >= end[block, None]] = np.nan
+        quantiles[:, block] = np.nanpercentile(windows, percentiles, axis=1)
+    return quantiles
+
+
+def numpy_statistics(queryset, step, window, percentiles):
+    data = load_series(queryset, statistics_config().get('DOWNSAMPLE_CHUNK_SIZE', 10000))
+    timestamps, values = data[:, 0], data[:, 1:]
+    count = len(data)
+    if not count:
+        return 0, _summary(0, *([None] * 4), percentiles, None), []
+
+    summary = _summary(
+        count, values.mean(axis=0), values.std(axis=0), values.min(axis=0), values.max(axis=0),
+        percentiles, np.percentile(values, percentiles, axis=0),
+    )
+
+    origin, step_seconds = BUCKET_ORIGIN.timestamp(), BUCKETS[step].total_seconds()
+    width = effective_window(window, step).total_seconds()
+    ends = origin + (np.unique(np.floor((timestamps - origin) / step_seconds)) + 1) * step_seconds
+
+    sums = np.vstack([np.zeros((1, len(METRICS))), np.cumsum(values, axis=0)])
+    squares = np.vstack([np.zeros((1, len(METRICS))), np.cumsum(values * values, axis=0)])
+    previous = np.searchsorted(timestamps, ends - 2 * width)
+    start = np.searchsorted(timestamps, ends - width)
+    end = np.searchsorted(timestamps, ends)
+
+    counts = end - start
+    means = (sums[end] - sums[start]) / counts[:, None]
+    stds = np.sqrt(np.maximum((squares[end] - squares[start]) / counts[:, None] - means * means, 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        previous_means = (sums[start] - sums[previous]) / (start - previous)[:, None]
+    rates = (means - previous_means) / (width / 3600)
+    quantiles = _window_percentiles(values, start, end, percentiles)
+    return count, summary, _series(ends, counts, means, stds, rates, percentiles, quantiles)
+
+
+# For ranges too large to load: the summary in one aggregate query, the rolling series from
+# per-step sums combined with window functions, both over the same filtered rows. Percentiles
+# cannot be combined from per-step parts, so each window's are taken over its own readings.
+def sql_statistics(queryset, step, window, percentiles):
+    readings, params = queryset.order_by().values("timestamp", *METRICS).query.sql_with_params()
+    qn = connection.ops.quote_name
+    fractions = [value / 100 for value in percentiles]
+
+    summary_columns = ["count(*)"]
+    for metric in METRICS:
+        summary_columns += [
+            f"avg({metric})", f"stddev_pop({metric})", f"min({metric})", f"max({metric})",
+            f"percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY {metric})",
+        ]
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(summary_columns)} FROM ({readings}) AS readings", [*[fractions] * len(METRICS), *params])
+        count, *columns = cursor.fetchone()
+    summary = _summary(
+        count, columns[0::5], columns[1::5], columns[2::5], columns[3::5],
+        percentiles, list(zip(*columns[4::5])) if count else None,
+    )
+    if not count:
+        return 0, summary, []
+
+    step_width = BUCKETS[step]
+    width = effective_window(window, step)
+    bucket_columns = ["count(*) AS n"]
+    rolling_columns = ["sum(n) OVER current_window", "sum(n) OVER previous_window"]
+    for metric in METRICS:
+        bucket_columns += [f"sum({metric}) AS {metric}_sum", f"sum({metric}::float8 * {metric}) AS {metric}_sum_sq"]
+        rolling_columns += [
+            f"sum({metric}_sum) OVER current_window", f"sum({metric}_sum_sq) OVER current_window",
+            f"sum({metric}_sum) OVER previous_window",
+        ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH buckets AS ("
+            f"SELECT date_bin(%s, {qn('timestamp')}, %s) AS bucket, {', '.join(bucket_columns)} "
+            f"FROM ({readings}) AS readings GROUP BY 1) "
+            f"SELECT bucket, {', '.join(rolling_columns)} FROM buckets "
+            f"WINDOW current_window AS (ORDER BY bucket RANGE BETWEEN %s PRECEDING AND CURRENT ROW), "
+            f"previous_window AS (ORDER BY bucket RANGE BETWEEN %s PRECEDING AND %s PRECEDING) "
+            f"ORDER BY bucket",
+            [step_width, BUCKET_ORIGIN, *params, width - step_width, 2 * width - step_width, width],
+        )
+        rows = np.array(
+            [[(bucket + step_width).timestamp(), *(np.nan if value is None else value for value in rest)] for bucket, *rest in cursor.fetchall()],
+            dtype=np.float64,
+        )
+
+    ends, counts, previous_counts = rows[:, 0], rows[:, 1], rows[:, 2]
+    sums, squares, previous_sums = rows[:, 3::3], rows[:, 4::3], rows[:, 5::3]
+    means = sums / counts[:, None]
+    stds = np.sqrt(np.maximum(squares / counts[:, None] - means * means, 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        previous_means = previous_sums / previous_counts[:, None]
+    rates = (means - previous_means) / (width.total_seconds() / 3600)
+    quantiles = _sql_window_percentiles(readings, params, step_width, width, fractions)
+    return count, summary, _series(ends, counts, means, stds, rates, percentiles, quantiles)
+
+
+# One row per window end, in the order of the rolling series; the readings subquery is
+# repeated inside the lateral join so each window is read through the timestamp index.
+def _sql_window_percentiles(readings, params, step_width, width, fractions):
+    timestamp = connection.ops.quote_name("timestamp")
+    columns = [f"percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY {metric})" for metric in METRICS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT window_readings.* FROM ("
+            f"SELECT DISTINCT date_bin(%s, {timestamp}, %s) + %s AS window_end FROM ({readings}) AS readings) AS ends "
+            f"CROSS JOIN LATERAL (SELECT {', '.join(columns)} FROM ({readings}) AS readings "
+            f"WHERE {timestamp} >= window_end - %s AND {timestamp} < window_end) AS window_readings "
+            f"ORDER BY window_end",
+            [step_width, BUCKET_ORIGIN, step_width, *params, *[fractions] * len(METRICS), *params, width],
+        )
+        rows = [[values or [None] * len(fractions) for values in row] for row in cursor.fetchall()]
+    return np.array(rows, dtype=np.float64).transpose(2, 0, 1)
+
+
+# NumPy for ranges of up to STATISTICS_MAX_ROWS readings, SQL beyond that.
+def window_statistics(queryset, step, window, percentiles):
+    if queryset.count() <= statistics_config().get('STATISTICS_MAX_ROWS', 500000):
+        return "numpy", *numpy_statistics(queryset, step, window, percentiles)
+    return "sql", *sql_statistics(queryset, step, window, percentiles)
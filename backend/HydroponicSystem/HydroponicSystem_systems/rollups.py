@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Min
+
+from .aggregation import BUCKET_ORIGIN, METRICS
+from .changes import mark_changed
+from .models import DailyRollup, HourlyRollup, HydroponicSystem, Measurement
+
+ROLLUPS = {
+    "1h": (HourlyRollup, timedelta(hours=1)),
+    "1d": (DailyRollup, timedelta(days=1)),
+}
+ROLLUP_COLUMNS = ["system_id", "bucket", "count"] + [
+    f"{metric}_{part}" for metric in METRICS for part in ("sum", "sum_sq", "min", "max")
+]
+
+
+# Merges the source rows matched by where into the rollup buckets; replace=True overwrites
+# existing buckets instead of adding to them.
+def _merge_sql(model, source, where, replace=False):
+    qn = connection.ops.quote_name
+    if source is Measurement:
+        select = ["system_id", f"date_bin(%s, {qn('timestamp')}, %s)", "count(*)"]
+        for metric in METRICS:
+            select += [f"sum({metric})", f"sum({metric}::float8 * {metric})", f"min({metric})", f"max({metric})"]
+    else:
+        select = ["system_id", "date_bin(%s, bucket, %s)", "sum(count)"]
+        for metric in METRICS:
+            select += [f"sum({metric}_sum)", f"sum({metric}_sum_sq)", f"min({metric}_min)", f"max({metric}_max)"]
+
+    merge = ["count = rollup.count + EXCLUDED.count"]
+    for metric in METRICS:
+        merge += [
+            f"{metric}_sum = rollup.{metric}_sum + EXCLUDED.{metric}_sum",
+            f"{metric}_sum_sq = rollup.{metric}_sum_sq + EXCLUDED.{metric}_sum_sq",
+            f"{metric}_min = LEAST(rollup.{metric}_min, EXCLUDED.{metric}_min)",
+            f"{metric}_max = GREATEST(rollup.{metric}_max, EXCLUDED.{metric}_max)",
+        ]
+    if replace:
+        merge = [f"{column} = EXCLUDED.{column}" for column in ROLLUP_COLUMNS[2:]]
+
+    # Rows are merged in key order so concurrent batches lock rollup rows in the same order.
+    return (
+        f"INSERT INTO {qn(model._meta.db_table)} AS rollup ({', '.join(ROLLUP_COLUMNS)}) "
+        f"SELECT {', '.join(select)} FROM {qn(source._meta.db_table)} WHERE {where} "
+        f"GROUP BY 1, 2 ORDER BY 1, 2 "
+        f"ON CONFLICT (system_id, bucket) DO UPDATE SET {', '.join(merge)}"
+    )
+
+
+# Ingestion and rebuilds call mark_changed() for the systems whose rollups they change before
+# touching them, which locks those systems' rows until the transaction ends. A rebuild then
+# only waits for (and holds off) batches of the system it is rebuilding; the rest of the
+# fleet carries on.
+
+
+# Adds freshly inserted measurements to the hourly and daily rollups. Must run in the
+# transaction that inserted them, after mark_changed(), so the rollups never count
+# uncommitted rows.
+def update_rollups(measurement_ids):
+    if not measurement_ids:
+        return
+    with connection.cursor() as cursor:
+        for model, width in ROLLUPS.values():
+            cursor.execute(_merge_sql(model, Measurement, "id = ANY(%s)"), [width, BUCKET_ORIGIN, list(measurement_ids)])
+
+
+# Recomputes the rollups of the given systems, one transaction per system: hourly buckets
+# from raw measurements, daily buckets from the hourly ones. Hourly buckets older than the
+# first raw measurement or the system's raw_compacted_before are kept, since their raw data
+# may have been compacted away.
+def rebuild_rollups(system_ids):
+    rebuilt = 0
+    for system_id in system_ids:
+        with transaction.atomic():
+            if mark_changed([system_id]):
+                _rebuild_system(system_id)
+                rebuilt += 1
+    return rebuilt
+
+
+def _rebuild_system(system_id):
+    hourly, hour = ROLLUPS["1h"]
+    daily, day = ROLLUPS["1d"]
+
+    with connection.cursor() as cursor:
+        compacted_before = HydroponicSystem.all_objects.filter(id=system_id).values_list("raw_compacted_before", flat=True).first()
+        raw = Measurement.objects.filter(system_id=system_id)
+        if compacted_before is not None:
+            raw = raw.filter(timestamp__gte=compacted_before)
+        first = raw.aggregate(first=Min("timestamp"))["first"]
+        if first is not None:
+            start = BUCKET_ORIGIN + (first - BUCKET_ORIGIN) // hour * hour
+            hourly.objects.filter(system_id=system_id, bucket__gte=start).delete()
+            cursor.execute(
+                _merge_sql(hourly, Measurement, '"timestamp" >= %s AND system_id = %s'),
+                [hour, BUCKET_ORIGIN, start, system_id],
+            )
+
+        daily.objects.filter(system_id=system_id).delete()
+        cursor.execute(_merge_sql(daily, hourly, "system_id = %s"), [day, BUCKET_ORIGIN, system_id])
+
+
+# Recomputes, from the raw measurements in [since, before), the hourly buckets those rows fall
+# in, then the daily buckets of those hours from the hourly ones. Hours without raw rows are
+# left alone. Every hour from since on must still be complete in raw form; runs under
+# mark_changed() like the rebuild.
+def replace_rollups(system_id, since, before):
+    hourly, hour = ROLLUPS["1h"]
+    daily, day = ROLLUPS["1d"]
+    raw = Measurement.objects.filter(system_id=system_id, timestamp__lt=before)
+    if since is not None:
+        raw = raw.filter(timestamp__gte=since)
+    first = raw.aggregate(first=Min("timestamp"))["first"]
+    if first is None:
+        return
+
+    days_from = BUCKET_ORIGIN + (first - BUCKET_ORIGIN) // day * day
+    days_to = BUCKET_ORIGIN + -(-(before - BUCKET_ORIGIN) // day) * day
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _merge_sql(hourly, Measurement, 'system_id = %s AND "timestamp" >= %s AND "timestamp" < %s', replace=True),
+            [hour, BUCKET_ORIGIN, system_id, first, before],
+        )
+        cursor.execute(
+            _merge_sql(daily, hourly, "system_id = %s AND bucket >= %s AND bucket < %s", replace=True),
+            [day, BUCKET_ORIGIN, system_id, days_from, days_to],
+        )
+
+
+def aggregate_rollups(bucket, filters):
+    rows = ROLLUPS[bucket][0].objects.filter(filters).order_by("bucket").values_list(
+        "bucket", "count", *(f"{metric}_{part}" for metric in METRICS for part in ("min", "max", "sum"))
+    )
+
+    results = []
+    for bucket_start, count, *values in rows:
+        result = {"bucket": bucket_start, "count": count}
+        for index, metric in enumerate(METRICS):
+            low, high, total = values[index * 3:index * 3 + 3]
+            result[metric] = {"min": low, "max": high, "avg": total / count}
+        results.append(result)
+    return results
@@ -1,14 +1,88 @@
-from rest_framework.serializers import ModelSerializer
-from .models import HydroponicSystem, Measurement
+from rest_framework.serializers import DateTimeField, ModelSerializer, ListSerializer, ValidationError
+from django.utils.timezone import get_current_timezone
+from .models import HydroponicSystem, Measurement, DeviceKey
+from .ingestion import save_measurements
 
 class HydroponicSystemSerializer(ModelSerializer):
     class Meta:
         model = HydroponicSystem
-        fields = '__all__'
-        read_only_fields = ['owner', 'created_at']
+        exclude = ['deleted_at', 'updated_at', 'changed_at']
+        read_only_fields = ['owner', 'created_at', 'raw_compacted_before']
+
+class MeasurementListSerializer(ListSerializer):
+    def create(self, validated_data):
+        measurements = [Measurement(**item) for item in validated_data]
+        return [measurement for measurement, _ in save_measurements(measurements)]
 
 class MeasurementSerializer(ModelSerializer):
     class Meta:
         model = Measurement
         fields = '__all__'
-        read_only_fields = ['system', 'timestamp']
\ No newline at end of file
+        read_only_fields = ['system', 'timestamp']
+        extra_kwargs = {
+            'device_id': {'required': False},
+            'sequence': {'required': False},
+        }
+        list_serializer_class = MeasurementListSerializer
+
+    def validate(self, attrs):
+        if (attrs.get('device_id') is None) != (attrs.get('sequence') is None):
+            raise ValidationError("Fields device_id and sequence must be provided together.")
+        return attrs
+
+# Backfilled rows must carry their own timestamp; the upload time would misplace them.
+class MeasurementUploadSerializer(MeasurementSerializer):
+    class Meta(MeasurementSerializer.Meta):
+        read_only_fields = ['system']
+        extra_kwargs = {
+            **MeasurementSerializer.Meta.extra_kwargs,
+            'timestamp': {'required': True},
+        }
+
+class DeviceKeySerializer(ModelSerializer):
+    class Meta:
+        model = DeviceKey
+        fields = ['id', 'name', 'prefix', 'system', 'created_at', 'revoked_at']
+        read_only_fields = ['prefix', 'system', 'created_at', 'revoked_at']
+
+
+# Read fast path: the same output as HydroponicSystemSerializer and MeasurementSerializer,
+# built from values_list() rows without instantiating models or serializer fields per row.
+# Keep the field order in sync with the serializers above.
+SYSTEM_ROW_FIELDS = ('id', 'name', 'location', 'created_at', 'raw_retention_days', 'raw_compacted_before', 'owner_id')
+MEASUREMENT_ROW_FIELDS = ('id', 'timestamp', 'ph', 'temperature', 'tds', 'device_id', 'sequence', 'system_id')
+
+# DateTimeField().to_representation, with the current timezone looked up once instead of per value.
+def datetime_formatter():
+    return DateTimeField(default_timezone=get_current_timezone()).to_representation
+
+def system_rows(rows):
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': pk,
+            'name': name,
+            'location': location,
+            'created_at': format_datetime(created_at),
+            'raw_retention_days': raw_retention_days,
+            'raw_compacted_before': format_datetime(raw_compacted_before) if raw_compacted_before else None,
+            'owner': owner_id,
+        }
+        for pk, name, location, created_at, raw_retention_days, raw_compacted_before, owner_id in rows
+    ]
+
+def measurement_rows(rows):
+    format_datetime = datetime_formatter()
+    return [
+        {
+            'id': pk,
+            'timestamp': format_datetime(timestamp),
+            'ph': ph,
+            'temperature': temperature,
+            'tds': tds,
+            'device_id': device_id,
+            'sequence': sequence,
+            'system': system_id,
+        }
+        for pk, timestamp, ph, temperature, tds, device_id, sequence, system_id in rows
+    ]
@@ -0,0 +1,194 @@
+from rest_framework import serializers
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from .models import HydroponicSystem, Measurement
+from .aggregation import BUCKETS, resolve_bucket
+from .filters import measurement_filters
+from .retention import check_value_filters, reaches_compacted
+from .rolling_statistics import WINDOWS, DEFAULT_PERCENTILES, effective_window, statistics_params, window_statistics
+from .changes import conditional_response, system_marker, validators, with_validators
+from .response_cache import cached_response
+from .columnar import COLUMNAR_RENDERER_CLASSES, is_columnar, statistics_columns
+from drf_spectacular.utils import (
+    extend_schema, OpenApiExample, OpenApiParameter, inline_serializer, OpenApiResponse
+)
+
+error_response_serializer = inline_serializer(
+    name="ErrorResponse",
+    fields={
+        "detail": serializers.CharField()
+    }
+)
+
+metric_statistics_serializer = inline_serializer(
+    name="MetricStatistics",
+    fields={
+        "mean": serializers.FloatField(allow_null=True),
+        "std": serializers.FloatField(allow_null=True),
+        "min": serializers.FloatField(allow_null=True),
+        "max": serializers.FloatField(allow_null=True),
+        "percentiles": serializers.DictField(child=serializers.FloatField(allow_null=True)),
+    }
+)
+
+rolling_metric_serializer = inline_serializer(
+    name="RollingMetric",
+    fields={
+        "mean": serializers.FloatField(),
+        "std": serializers.FloatField(),
+        "rate": serializers.FloatField(allow_null=True),
+        "percentiles": serializers.DictField(child=serializers.FloatField(allow_null=True)),
+    }
+)
+
+
+class MeasurementStatisticsAPIView(APIView):
+    renderer_classes = COLUMNAR_RENDERER_CLASSES
+
+    @extend_schema(
+        tags=["Measurements"],
+        summary="Rolling statistics of a hydroponic system's measurements",
+        description=(
+            "Mean, standard deviation, minimum, maximum and percentiles of pH, temperature and TDS over "
+            "the filtered range, plus a rolling series: at the end of every `step` bucket with readings, "
+            "the mean, standard deviation and percentiles over the preceding `window`, and `rate`, the "
+            "change of that mean from the window before per hour. The window is rounded down to a whole "
+            "number of steps (at least one); the response gives the one used. Ranges of up to a "
+            "configured number of readings are computed in memory, larger ones in the database "
+            "(`method`). Results are cached until the system receives new measurements. Raw readings "
+            "only: when the range reaches before the system's `raw_compacted_before`, the statistics "
+            "cover the readings from `truncated_before` on (null otherwise), and value filters are "
+            "rejected. `format=columnar` returns `series` as parallel arrays."
+        ),
+        parameters=[
+            OpenApiParameter(name="system_id", location=OpenApiParameter.PATH, required=True, type=int),
+            OpenApiParameter(name="window", type=str, location=OpenApiParameter.QUERY, enum=list(WINDOWS), description="Rolling window (default: 1h)"),
+            OpenApiParameter(name="step", type=str, location=OpenApiParameter.QUERY, enum=[*BUCKETS, "auto"], description="Spacing of the rolling series (default: auto)"),
+            OpenApiParameter(name="percentiles", type=str, location=OpenApiParameter.QUERY, description=f"Comma-separated, 0-100 (default: {','.join(map(str, DEFAULT_PERCENTILES))})"),
+            OpenApiParameter(name="ph_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="ph_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_min", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="temperature_max", type=float, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_min", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="tds_max", type=int, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name="timestamp_after", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD"),
+            OpenApiParameter(name="timestamp_before", type=str, location=OpenApiParameter.QUERY, description="Format: YYYY-MM-DD, the whole day is included"),
+            OpenApiParameter(name="format", type=str, location=OpenApiParameter.QUERY, enum=["json", "columnar"], description="Response layout (default: json)"),
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="Summary and rolling statistics",
+                response=inline_serializer(
+                    name="MeasurementStatisticsResponse",
+                    fields={
+                        "method": serializers.ChoiceField(choices=["numpy", "sql"]),
+                        "step": serializers.CharField(),
+                        "window": serializers.CharField(),
+                        "count": serializers.IntegerField(),
+                        "truncated_before": serializers.DateTimeField(allow_null=True),
+                        "summary": inline_serializer(
+                            name="MeasurementStatisticsSummary",
+                            fields={metric: metric_statistics_serializer for metric in ("ph", "temperature", "tds")},
+                        ),
+                        "series": inline_serializer(
+                            name="RollingStatistics",
+                            fields={
+                                "timestamp": serializers.DateTimeField(),
+                                "count": serializers.IntegerField(),
+                                "ph": rolling_metric_serializer,
+                                "temperature": rolling_metric_serializer,
+                                "tds": rolling_metric_serializer,
+                            },
+                            many=True,
+                        ),
+                    }
+                ),
+                examples=[
+                    OpenApiExample(
+                        name="Success",
+                        value={
+                            "method": "numpy",
+                            "step": "1h",
+                            "window": "6h",
+                            "count": 8640,
+                            "truncated_before": None,
+                            "summary": {
+                                "ph": {"mean": 6.42, "std": 0.21, "min": 5.9, "max": 7.1, "percentiles": {"5": 6.08, "50": 6.41, "95": 6.8}},
+                                "temperature": {"mean": 22.1, "std": 0.9, "min": 19.8, "max": 24.6, "percentiles": {"5": 20.6, "50": 22.1, "95": 23.7}},
+                                "tds": {"mean": 842.5, "std": 31.2, "min": 760, "max": 930, "percentiles": {"5": 795.0, "50": 841.0, "95": 896.0}}
+                            },
+                            "series": [
+                                {
+                                    "timestamp": "2025-02-17T12:00:00Z",
+                                    "count": 2160,
+                                    "ph": {"mean": 6.47, "std": 0.18, "rate": -0.012, "percentiles": {"5": 6.2, "50": 6.46, "95": 6.75}},
+                                    "temperature": {"mean": 22.2, "std": 0.7, "rate": 0.05, "percentiles": {"5": 21.1, "50": 22.2, "95": 23.3}},
+                                    "tds": {"mean": 845.1, "std": 28.4, "rate": 1.3, "percentiles": {"5": 801.0, "50": 844.0, "95": 890.0}}
+                                }
+                            ]
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Bad request (e.g. invalid window, step or percentiles)",
+                response=error_response_serializer,
+                examples=[
+                    OpenApiExample(
+                        name="Invalid Window",
+                        value={"detail": "Invalid value for 'window'. Use one of: 5m, 15m, 1h, 6h, 1d, 7d."},
+                        status_codes=["400"]
+                    ),
+                    OpenApiExample(
+                        name="Value Filter On Compacted Range",
+                        value={"detail": "Value filters cannot be applied before 2024-05-03 14:00 UTC, where only hourly rollups are kept. Set 'timestamp_after' to a later date."},
+                        status_codes=["400"]
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Permission denied",
+                response=error_response_serializer,
+            )
+        }
+    )
+    def get(self, request, system_id):
+        try:
+            system = HydroponicSystem.objects.get(id=system_id, owner=request.user)
+        except HydroponicSystem.DoesNotExist:
+            raise PermissionDenied("You do not have permission to this system")
+
+        filters = measurement_filters(system, request.query_params)
+        window, percentiles = statistics_params(request.query_params)
+        check_value_filters(system, request.query_params)
+        truncated_before = system.raw_compacted_before if reaches_compacted(system, request.query_params) else None
+        marker = system_marker(system)
+        etag, last_modified = validators(marker, "statistics", system.id, request.accepted_renderer.format)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = cached_response(
+            request, marker, ("statistics", system.id),
+            lambda: self.statistics(request, Measurement.objects.filter(filters), window, percentiles, truncated_before),
+        )
+        return with_validators(response, etag, last_modified)
+
+    def statistics(self, request, measurements, window, percentiles, truncated_before):
+        step = resolve_bucket(request.query_params.get("step", "auto"), measurements)
+        method, count, summary, series = window_statistics(measurements, step, window, percentiles)
+        window_width = effective_window(window, step)
+        window_name = next((name for name, width in WINDOWS.items() if width == window_width), step)
+
+        if is_columnar(request):
+            series = statistics_columns(series)
+        return Response({
+            "method": method,
+            "step": step,
+            "window": window_name,
+            "count": count,
+            "truncated_before": truncated_before,
+            "summary": summary,
+            "series": series,
+        })
@@ -1,13 +1,22 @@
 from rest_framework import viewsets, status, serializers
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, ValidationError
-from .models import HydroponicSystem, Measurement
-from .serializers import HydroponicSystemSerializer, MeasurementSerializer
+from rest_framework.exceptions import ParseError, PermissionDenied, ValidationError
+from .models import HydroponicSystem
+from .serializers import SYSTEM_ROW_FIELDS, HydroponicSystemSerializer, MeasurementSerializer, system_rows
+from .changes import conditional_response, owner_marker, system_marker, validators, with_validators
+from .response_cache import cached_response
+from .latest import get_latest_measurements
+from .overview import overview_item, with_overview
+from .purge import soft_delete_system
+from .pagination import SystemOverviewPagination
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse, OpenApiParameter, inline_serializer
 from datetime import datetime
 from django.db.models import Q
 
+SYSTEM_SORT_FIELDS = ["created_at", "id", "name", "location", "raw_retention_days", "raw_compacted_before"]
+
 # Inline serializer do błędów odpowiedzi
 ErrorResponseSerializer = inline_serializer(
     name="ErrorResponse",
@@ -67,6 +76,8 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                     "name": "Greenhouse A",
                     "location": "Farm #1",
                     "created_at": "2025-02-17T11:56:38.938336Z",
+                    "raw_retention_days": None,
+                    "raw_compacted_before": None,
                     "owner": 4
                 },
                 response_only=True,
@@ -125,6 +136,8 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                         "name": "Green",
                         "location": "Farm #1",
                         "created_at": "2025-02-15T17:10:58.803766Z",
+                        "raw_retention_days": None,
+                        "raw_compacted_before": None,
                         "owner": 4
                     },
                     "latest_measurements": [
@@ -147,7 +160,12 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
         if hydroponic_system.owner != request.user:
             raise PermissionDenied("You do not have access to this resource.")
 
-        latest_measurements = Measurement.objects.filter(system=hydroponic_system).order_by('-timestamp')[:10]
+        etag, last_modified = validators(system_marker(hydroponic_system), "system", hydroponic_system.id, request.accepted_renderer.format)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        latest_measurements = get_latest_measurements(hydroponic_system)
 
         hydroponic_serializer = self.get_serializer(hydroponic_system)
         measurement_serializer = MeasurementSerializer(latest_measurements, many=True)
@@ -157,7 +175,7 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
             "latest_measurements": measurement_serializer.data,
         }
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        return with_validators(Response(response_data, status=status.HTTP_200_OK), etag, last_modified)
 
     @extend_schema(
         summary="Update a hydroponic system",
@@ -203,7 +221,8 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                 "Example request",
                 value={
                     "name": "Updated Hydroponic System",
-                    "location": "Greenhouse B"
+                    "location": "Greenhouse B",
+                    "raw_retention_days": 365
                 },
                 request_only=True
             ),
@@ -214,7 +233,9 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                     "name": "Updated Hydroponic System",
                     "location": "Greenhouse B",
                     "owner": 2,
-                    "created_at": "2024-01-15T12:30:00Z"
+                    "created_at": "2024-01-15T12:30:00Z",
+                    "raw_retention_days": 365,
+                    "raw_compacted_before": "2023-01-16T12:00:00Z"
                 },
                 response_only=True
             )
@@ -231,6 +252,10 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         summary="Delete a hydroponic system",
+        description=(
+            "Removes the system and its device keys immediately. Its measurements and rollups are "
+            "deleted in the background afterwards."
+        ),
         responses={
             204: OpenApiResponse(
                 description="Successfully deleted the hydroponic system.",
@@ -271,7 +296,7 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
         hydroponic_system = self.get_object()
         if hydroponic_system.owner != request.user:
             raise PermissionDenied("You cannot delete this resource.")
-        hydroponic_system.delete()
+        soft_delete_system(hydroponic_system)
         return Response({"message": "Hydroponic system has been removed."}, status=status.HTTP_204_NO_CONTENT)
 
     @extend_schema(
@@ -281,7 +306,7 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
             OpenApiParameter(name="location", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Filter by location (case-insensitive)"),
             OpenApiParameter(name="created_after", type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Filter systems created after the given date"),
             OpenApiParameter(name="created_before", type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Filter systems created before the given date"),
-            OpenApiParameter(name="sort_by", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Field to sort results by (default: created_at)"),
+            OpenApiParameter(name="sort_by", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, enum=SYSTEM_SORT_FIELDS, description="Field to sort results by (default: created_at)"),
             OpenApiParameter(name="sort_order", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Sorting order: 'asc' or 'desc' (default: asc)"),
         ],
         responses={
@@ -319,6 +344,8 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                             "name": "Greenhouse A",
                             "location": "Farm #1",
                             "created_at": "2025-02-15T17:10:58.803766Z",
+                            "raw_retention_days": None,
+                            "raw_compacted_before": None,
                             "owner": 4
                         },
                         {
@@ -326,6 +353,8 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
                             "name": "= A",
                             "location": "Farm #1",
                             "created_at": "2025-02-15T17:11:57.798625Z",
+                            "raw_retention_days": None,
+                            "raw_compacted_before": None,
                             "owner": 4
                         }
                     ]
@@ -336,49 +365,129 @@ class HydroponicSystemViewSet(viewsets.ModelViewSet):
     )
     def list(self, request):
         try:
-            filters = Q(owner=request.user)
+            queryset = self.filter_systems(request).values_list(*SYSTEM_ROW_FIELDS)
+            marker = owner_marker(request.user.id)
+            etag, last_modified = validators(marker, "systems", request.user.id, request.accepted_renderer.format)
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
 
-            name = request.query_params.get("name")
-            if name:
-                filters &= Q(name__icontains=name)
+            response = cached_response(request, marker, ("systems", request.user.id), lambda: self.list_systems(queryset))
+            return with_validators(response, etag, last_modified)
 
-            location = request.query_params.get("location")
-            if location:
-                filters &= Q(location__icontains=location)
+        except ParseError as e:
+            return Response({"detail": e.detail}, status=status.HTTP_400_BAD_REQUEST)
 
-            created_after = request.query_params.get("created_after")
-            created_before = request.query_params.get("created_before")
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                if created_after:
-                    filters &= Q(created_at__gte=datetime.strptime(created_after, "%Y-%m-%d"))
+        except Exception as e:
+            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-                if created_before:
-                    filters &= Q(created_at__lte=datetime.strptime(created_before, "%Y-%m-%d"))
-            except ValueError:
-                return Response(
-                    {"detail": "Invalid date format. Expected format: YYYY-MM-DD."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    @extend_schema(
+        summary="Fleet overview: systems with their latest reading",
+        description=(
+            "Lists your hydroponic systems like the system listing (same filters and sorting), each with "
+            "its newest measurement and the min/max of every metric over roughly the last 24 hours "
+            "(whole hours from the hourly rollups). A page is read in a single query and holds up to "
+            "500 systems by default; use `page_size` (max 1000) to change it."
+        ),
+        parameters=[
+            OpenApiParameter(name="name", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Filter by system name (case-insensitive)"),
+            OpenApiParameter(name="location", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Filter by location (case-insensitive)"),
+            OpenApiParameter(name="created_after", type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Filter systems created after the given date"),
+            OpenApiParameter(name="created_before", type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Filter systems created before the given date"),
+            OpenApiParameter(name="sort_by", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, enum=SYSTEM_SORT_FIELDS, description="Field to sort results by (default: created_at)"),
+            OpenApiParameter(name="sort_order", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Sorting order: 'asc' or 'desc' (default: asc)"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Systems per page (default: 500, max: 1000)"),
+        ],
+        responses={
+            200: OpenApiResponse(description="Systems with their latest reading."),
+            400: OpenApiResponse(description="Bad Request - invalid query parameter.", response=ErrorResponseSerializer),
+        },
+        examples=[
+            OpenApiExample(
+                "Example Response",
+                value={
+                    "count": 1,
+                    "next": None,
+                    "previous": None,
+                    "results": [
+                        {
+                            "id": 1,
+                            "name": "Greenhouse A",
+                            "location": "Farm #1",
+                            "created_at": "2025-02-15T17:10:58.803766Z",
+                            "raw_retention_days": None,
+                            "raw_compacted_before": None,
+                            "owner": 4,
+                            "latest_measurement": {
+                                "id": 16,
+                                "timestamp": "2025-02-16T19:08:31.972081Z",
+                                "ph": 6.5,
+                                "temperature": 22.5,
+                                "tds": 900
+                            },
+                            "last_24h": {
+                                "ph": {"min": 6.1, "max": 6.9},
+                                "temperature": {"min": 21.0, "max": 23.5},
+                                "tds": {"min": 780, "max": 910}
+                            }
+                        }
+                    ]
+                },
+                response_only=True,
+            )
+        ]
+    )
+    @action(detail=False, methods=["get"], pagination_class=SystemOverviewPagination)
+    def overview(self, request):
+        try:
+            queryset = with_overview(self.filter_systems(request))
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response([
+                overview_item(system, data) for system, data in zip(page, serializer.data)
+            ])
 
-            sort_by = request.query_params.get("sort_by", "created_at")
-            sort_order = request.query_params.get("sort_order", "asc")
+        except ParseError as e:
+            return Response({"detail": e.detail}, status=status.HTTP_400_BAD_REQUEST)
 
-            if sort_order not in ["asc", "desc"]:
-                return Response(
-                    {"detail": "Invalid value for 'sort_order'. Use 'asc' or 'desc'."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    def list_systems(self, queryset):
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(system_rows(page))
 
-            sort_field = f"-{sort_by}" if sort_order == "desc" else sort_by
+    def filter_systems(self, request):
+        filters = Q(owner=request.user)
 
-            queryset = HydroponicSystem.objects.filter(filters).order_by(sort_field)
-            page = self.paginate_queryset(queryset)
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        name = request.query_params.get("name")
+        if name:
+            filters &= Q(name__icontains=name)
 
-        except ValidationError as e:
-            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        location = request.query_params.get("location")
+        if location:
+            filters &= Q(location__icontains=location)
 
-        except Exception as e:
-            return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        created_after = request.query_params.get("created_after")
+        created_before = request.query_params.get("created_before")
+
+        try:
+            if created_after:
+                filters &= Q(created_at__gte=datetime.strptime(created_after, "%Y-%m-%d"))
+
+            if created_before:
+                filters &= Q(created_at__lte=datetime.strptime(created_before, "%Y-%m-%d"))
+        except ValueError:
+            raise ParseError("Invalid date format. Expected format: YYYY-MM-DD.")
+
+        sort_by = request.query_params.get("sort_by", "created_at")
+        sort_order = request.query_params.get("sort_order", "asc")
+
+        if sort_by not in SYSTEM_SORT_FIELDS:
+            raise ParseError(f"Invalid value for 'sort_by'. Use one of: {', '.join(SYSTEM_SORT_FIELDS)}.")
+        if sort_order not in ["asc", "desc"]:
+            raise ParseError("Invalid value for 'sort_order'. Use 'asc' or 'desc'.")
+
+        sort_field = f"-{sort_by}" if sort_order == "desc" else sort_by
+
+        return HydroponicSystem.objects.filter(filters).order_by(sort_field)
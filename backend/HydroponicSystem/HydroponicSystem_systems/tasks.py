@@ -0,0 +1,23 @@
+from HydroponicSystem_jobs.queue import task
+
+from .models import Measurement
+from .purge import purge_config, purge_system
+from .rollups import rebuild_rollups
+
+
+@task("purge_system")
+def purge_system_task(job, system_id):
+    total = Measurement.objects.filter(system_id=system_id).count()
+    job.report_progress(0, total)
+    deleted = purge_system(system_id, purge_config().get('PURGE_BATCH_SIZE', 5000), progress=job.report_progress)
+    return {"deleted": deleted}
+
+
+@task("rebuild_rollups")
+def rebuild_rollups_task(job, system_ids):
+    job.report_progress(0, len(system_ids))
+    rebuilt = 0
+    for done, system_id in enumerate(system_ids, 1):
+        rebuilt += rebuild_rollups([system_id])
+        job.report_progress(done)
+    return {"rebuilt": rebuilt}
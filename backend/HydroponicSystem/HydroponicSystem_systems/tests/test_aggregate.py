@@ -0,0 +1,102 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    return save_measurements([
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + i % 3 * 0.5,
+            temperature=20.0 + i % 2,
+            tds=800 + i,
+            timestamp=start + timedelta(minutes=10 * i),
+        )
+        for i in range(18)
+    ])
+
+
+@pytest.mark.django_db
+def test_aggregate_hourly_buckets(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+    response = api_client.get(url, {"bucket": "1h"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["bucket"] == "1h"
+    assert [b["count"] for b in response.data["results"]] == [6, 6, 6]
+
+    first = response.data["results"][0]
+    assert first["bucket"] == datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    assert first["ph"] == {"min": 6.0, "max": 7.0, "avg": pytest.approx(6.5)}
+    assert first["temperature"]["avg"] == pytest.approx(20.5)
+    assert first["tds"]["max"] == 805
+
+@pytest.mark.django_db
+def test_aggregate_honors_filters(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+    response = api_client.get(url, {"bucket": "1d", "ph_min": 6.5, "tds_max": 810})
+
+    assert len(response.data["results"]) == 1
+    assert response.data["results"][0]["count"] == 7
+    assert response.data["results"][0]["ph"]["min"] == 6.5
+
+@pytest.mark.django_db
+def test_aggregate_auto_bucket(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+    response = api_client.get(url)
+
+    assert response.data["bucket"] == "1m"
+    assert len(response.data["results"]) == 18
+
+@pytest.mark.django_db
+def test_aggregate_rejects_invalid_bucket(api_client, user1, hydroponic_system1, measurements1, settings):
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, "AGGREGATE_MAX_BUCKETS": 100}
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+
+    assert api_client.get(url, {"bucket": "2h"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"bucket": "1m"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"bucket": "5m"}).status_code == status.HTTP_200_OK
+
+@pytest.mark.django_db
+def test_aggregate_other_users_system(api_client, user2, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user2)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+    response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,82 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..buffer import get_buffer, stop_buffer
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def write_behind(settings):
+    settings.MEASUREMENT_CONFIG = {
+        "WRITE_BEHIND": True,
+        "WRITE_BEHIND_MAX_SIZE": 3,
+        "WRITE_BEHIND_BATCH_SIZE": 100,
+        "WRITE_BEHIND_FLUSH_INTERVAL": 60,
+    }
+    stop_buffer()
+    yield
+    stop_buffer()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_behind_accepts_and_drains(api_client, user1, hydroponic_system1, write_behind):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+
+    response = api_client.post(url, {"ph": 6.5, "temperature": 22.5, "tds": 900}, format="json")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data == {"accepted": 1}
+
+    response = api_client.post(url, [{"ph": 6.6, "temperature": 22.5, "tds": 900}] * 2, format="json")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert len(get_buffer()) == 3
+
+    stop_buffer()
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 3
+
+@pytest.mark.django_db(transaction=True)
+def test_write_behind_backpressure(api_client, user1, hydroponic_system1, write_behind):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+
+    response = api_client.post(url, [{"ph": 6.5, "temperature": 22.5, "tds": 900}] * 3, format="json")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+
+    response = api_client.post(url, {"ph": 6.5, "temperature": 22.5, "tds": 900}, format="json")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in response
+
+@pytest.mark.django_db(transaction=True)
+def test_write_behind_flushes_on_batch_size(api_client, user1, hydroponic_system1, write_behind, settings):
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, "WRITE_BEHIND_BATCH_SIZE": 2}
+    stop_buffer()
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+
+    api_client.post(url, [{"ph": 6.5, "temperature": 22.5, "tds": 900}] * 2, format="json")
+    buffer = get_buffer()
+    for _ in range(100):
+        if not len(buffer) and Measurement.objects.count() == 2:
+            break
+        buffer._thread.join(0.05)
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 2
@@ -0,0 +1,88 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, 0, 250000, tzinfo=timezone.utc)
+    return save_measurements([
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + i % 5 * 0.25,
+            temperature=21.5 + i % 3,
+            tds=800 + i,
+            timestamp=start + timedelta(minutes=7 * i),
+        )
+        for i in range(25)
+    ])
+
+
+@pytest.mark.django_db
+def test_columnar_listing_matches_rows(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    rows = api_client.get(url, {"sort_order": "desc", "page": 2}).json()
+    columns = api_client.get(url, {"sort_order": "desc", "page": 2, "format": "columnar"}).json()
+
+    assert columns["count"] == rows["count"]
+    assert columns["next"].replace("format=columnar&", "") == rows["next"]
+    assert columns["results"] == {
+        "timestamps": [row["timestamp"] for row in rows["results"]],
+        "ph": [row["ph"] for row in rows["results"]],
+        "temperature": [row["temperature"] for row in rows["results"]],
+        "tds": [row["tds"] for row in rows["results"]],
+    }
+
+@pytest.mark.django_db
+def test_columnar_listing_with_cursor(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    first = api_client.get(url, {"pagination": "cursor", "format": "columnar"}).json()
+    second = api_client.get(first["next"]).json()
+
+    assert second["results"]["tds"] == list(range(810, 820))
+
+@pytest.mark.django_db
+def test_columnar_aggregate(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+    buckets = api_client.get(url, {"bucket": "1h"}).json()
+    columns = api_client.get(url, {"bucket": "1h", "format": "columnar"}).json()
+
+    assert columns["results"]["timestamps"] == [b["bucket"] for b in buckets["results"]]
+    assert columns["results"]["count"] == [9, 9, 7]
+    assert columns["results"]["ph"]["max"] == [b["ph"]["max"] for b in buckets["results"]]
+
+@pytest.mark.django_db
+def test_columnar_downsampled_series(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    response = api_client.get(url, {"downsample": "lttb", "points": 5, "format": "columnar"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["series"]["tds"]["timestamps"]) == 5
+    assert response.json()["series"]["tds"]["values"][0] == 800
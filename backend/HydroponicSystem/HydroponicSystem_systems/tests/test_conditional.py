@@ -0,0 +1,155 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.5,
+            temperature=22.0,
+            tds=800 + i,
+            timestamp=datetime(2024, 2, 15, 10, i, tzinfo=timezone.utc),
+        )
+        for i in range(15)
+    )
+
+def measurement_queries(context):
+    return [query for query in context.captured_queries if Measurement._meta.db_table in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_unchanged_measurements_return_304_without_querying(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    first = api_client.get(url, {"sort_order": "desc"})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first["Cache-Control"] == "private, no-cache"
+    with CaptureQueriesContext(connection) as context:
+        second = api_client.get(url, {"sort_order": "desc"}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert second.status_code == status.HTTP_304_NOT_MODIFIED
+    assert second.content == b""
+    assert second["ETag"] == first["ETag"]
+    assert measurement_queries(context) == []
+
+    third = api_client.get(url, {"sort_order": "desc"}, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+    assert third.status_code == status.HTTP_304_NOT_MODIFIED
+
+@pytest.mark.django_db
+def test_new_measurements_change_the_etag(api_client, user1, hydroponic_system1, measurements1, django_capture_on_commit_callbacks):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    first = api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(url, {"ph": 7.0, "temperature": 23.0, "tds": 900}, format="json")
+    second = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json()["count"] == 16
+    assert second["ETag"] != first["ETag"]
+
+@pytest.mark.django_db
+def test_etag_depends_on_format(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    rows = api_client.get(url)
+    columns = api_client.get(url, {"format": "columnar"}, HTTP_IF_NONE_MATCH=rows["ETag"])
+
+    assert columns.status_code == status.HTTP_200_OK
+    assert columns["ETag"] != rows["ETag"]
+
+@pytest.mark.django_db
+def test_system_list_and_detail_revalidate(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    list_url = reverse("hydroponicsystem-list")
+    detail_url = reverse("hydroponicsystem-detail", args=[hydroponic_system1.id])
+    listing = api_client.get(list_url)
+    detail = api_client.get(detail_url)
+
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=listing["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+    assert api_client.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+
+    api_client.put(detail_url, {"name": "Renamed", "location": "Greenhouse 1"}, format="json")
+
+    listing = api_client.get(list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+    assert listing.status_code == status.HTTP_200_OK
+    assert listing.json()["results"][0]["name"] == "Renamed"
+    assert api_client.get(detail_url, HTTP_IF_NONE_MATCH=detail["ETag"]).status_code == status.HTTP_200_OK
+
+    api_client.post(list_url, {"name": "Second", "location": "Greenhouse 2"}, format="json")
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=listing["ETag"]).json()["count"] == 2
+
+@pytest.mark.django_db
+def test_etag_does_not_bypass_ownership(api_client, user1, user2, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    etag = api_client.get(url)["ETag"]
+
+    api_client.force_authenticate(user=user2)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+@pytest.mark.django_db
+def test_markers_follow_writes_from_other_processes(api_client, user1, hydroponic_system1, measurements1, tmp_path):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    list_url = reverse("hydroponicsystem-list")
+    etag = api_client.get(url)["ETag"]
+    list_etag = api_client.get(list_url)["ETag"]
+
+    for cache in caches.all():
+        cache.clear()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    path = tmp_path / "logger.csv"
+    path.write_text("timestamp,ph,temperature,tds\n2024-02-16T00:00:00Z,6.5,22.0,800\n")
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["count"] == 16
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    second = HydroponicSystem.objects.create(owner=user1, name="Test System 2")
+    list_etag = api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)["ETag"]
+    api_client.delete(reverse("hydroponicsystem-detail", args=[second.id]))
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).json()["count"] == 1
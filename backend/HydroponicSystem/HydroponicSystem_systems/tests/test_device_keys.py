@@ -0,0 +1,104 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+from ..authentication import DeviceKeyAuthentication, device_key_cache, hash_device_key, revoke_device_key
+from ..models import HydroponicSystem, Measurement, DeviceKey, User
+
+@pytest.fixture
+def api_client():
+    device_key_cache().clear()
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def hydroponic_system2(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 2", location="Greenhouse 2")
+
+@pytest.fixture
+def device_key(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    response = api_client.post(reverse("device-key", args=[hydroponic_system1.id]), {"name": "Gateway"}, format="json")
+    api_client.force_authenticate(user=None)
+    return response.data
+
+
+@pytest.mark.django_db
+def test_create_device_key_stores_hash_only(device_key, hydroponic_system1):
+    stored = DeviceKey.objects.get(id=device_key["id"])
+
+    assert device_key["key"].startswith(device_key["prefix"])
+    assert stored.system == hydroponic_system1
+    assert device_key["key"] not in stored.key_hash
+
+@pytest.mark.django_db
+def test_device_key_adds_measurement(api_client, device_key, hydroponic_system1):
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = {"ph": 6.5, "temperature": 22.5, "tds": 900}
+    response = api_client.post(url, data, format="json", HTTP_X_DEVICE_KEY=device_key["key"])
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 1
+
+@pytest.mark.django_db
+def test_device_key_is_scoped_to_its_system(api_client, device_key, hydroponic_system2):
+    data = {"ph": 6.5, "temperature": 22.5, "tds": 900}
+    other_system = api_client.post(reverse("measurement", args=[hydroponic_system2.id]), data, format="json", HTTP_X_DEVICE_KEY=device_key["key"])
+    systems = api_client.get(reverse("hydroponicsystem-list"), HTTP_X_DEVICE_KEY=device_key["key"])
+
+    assert other_system.status_code == status.HTTP_403_FORBIDDEN
+    assert systems.status_code == status.HTTP_403_FORBIDDEN
+
+@pytest.mark.django_db
+def test_device_key_authentication_is_cached(device_key, django_assert_num_queries):
+    factory = APIRequestFactory()
+    request = factory.get("/", HTTP_X_DEVICE_KEY=device_key["key"])
+    user, principal = DeviceKeyAuthentication().authenticate(request)
+
+    with django_assert_num_queries(0):
+        cached_user, cached_principal = DeviceKeyAuthentication().authenticate(request)
+
+    assert cached_user == user
+    assert cached_principal == principal
+
+@pytest.mark.django_db
+def test_revoked_device_key_is_rejected(api_client, user1, device_key, hydroponic_system1):
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = {"ph": 6.5, "temperature": 22.5, "tds": 900}
+    assert api_client.post(url, data, format="json", HTTP_X_DEVICE_KEY=device_key["key"]).status_code == status.HTTP_201_CREATED
+
+    api_client.force_authenticate(user=user1)
+    response = api_client.delete(reverse("device-key-revoke", args=[hydroponic_system1.id, device_key["id"]]))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    api_client.force_authenticate(user=None)
+
+    response = api_client.post(url, data, format="json", HTTP_X_DEVICE_KEY=device_key["key"])
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_revocation_clears_the_shared_key_cache(settings, device_key):
+    settings.DEVICE_KEY_CONFIG = {**settings.DEVICE_KEY_CONFIG, 'CACHE_ALIAS': 'default'}
+    request = APIRequestFactory().get("/", HTTP_X_DEVICE_KEY=device_key["key"])
+    DeviceKeyAuthentication().authenticate(request)
+    key_hash = hash_device_key(device_key["key"])
+    assert caches["default"].get(key_hash) is not None
+
+    revoke_device_key(DeviceKey.objects.get(id=device_key["id"]))
+
+    assert caches["default"].get(key_hash) is None
@@ -0,0 +1,81 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from ..downsampling import lttb
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=9.5 if i == 37 else 6.5,
+            temperature=22.0,
+            tds=800 + i,
+            timestamp=start + timedelta(seconds=10 * i),
+        )
+        for i in range(100)
+    )
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    y[613] = 10.0
+
+    indices = lttb(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 613 in indices
+    assert np.all(np.diff(indices) > 0)
+
+def test_lttb_returns_short_series_unchanged():
+    x = np.arange(10, dtype=np.float64)
+
+    assert lttb(x, x, 10).tolist() == list(range(10))
+
+@pytest.mark.django_db
+def test_downsampled_listing(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    response = api_client.get(url, {"downsample": "lttb", "points": 10, "tds_min": 810})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["count"] == 90
+    assert {len(series) for series in response.data["series"].values()} == {10}
+    assert max(point["value"] for point in response.data["series"]["ph"]) == 9.5
+    assert response.data["series"]["tds"][0] == {"timestamp": measurements1[10].timestamp, "value": 810}
+
+@pytest.mark.django_db
+def test_downsampled_listing_invalid_params(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+
+    assert api_client.get(url, {"downsample": "avg"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"downsample": "lttb", "points": 2}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(url, {"downsample": "lttb", "points": "many"}).status_code == status.HTTP_400_BAD_REQUEST
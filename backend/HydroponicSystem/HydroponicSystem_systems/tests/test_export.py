@@ -0,0 +1,154 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import csv
+import gzip
+import io
+import json
+import sys
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, 0, 250000, tzinfo=timezone.utc)
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + i % 5 * 0.25,
+            temperature=21.5,
+            tds=800 + i,
+            timestamp=start + timedelta(minutes=i),
+            device_id="probe-1" if i % 2 else None,
+            sequence=i if i % 2 else None,
+        )
+        for i in range(25)
+    )
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_filtered_rows(api_client, user1, hydroponic_system1, measurements1, settings):
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, "EXPORT_CHUNK_SIZE": 4}
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("measurement-export", args=[hydroponic_system1.id]), {"tds_min": 810, "sort_order": "desc"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    assert response["Content-Disposition"] == f'attachment; filename="system-{hydroponic_system1.id}-measurements.csv"'
+    rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert rows[0] == ["timestamp", "ph", "temperature", "tds", "device_id", "sequence"]
+    assert rows[1] == ["2024-02-15T10:24:00.250000Z", "7.0", "21.5", "824", "", ""]
+    assert rows[2] == ["2024-02-15T10:23:00.250000Z", "6.75", "21.5", "823", "probe-1", "23"]
+    assert len(rows) == 16
+
+@pytest.mark.django_db
+def test_ndjson_export_matches_listing(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("measurement-export", args=[hydroponic_system1.id]), HTTP_ACCEPT="application/x-ndjson")
+    listing = api_client.get(reverse("measurement", args=[hydroponic_system1.id])).json()["results"]
+
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+    assert len(rows) == 25
+    assert rows[:10] == [
+        {field: row[field] for field in ("timestamp", "ph", "temperature", "tds", "device_id", "sequence")}
+        for row in listing
+    ]
+
+@pytest.mark.django_db
+def test_export_is_gzipped_on_request(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-export", args=[hydroponic_system1.id])
+    plain = b"".join(api_client.get(url, {"format": "ndjson"}).streaming_content)
+    response = api_client.get(url, {"format": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert gzip.decompress(b"".join(response.streaming_content)) == plain
+
+@pytest.mark.django_db
+def test_export_errors_are_json(api_client, user1, user2, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user2)
+    url = reverse("measurement-export", args=[hydroponic_system1.id])
+    response = api_client.get(url)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json() == {"detail": "You do not have permission to this system"}
+
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(url, {"timestamp_after": "yesterday"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Invalid timestamp format" in response.json()["detail"]
+
+@pytest.mark.django_db
+def test_arrow_export_is_typed(api_client, user1, hydroponic_system1, measurements1, settings):
+    pa = pytest.importorskip("pyarrow")
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, "EXPORT_CHUNK_SIZE": 10}
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("measurement-export", args=[hydroponic_system1.id]), {"format": "arrow"})
+
+    assert response["Content-Type"] == "application/vnd.apache.arrow.stream"
+    reader = pa.ipc.open_stream(b"".join(response.streaming_content))
+    assert [batch.num_rows for batch in reader] == [10, 10, 5]
+    assert reader.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert reader.schema.field("tds").type == pa.int32()
+
+@pytest.mark.django_db
+def test_parquet_fleet_export(api_client, user1, user2, hydroponic_system1, measurements1, settings):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, "EXPORT_CHUNK_SIZE": 4, "EXPORT_ROW_GROUP_SIZE": 10}
+    second = HydroponicSystem.objects.create(owner=user1, name="Test System 2", location="Greenhouse 2")
+    Measurement.objects.create(system=second, ph=5.5, temperature=20.0, tds=700, timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    HydroponicSystem.objects.create(owner=user2, name="Foreign", location="Elsewhere").measurement_set.create(ph=7.0, temperature=20.0, tds=1)
+    api_client.force_authenticate(user=user1)
+
+    response = api_client.get(reverse("measurement-fleet-export"), {"format": "parquet"}, HTTP_ACCEPT_ENCODING="gzip")
+
+    assert "Content-Encoding" not in response
+    assert response["Content-Disposition"] == 'attachment; filename="measurements.parquet"'
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(response.streaming_content)))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == ["system_id", "timestamp", "ph", "temperature", "tds", "device_id", "sequence"]
+    assert table.column("system_id").to_pylist() == [hydroponic_system1.id] * 25 + [second.id]
+    assert table.column("timestamp")[0].as_py() == measurements1[0].timestamp
+    assert table.column("sequence").to_pylist()[:2] == [None, 1]
+
+@pytest.mark.django_db
+def test_arrow_export_without_pyarrow(api_client, user1, hydroponic_system1, measurements1, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("measurement-export", args=[hydroponic_system1.id]), {"format": "parquet"})
+
+    assert response.status_code == status.HTTP_406_NOT_ACCEPTABLE
+    assert response.json() == {"detail": "Arrow and Parquet exports require the pyarrow package."}
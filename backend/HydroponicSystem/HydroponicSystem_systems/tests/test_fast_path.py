@@ -0,0 +1,87 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from datetime import datetime, timedelta, timezone
+from ..models import HydroponicSystem, Measurement, User
+from ..renderers import FastJSONRenderer
+from ..serializers import (
+    MEASUREMENT_ROW_FIELDS, SYSTEM_ROW_FIELDS, HydroponicSystemSerializer, MeasurementSerializer, measurement_rows, system_rows
+)
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Tomatoes\u2028Zoë", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, 0, 250000, tzinfo=timezone.utc)
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + i / 3,
+            temperature=21.5 + i % 3,
+            tds=800 + i,
+            timestamp=start + timedelta(seconds=37 * i, microseconds=i),
+            device_id="probe-1" if i % 2 else None,
+            sequence=i if i % 2 else None,
+        )
+        for i in range(25)
+    )
+
+
+@pytest.mark.django_db
+def test_fast_rows_render_like_serializers(hydroponic_system1, measurements1):
+    measurements = Measurement.objects.order_by("timestamp", "id")
+    systems = HydroponicSystem.objects.order_by("id")
+    expected_measurements = JSONRenderer().render(MeasurementSerializer(measurements, many=True).data)
+    expected_systems = JSONRenderer().render(HydroponicSystemSerializer(systems, many=True).data)
+
+    for renderer in (JSONRenderer(), FastJSONRenderer()):
+        assert renderer.render(measurement_rows(measurements.values_list(*MEASUREMENT_ROW_FIELDS))) == expected_measurements
+        assert renderer.render(system_rows(systems.values_list(*SYSTEM_ROW_FIELDS))) == expected_systems
+
+@pytest.mark.django_db
+def test_listings_keep_their_schema(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("measurement", args=[hydroponic_system1.id]), {"sort_order": "desc"})
+    expected = MeasurementSerializer(Measurement.objects.order_by("-timestamp", "-id")[:10], many=True).data
+    assert response.content == JSONRenderer().render({
+        "count": 25,
+        "next": response.json()["next"],
+        "previous": None,
+        "results": expected,
+    })
+
+    response = api_client.get(reverse("hydroponicsystem-list"))
+    assert response.json()["results"] == HydroponicSystemSerializer([hydroponic_system1], many=True).data
+
+def test_fast_renderer_matches_json_renderer_for_other_types():
+    data = {
+        1: Decimal("1.50"),
+        "when": datetime(2024, 2, 15, 10, 0, 0, 123456, tzinfo=timezone.utc),
+        "day": datetime(2024, 2, 15).date(),
+        "wait": timedelta(minutes=5),
+        "rows": ("a", None, True, 2.5),
+        "separator": "\u2029",
+    }
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data, "application/json; indent=2") == JSONRenderer().render(data, "application/json; indent=2")
+    assert FastJSONRenderer().render(None) == b""
@@ -0,0 +1,56 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.5,
+            temperature=22.0,
+            tds=800,
+            timestamp=datetime(2024, 2, 15, 10, i, tzinfo=timezone.utc),
+        )
+        for i in range(15)
+    )
+
+
+@pytest.mark.django_db
+def test_measurement_indexes_exist():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Measurement._meta.db_table)
+
+    assert constraints["measurement_system_ts_idx"]["columns"][:3] == ["system_id", "timestamp", "id"]
+    assert constraints["measurement_ts_brin"]["type"] == "brin"
+
+@pytest.mark.django_db
+def test_explain_measurement_queries(hydroponic_system1, measurements1, tmp_path):
+    path = tmp_path / "plans.txt"
+    call_command("explain_measurement_queries", "--output", str(path), stdout=io.StringIO())
+    plans = path.read_text()
+
+    assert f"plans for system {hydroponic_system1.id}" in plans
+    assert "== timestamp range and pH bounds: first page" in plans
+    assert "== default listing: keyset page 1000" not in plans
+    assert "== system detail: latest measurements" in plans
+    assert "Execution Time" in plans
@@ -0,0 +1,104 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def hydroponic_system2(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 2", location="Greenhouse 2")
+
+@pytest.fixture
+def foreign_system(user2):
+    return HydroponicSystem.objects.create(owner=user2, name="Foreign System", location="Greenhouse 3")
+
+
+@pytest.mark.django_db
+def test_fleet_ingest(api_client, user1, hydroponic_system1, hydroponic_system2):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-ingest")
+    data = [
+        {"system_id": hydroponic_system1.id, "ph": 6.5, "temperature": 22.5, "tds": 900},
+        {"system_id": hydroponic_system1.id, "ph": 6.6, "temperature": 22.4, "tds": 910},
+        {"system_id": hydroponic_system2.id, "ph": 6.1, "temperature": 21.0, "tds": 700},
+    ]
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["accepted"] == 3
+    assert response.data["rejected"] == 0
+    assert response.data["systems"][str(hydroponic_system1.id)] == {"accepted": 2, "rejected": 0, "duplicates": 0}
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 2
+    assert Measurement.objects.filter(system=hydroponic_system2).count() == 1
+
+@pytest.mark.django_db
+def test_fleet_ingest_rejects_foreign_and_invalid(api_client, user1, hydroponic_system1, foreign_system):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-ingest")
+    data = [
+        {"system_id": hydroponic_system1.id, "ph": 6.5, "temperature": 22.5, "tds": 900},
+        {"system_id": hydroponic_system1.id, "ph": 300, "temperature": 22.5, "tds": 900},
+        {"system_id": foreign_system.id, "ph": 6.5, "temperature": 22.5, "tds": 900},
+    ]
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["accepted"] == 1
+    assert response.data["rejected"] == 2
+    assert response.data["systems"][str(hydroponic_system1.id)] == {"accepted": 1, "rejected": 1, "duplicates": 0}
+    assert response.data["systems"][str(foreign_system.id)] == {"accepted": 0, "rejected": 1, "duplicates": 0}
+    assert [e["index"] for e in response.data["errors"]] == [1, 2]
+    assert not Measurement.objects.filter(system=foreign_system).exists()
+
+@pytest.mark.django_db
+def test_fleet_ingest_retry_is_noop(api_client, user1, hydroponic_system1, hydroponic_system2):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-ingest")
+    data = [
+        {"system_id": hydroponic_system1.id, "ph": 6.5, "temperature": 22.5, "tds": 900, "device_id": "gw", "sequence": 1},
+        {"system_id": hydroponic_system2.id, "ph": 6.1, "temperature": 21.0, "tds": 700, "device_id": "gw", "sequence": 1},
+    ]
+    api_client.post(url, data, format="json")
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["accepted"] == 0
+    assert response.data["duplicates"] == 2
+    assert response.data["systems"][str(hydroponic_system2.id)] == {"accepted": 0, "rejected": 0, "duplicates": 1}
+    assert Measurement.objects.count() == 2
+
+@pytest.mark.django_db
+def test_fleet_ingest_invalid_payload(api_client, user1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-ingest")
+    response = api_client.post(url, {"ph": 6.5}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Expected a list" in response.data["detail"]
@@ -0,0 +1,115 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timezone
+from ..latest import get_latest_measurements, latest_cache, latest_key, record_latest_measurements
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    latest_cache().clear()
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.5,
+            temperature=22.0,
+            tds=800 + i,
+            timestamp=datetime(2024, 2, 15, 10, i, tzinfo=timezone.utc),
+        )
+        for i in range(15)
+    )
+
+def measurement_queries(context):
+    return [query for query in context.captured_queries if Measurement._meta.db_table in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_detail_view_reads_latest_from_cache(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("hydroponicsystem-detail", args=[hydroponic_system1.id])
+    first = api_client.get(url)
+
+    with CaptureQueriesContext(connection) as context:
+        second = api_client.get(url)
+
+    assert measurement_queries(context) == []
+    assert second.data == first.data
+    assert [m["tds"] for m in second.data["latest_measurements"]] == list(range(814, 804, -1))
+
+@pytest.mark.django_db
+def test_new_measurements_update_cached_latest(api_client, user1, hydroponic_system1, measurements1, django_capture_on_commit_callbacks):
+    api_client.force_authenticate(user=user1)
+    url = reverse("hydroponicsystem-detail", args=[hydroponic_system1.id])
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(
+            reverse("measurement", args=[hydroponic_system1.id]),
+            [{"ph": 7.0, "temperature": 23.0, "tds": 900}, {"ph": 7.1, "temperature": 23.0, "tds": 901}],
+            format="json",
+        )
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+
+    assert measurement_queries(context) == []
+    latest = [m["tds"] for m in response.data["latest_measurements"]]
+    assert sorted(latest[:2]) == [900, 901]
+    assert latest[2:] == list(range(814, 806, -1))
+
+@pytest.mark.django_db
+def test_system_delete_invalidates_latest(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("hydroponicsystem-detail", args=[hydroponic_system1.id])
+    api_client.get(url)
+    assert latest_cache().get(latest_key(hydroponic_system1.id)) is not None
+
+    response = api_client.delete(url)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert latest_cache().get(latest_key(hydroponic_system1.id)) is None
+
+@pytest.mark.django_db
+def test_merge_does_not_repeat_cached_readings(api_client, user1, hydroponic_system1, measurements1):
+    latest = get_latest_measurements(hydroponic_system1)
+    newer = datetime(2024, 2, 16, tzinfo=timezone.utc)
+
+    record_latest_measurements(latest[:2], {hydroponic_system1.id: (hydroponic_system1.changed_at, newer)})
+
+    assert latest_cache().get(latest_key(hydroponic_system1.id)) == (newer, latest)
+
+@pytest.mark.django_db
+def test_changes_outside_the_api_retire_cached_latest(api_client, user1, hydroponic_system1, measurements1, tmp_path):
+    api_client.force_authenticate(user=user1)
+    url = reverse("hydroponicsystem-detail", args=[hydroponic_system1.id])
+    api_client.get(url)
+
+    path = tmp_path / "logger.csv"
+    path.write_text("timestamp,ph,temperature,tds\n2024-02-16T00:00:00Z,6.5,22.0,999\n")
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+
+    assert api_client.get(url).data["latest_measurements"][0]["tds"] == 999
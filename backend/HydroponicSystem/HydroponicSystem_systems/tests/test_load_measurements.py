@@ -0,0 +1,89 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def hydroponic_system2(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 2", location="Greenhouse 2")
+
+
+@pytest.mark.django_db
+def test_load_csv_into_system(tmp_path, hydroponic_system1):
+    path = tmp_path / "logger.csv"
+    path.write_text(
+        "timestamp,ph,temperature,tds\n"
+        "2023-01-01T00:00:00Z,6.5,22.0,800\n"
+        "2023-01-01T00:00:10,6.6,22.1,805\n"
+        "2023-01-01T00:00:20Z,15.0,22.1,805\n"
+        "2023-01-01T00:00:30Z,6.7,22.2,810\n"
+    )
+    out, err = io.StringIO(), io.StringIO()
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), "--chunk-size", "2", stdout=out, stderr=err)
+
+    measurements = Measurement.objects.filter(system=hydroponic_system1).order_by("timestamp")
+    assert measurements.count() == 3
+    assert measurements[1].timestamp == datetime(2023, 1, 1, 0, 0, 10, tzinfo=timezone.utc)
+    assert "Loaded 3 measurements (1 rejected)" in out.getvalue()
+    assert ":4: ph" in err.getvalue()
+
+@pytest.mark.django_db
+def test_load_csv_with_system_column_and_mapping(tmp_path, hydroponic_system1, hydroponic_system2):
+    path = tmp_path / "fleet.csv"
+    path.write_text(
+        "sys;time;ph;temp;tds\n"
+        f"{hydroponic_system1.id};2023-01-01T00:00:00Z;6.5;22.0;800\n"
+        f"{hydroponic_system2.id};2023-01-01T00:00:00Z;6.1;21.0;700\n"
+        "999999;2023-01-01T00:00:00Z;6.1;21.0;700\n"
+    )
+    out, err = io.StringIO(), io.StringIO()
+    call_command(
+        "load_measurements", str(path), "--delimiter", ";",
+        "--column", "system_id=sys", "--column", "timestamp=time", "--column", "temperature=temp",
+        "--drop-indexes", stdout=out, stderr=err,
+    )
+
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 1
+    assert Measurement.objects.filter(system=hydroponic_system2).count() == 1
+    assert "unknown system 999999" in err.getvalue()
+
+@pytest.mark.django_db
+def test_load_parquet(tmp_path, hydroponic_system1):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "logger.parquet"
+    table = pa.table({
+        "timestamp": [datetime(2023, 1, 1, 0, 0, i, tzinfo=timezone.utc) for i in range(3)],
+        "ph": [6.5, 6.6, 6.7],
+        "temperature": [22.0, 22.1, 22.2],
+        "tds": [800, 805, 810],
+    })
+    pq.write_table(table, path)
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 3
+
+@pytest.mark.django_db
+def test_load_unknown_system(tmp_path):
+    path = tmp_path / "logger.csv"
+    path.write_text("timestamp,ph,temperature,tds\n")
+    with pytest.raises(CommandError):
+        call_command("load_measurements", str(path), "--system", "999999", stdout=io.StringIO())
@@ -117,5 +117,86 @@ def test_sort_measurements_descending(api_client, user1, hydroponic_system1, mea
     response = api_client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
-    timestamps = [datetime.strptime(m["timestamp"], "%Y-%m-%dT%H:%M:%S.%fZ") for m in response.data["results"]]
+    timestamps = [datetime.fromisoformat(m["timestamp"].replace("Z", "+00:00")) for m in response.data["results"]]
     assert timestamps == sorted(timestamps, reverse=True)
+
+@pytest.mark.django_db
+def test_create_measurements_bulk(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = [{"ph": 6.0 + i / 10, "temperature": 22.5, "tds": 900} for i in range(5)]
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["created"] == 5
+    assert response.data["duplicates"] == []
+    assert all(m["id"] is not None for m in response.data["results"])
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 5
+
+@pytest.mark.django_db
+def test_create_measurements_bulk_invalid_item(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = [
+        {"ph": 6.5, "temperature": 22.5, "tds": 900},
+        {"ph": 300, "temperature": 22.5, "tds": 900},
+    ]
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data[0] == {}
+    assert "ph" in response.data[1]
+    assert not Measurement.objects.filter(system=hydroponic_system1).exists()
+
+@pytest.mark.django_db
+def test_create_measurements_bulk_too_many(api_client, user1, hydroponic_system1, settings):
+    settings.MEASUREMENT_CONFIG = {"BULK_MAX_ITEMS": 2}
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = [{"ph": 6.5, "temperature": 22.5, "tds": 900}] * 3
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Measurement.objects.filter(system=hydroponic_system1).exists()
+
+@pytest.mark.django_db
+def test_create_measurement_duplicate_sequence(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = {"ph": 6.5, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 7}
+    first = api_client.post(url, data, format="json")
+    retry = api_client.post(url, data, format="json")
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert retry.status_code == status.HTTP_200_OK
+    assert retry.data["id"] == first.data["id"]
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 1
+
+@pytest.mark.django_db
+def test_create_measurements_bulk_reports_duplicates(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    Measurement.objects.create(system=hydroponic_system1, ph=6.5, temperature=22.5, tds=900, device_id="gw-1", sequence=1)
+    data = [
+        {"ph": 6.5, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 1},
+        {"ph": 6.6, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 2},
+        {"ph": 6.6, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": 2},
+        {"ph": 6.7, "temperature": 22.5, "tds": 900},
+    ]
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["created"] == 2
+    assert response.data["duplicates"] == [0, 2]
+    assert response.data["results"][1]["id"] == response.data["results"][2]["id"]
+    assert Measurement.objects.filter(system=hydroponic_system1).count() == 3
+
+@pytest.mark.django_db
+def test_create_measurement_sequence_without_device(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = {"ph": 6.5, "temperature": 22.5, "tds": 900, "sequence": 7}
+    response = api_client.post(url, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "non_field_errors" in response.data
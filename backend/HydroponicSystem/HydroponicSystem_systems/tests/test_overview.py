@@ -0,0 +1,104 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import timedelta
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def systems(user1):
+    return [
+        HydroponicSystem.objects.create(owner=user1, name=f"System {i}", location="Greenhouse A" if i % 2 else "Greenhouse B")
+        for i in range(12)
+    ]
+
+@pytest.fixture
+def measurements(systems):
+    now = timezone.now()
+    return save_measurements([
+        Measurement(
+            system=system,
+            ph=5.0 + hours_ago * 0.1,
+            temperature=20.0 + i,
+            tds=800 + hours_ago,
+            timestamp=now - timedelta(hours=hours_ago),
+        )
+        for i, system in enumerate(systems[:10])
+        for hours_ago in (0, 5, 30)
+    ])
+
+
+@pytest.mark.django_db
+def test_overview_lists_systems_with_latest_reading(api_client, user1, systems, measurements, django_assert_num_queries):
+    api_client.force_authenticate(user=user1)
+
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse("hydroponicsystem-overview"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["count"] == 12
+    assert len(response.data["results"]) == 12
+
+    first = response.data["results"][0]
+    assert first["name"] == "System 0"
+    assert first["latest_measurement"]["tds"] == 800
+    assert first["latest_measurement"]["timestamp"] == measurements[0][0].timestamp
+    assert first["last_24h"] == {
+        "ph": {"min": 5.0, "max": 5.5},
+        "temperature": {"min": 20.0, "max": 20.0},
+        "tds": {"min": 800, "max": 805},
+    }
+    assert response.data["results"][-1]["latest_measurement"] is None
+    assert response.data["results"][-1]["last_24h"] is None
+
+@pytest.mark.django_db
+def test_overview_uses_list_filters(api_client, user1, systems, measurements):
+    api_client.force_authenticate(user=user1)
+    response = api_client.get(reverse("hydroponicsystem-overview"), {"location": "greenhouse a", "sort_order": "desc", "page_size": 2})
+
+    assert response.data["count"] == 6
+    assert [s["name"] for s in response.data["results"]] == ["System 11", "System 9"]
+
+    response = api_client.get(reverse("hydroponicsystem-overview"), {"created_after": "yesterday"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"detail": "Invalid date format. Expected format: YYYY-MM-DD."}
+
+    response = api_client.get(reverse("hydroponicsystem-overview"), {"sort_by": "bogus"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["detail"].startswith("Invalid value for 'sort_by'.")
+
+    response = api_client.get(reverse("measurement", args=[systems[0].id]), {"sort_by": "bogus"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+@pytest.mark.django_db
+def test_overview_only_lists_own_systems(api_client, user2, systems, measurements):
+    api_client.force_authenticate(user=user2)
+    response = api_client.get(reverse("hydroponicsystem-overview"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["count"] == 0
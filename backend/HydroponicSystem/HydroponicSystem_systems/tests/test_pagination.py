@@ -0,0 +1,108 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    # Pairs of readings share a timestamp so pages have to break ties on id.
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=5.0 + i % 7 * 0.5,
+            temperature=22.0,
+            tds=800,
+            timestamp=datetime(2024, 2, 15, 10, i // 2, tzinfo=timezone.utc),
+        )
+        for i in range(25)
+    )
+
+
+def walk(api_client, url):
+    ids = []
+    pages = 0
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        ids.extend(m["id"] for m in response.data["results"])
+        url = response.data["next"]
+        pages += 1
+    return ids, pages, response
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_every_measurement(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id]) + "?pagination=cursor"
+    ids, pages, _ = walk(api_client, url)
+
+    assert ids == [m.id for m in sorted(measurements1, key=lambda m: (m.timestamp, m.id))]
+    assert pages == 3
+
+@pytest.mark.django_db
+def test_cursor_pagination_respects_sort_and_filters(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id]) + "?pagination=cursor&sort_by=ph&sort_order=desc&ph_min=6"
+    ids, _, _ = walk(api_client, url)
+
+    expected = sorted((m for m in measurements1 if m.ph >= 6), key=lambda m: (m.ph, m.id), reverse=True)
+    assert ids == [m.id for m in expected]
+
+@pytest.mark.django_db
+def test_cursor_pagination_previous_link(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id]) + "?pagination=cursor&sort_order=desc"
+    first = api_client.get(url)
+    second = api_client.get(first.data["next"])
+    back = api_client.get(second.data["previous"])
+
+    assert first.data["previous"] is None
+    assert first.data["count"] == 25
+    assert back.data["results"] == first.data["results"]
+    assert back.data["previous"] is None
+
+@pytest.mark.django_db
+def test_cursor_pagination_without_count(api_client, user1, hydroponic_system1, measurements1, django_assert_num_queries):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id]) + "?pagination=cursor&count=false"
+
+    with django_assert_num_queries(2):
+        response = api_client.get(url)
+
+    assert "count" not in response.data
+    assert len(response.data["results"]) == 10
+
+@pytest.mark.django_db
+def test_cursor_pagination_rejects_invalid_cursor(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    next_link = api_client.get(url + "?pagination=cursor").data["next"]
+    cursor = next_link.split("cursor=")[1]
+
+    garbage = api_client.get(url + "?cursor=not-a-cursor")
+    other_order = api_client.get(url + f"?cursor={cursor}&sort_order=desc")
+
+    assert garbage.status_code == status.HTTP_400_BAD_REQUEST
+    assert other_order.status_code == status.HTTP_400_BAD_REQUEST
+    assert garbage.data["detail"] == "Invalid cursor."
@@ -0,0 +1,131 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from datetime import datetime, timezone
+from .. import ingestion
+from ..ingestion import save_measurements
+from ..models import HourlyRollup, HydroponicSystem, Measurement, User
+from ..partitions import create_partitions, is_partitioned, month_partitions, partition_name
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    return save_measurements([
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.5,
+            temperature=22.0,
+            tds=800 + i,
+            timestamp=datetime(2024, month, 15, 10, i, tzinfo=timezone.utc),
+            device_id="probe-1",
+            sequence=month * 100 + i,
+        )
+        for month in (2, 5)
+        for i in range(10)
+    ])
+
+def partition(month):
+    return partition_name(datetime(2024, month, 1, tzinfo=timezone.utc))
+
+
+@pytest.mark.django_db
+def test_convert_keeps_rows_and_prunes_partitions(api_client, user1, hydroponic_system1, measurements1):
+    with pytest.raises(CommandError):
+        call_command("partition_measurements", stdout=io.StringIO())
+
+    call_command("partition_measurements", "--convert", stdout=io.StringIO())
+
+    assert is_partitioned()
+    assert month_partitions()[0][1] == partition(2)
+    assert Measurement.objects.count() == 20
+
+    api_client.force_authenticate(user=user1)
+    params = {"timestamp_after": "2024-05-01", "timestamp_before": "2024-05-31"}
+    response = api_client.get(reverse("measurement", args=[hydroponic_system1.id]), params)
+    assert response.json()["count"] == 10
+
+    plan = Measurement.objects.filter(timestamp__gte=datetime(2024, 5, 1, tzinfo=timezone.utc), timestamp__lt=datetime(2024, 6, 1, tzinfo=timezone.utc)).explain()
+    assert partition(5) in plan
+    assert partition(2) not in plan
+
+    created = save_measurements([Measurement(system=hydroponic_system1, ph=7.0, temperature=21.0, tds=900, device_id="probe-1", sequence=1)])
+    assert created[0][0].id > max(m.id for m, _ in measurements1)
+    duplicate = save_measurements([Measurement(system=hydroponic_system1, ph=7.0, temperature=21.0, tds=900, device_id="probe-1", sequence=1)])
+    assert duplicate[0] == (created[0][0], False)
+
+@pytest.mark.django_db
+def test_retention_drops_expired_partitions(hydroponic_system1, measurements1):
+    call_command("partition_measurements", "--convert", stdout=io.StringIO())
+    rollups = HourlyRollup.objects.count()
+    months = (datetime.now(timezone.utc).year - 2024) * 12 + datetime.now(timezone.utc).month - 5
+
+    output = io.StringIO()
+    call_command("partition_measurements", "--retention-months", months, "--dry-run", stdout=output)
+    assert f"Would drop {partition(2)}." in output.getvalue()
+    assert f"Would drop {partition(5)}." not in output.getvalue()
+    assert Measurement.objects.count() == 20
+
+    call_command("partition_measurements", "--retention-months", months, "--detach-only", stdout=io.StringIO())
+
+    assert Measurement.objects.count() == 10
+    assert month_partitions()[0][1] == partition(5)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{partition(2)}"')
+        assert cursor.fetchone()[0] == 10
+    assert HourlyRollup.objects.count() == rollups
+    hydroponic_system1.refresh_from_db()
+    assert hydroponic_system1.raw_compacted_before == datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+@pytest.mark.django_db
+def test_new_partition_takes_rows_from_default(hydroponic_system1, measurements1):
+    call_command("partition_measurements", "--convert", "--ahead", "0", stdout=io.StringIO())
+    future = datetime(2040, 3, 2, tzinfo=timezone.utc)
+    Measurement.objects.create(system=hydroponic_system1, ph=7.0, temperature=21.0, tds=900, timestamp=future)
+
+    assert create_partitions([datetime(2040, 3, 1, tzinfo=timezone.utc)]) == [partition_name(future)]
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{partition_name(future)}"')
+        assert cursor.fetchone()[0] == 1
+    assert Measurement.objects.count() == 21
+
+@pytest.mark.django_db
+def test_keys_stay_unique_across_partitions(monkeypatch, hydroponic_system1, measurements1):
+    call_command("partition_measurements", "--convert", stdout=io.StringIO())
+    lookups = []
+    stored_measurements = ingestion._stored_measurements
+
+    # The first lookup runs before the lock, as if a concurrent retry committed right after it.
+    def stale_first_lookup(keys):
+        lookups.append(keys)
+        return {} if len(lookups) == 1 else stored_measurements(keys)
+
+    monkeypatch.setattr(ingestion, "_stored_measurements", stale_first_lookup)
+    retry = Measurement(system=hydroponic_system1, ph=6.5, temperature=22.0, tds=800, timestamp=datetime(2024, 8, 1, tzinfo=timezone.utc), device_id="probe-1", sequence=200)
+
+    (stored, created), = save_measurements([retry])
+    assert not created
+    assert stored.timestamp == datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    assert Measurement.objects.filter(device_id="probe-1", sequence=200).count() == 1
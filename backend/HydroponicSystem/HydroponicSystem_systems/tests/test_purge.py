@@ -0,0 +1,114 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from HydroponicSystem_jobs.models import Job
+from HydroponicSystem_jobs.queue import claim_job, run_job
+from ..authentication import device_key_cache
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, DeviceKey, HourlyRollup, User
+
+@pytest.fixture
+def api_client():
+    device_key_cache().clear()
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    return save_measurements([
+        Measurement(system=hydroponic_system1, ph=6.5, temperature=22.0, tds=800 + i, timestamp=start + timedelta(minutes=10 * i))
+        for i in range(50)
+    ])
+
+@pytest.fixture
+def device_key(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    response = api_client.post(reverse("device-key", args=[hydroponic_system1.id]), {"name": "Gateway"}, format="json")
+    api_client.force_authenticate(user=None)
+    return response.data
+
+
+@pytest.mark.django_db
+def test_delete_hides_system_before_purge(settings, api_client, user1, hydroponic_system1, measurements1, device_key, django_capture_on_commit_callbacks):
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, 'PURGE_IN_BACKGROUND': False, 'PURGE_BATCH_SIZE': 7}
+    reading = {"ph": 6.5, "temperature": 22.5, "tds": 900}
+    api_client.post(reverse("measurement", args=[hydroponic_system1.id]), reading, format="json", HTTP_X_DEVICE_KEY=device_key["key"])
+
+    api_client.force_authenticate(user=user1)
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = api_client.delete(reverse("hydroponicsystem-detail", args=[hydroponic_system1.id]))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not HydroponicSystem.objects.filter(id=hydroponic_system1.id).exists()
+    assert HydroponicSystem.all_objects.get(id=hydroponic_system1.id).deleted_at is not None
+    assert Measurement.objects.filter(system_id=hydroponic_system1.id).count() == 51
+    assert api_client.get(reverse("hydroponicsystem-list")).data["count"] == 0
+    assert api_client.get(reverse("measurement", args=[hydroponic_system1.id])).status_code == status.HTTP_403_FORBIDDEN
+    assert api_client.get(reverse("measurement-fleet-export"), HTTP_ACCEPT="text/csv").getvalue().count(b"\n") == 1
+
+    api_client.force_authenticate(user=None)
+    response = api_client.post(reverse("measurement", args=[hydroponic_system1.id]), reading, format="json", HTTP_X_DEVICE_KEY=device_key["key"])
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    for callback in callbacks:
+        callback()
+
+    assert not HydroponicSystem.all_objects.filter(id=hydroponic_system1.id).exists()
+    assert not Measurement.objects.filter(system_id=hydroponic_system1.id).exists()
+    assert not HourlyRollup.objects.filter(system_id=hydroponic_system1.id).exists()
+    assert not DeviceKey.objects.filter(system_id=hydroponic_system1.id).exists()
+
+@pytest.mark.django_db
+def test_purge_command_finishes_interrupted_purges(user1, hydroponic_system1, measurements1):
+    other = HydroponicSystem.objects.create(owner=user1, name="Test System 2")
+    HydroponicSystem.objects.filter(id=hydroponic_system1.id).update(deleted_at=datetime.now(timezone.utc))
+
+    output = io.StringIO()
+    call_command("purge_deleted_systems", "--batch-size", "20", stdout=output)
+
+    assert f"System {hydroponic_system1.id} purged (50 measurements)." in output.getvalue()
+    assert list(HydroponicSystem.all_objects.values_list("id", flat=True)) == [other.id]
+    assert not Measurement.objects.exists()
+
+@pytest.mark.django_db
+def test_system_responses_omit_deleted_at(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    detail = api_client.get(reverse("hydroponicsystem-detail", args=[hydroponic_system1.id]))
+    listing = api_client.get(reverse("hydroponicsystem-list"))
+
+    assert "deleted_at" not in detail.data["hydroponic_system"]
+    assert listing.data["results"][0].keys() == detail.data["hydroponic_system"].keys()
+
+@pytest.mark.django_db
+def test_delete_enqueues_purge_job(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    api_client.delete(reverse("hydroponicsystem-detail", args=[hydroponic_system1.id]))
+
+    job = Job.objects.get(kind="purge_system")
+    assert (job.owner, job.payload) == (user1, {"system_id": hydroponic_system1.id})
+
+    run_job(claim_job())
+    job.refresh_from_db()
+    assert job.status == Job.Status.SUCCEEDED
+    assert (job.progress_done, job.progress_total, job.result) == (50, 50, {"deleted": 50})
+    assert not HydroponicSystem.all_objects.filter(id=hydroponic_system1.id).exists()
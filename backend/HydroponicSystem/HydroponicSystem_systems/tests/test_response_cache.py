@@ -0,0 +1,128 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+from ..response_cache import response_cache
+
+@pytest.fixture
+def api_client():
+    response_cache().clear()
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def staff_user():
+    return User.objects.create(email="staff@example.com", is_staff=True)
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    return Measurement.objects.bulk_create(
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.5,
+            temperature=22.0,
+            tds=800 + i,
+            timestamp=datetime(2024, 2, 15, 10, i, tzinfo=timezone.utc),
+        )
+        for i in range(15)
+    )
+
+def measurement_queries(context):
+    return [query for query in context.captured_queries if Measurement._meta.db_table in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_repeated_listing_is_served_from_cache(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    first = api_client.get(url, {"sort_order": "desc", "page": 2})
+
+    with CaptureQueriesContext(connection) as context:
+        second = api_client.get(url, {"page": 2, "sort_order": "desc"})
+
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert measurement_queries(context) == []
+    assert second.content == first.content
+    assert api_client.get(url, {"sort_order": "asc", "page": 2})["X-Cache"] == "MISS"
+
+@pytest.mark.django_db
+def test_new_measurements_bypass_cached_listing(api_client, user1, hydroponic_system1, measurements1, django_capture_on_commit_callbacks):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    api_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(url, {"ph": 7.0, "temperature": 23.0, "tds": 900}, format="json")
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["count"] == 16
+
+@pytest.mark.django_db
+def test_system_changes_bypass_cached_list(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("hydroponicsystem-list")
+    api_client.get(url)
+    assert api_client.get(url)["X-Cache"] == "HIT"
+
+    api_client.post(url, {"name": "Second", "location": "Greenhouse 2"}, format="json")
+    response = api_client.get(url)
+
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["count"] == 2
+
+@pytest.mark.django_db
+def test_writes_outside_the_api_bypass_cached_responses(api_client, user1, hydroponic_system1, measurements1, tmp_path):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    list_url = reverse("hydroponicsystem-list")
+    api_client.get(url)
+    api_client.get(list_url)
+
+    path = tmp_path / "logger.csv"
+    path.write_text("timestamp,ph,temperature,tds\n2024-02-16T00:00:00Z,6.5,22.0,800\n")
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+    hydroponic_system1.name = "Renamed"
+    hydroponic_system1.save()
+
+    response = api_client.get(url)
+    assert (response["X-Cache"], response.json()["count"]) == ("MISS", 16)
+    response = api_client.get(list_url)
+    assert (response["X-Cache"], response.json()["results"][0]["name"]) == ("MISS", "Renamed")
+
+@pytest.mark.django_db
+def test_cache_stats_are_staff_only(api_client, user1, staff_user, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    for _ in range(3):
+        api_client.get(url)
+    assert api_client.get(reverse("response-cache-stats")).status_code == status.HTTP_403_FORBIDDEN
+
+    api_client.force_authenticate(user=staff_user)
+    response = api_client.get(reverse("response-cache-stats"))
+
+    assert response.data == {"hits": 2, "misses": 1, "hit_ratio": 0.6667}
+    assert api_client.delete(reverse("response-cache-stats")).status_code == status.HTTP_204_NO_CONTENT
+    assert api_client.get(reverse("response-cache-stats")).data["hit_ratio"] is None
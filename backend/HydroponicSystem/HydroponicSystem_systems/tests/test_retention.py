@@ -0,0 +1,167 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from datetime import timedelta
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, HourlyRollup, DailyRollup, User
+from ..retention import compact_system, compaction_cutoff
+from ..rollups import rebuild_rollups
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1", raw_retention_days=1)
+
+# One reading every 20 minutes over the last three days.
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    now = timezone.now()
+    return save_measurements([
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + i % 4 * 0.25,
+            temperature=20.0 + i % 3,
+            tds=800 + i,
+            timestamp=now - timedelta(minutes=20 * i),
+        )
+        for i in range(216)
+    ])
+
+def rollup_count(system):
+    return HourlyRollup.objects.filter(system=system).aggregate(total=Sum("count"))["total"]
+
+
+@pytest.mark.django_db
+def test_compaction_deletes_raw_readings_in_batches(hydroponic_system1, measurements1):
+    cutoff = compaction_cutoff(1)
+    older = Measurement.objects.filter(timestamp__lt=cutoff).count()
+
+    output = io.StringIO()
+    call_command("compact_measurements", "--batch-size", "7", stdout=output)
+
+    hydroponic_system1.refresh_from_db()
+    assert hydroponic_system1.raw_compacted_before == cutoff
+    assert cutoff.minute == cutoff.second == 0
+    assert not Measurement.objects.filter(timestamp__lt=cutoff).exists()
+    assert Measurement.objects.count() == 216 - older
+    assert rollup_count(hydroponic_system1) == 216
+    assert f"{older} readings" in output.getvalue()
+
+    assert compact_system(hydroponic_system1, 7) == 0
+
+@pytest.mark.django_db
+def test_compaction_keeps_readings_missing_from_rollups(hydroponic_system1, measurements1):
+    start = compaction_cutoff(3) - timedelta(hours=2)
+    Measurement.objects.bulk_create(
+        Measurement(system=hydroponic_system1, ph=7.0, temperature=25.0, tds=1000 + i, timestamp=start + timedelta(minutes=10 * i))
+        for i in range(12)
+    )
+
+    compact_system(hydroponic_system1, 5)
+
+    assert rollup_count(hydroponic_system1) == 216 + 12
+    assert DailyRollup.objects.filter(system=hydroponic_system1).aggregate(total=Sum("count"))["total"] == 216 + 12
+    restored = HourlyRollup.objects.get(system=hydroponic_system1, bucket=start)
+    assert (restored.count, restored.tds_min, restored.tds_max, restored.ph_sum) == (6, 1000, 1005, pytest.approx(42.0))
+
+@pytest.mark.django_db
+def test_global_retention_applies_to_systems_without_their_own(settings, user1, measurements1):
+    other = HydroponicSystem.objects.create(owner=user1, name="Test System 2")
+    save_measurements([Measurement(system=other, ph=6.5, temperature=22.0, tds=800, timestamp=timezone.now() - timedelta(days=5))])
+
+    call_command("compact_measurements", stdout=io.StringIO())
+    assert Measurement.objects.filter(system=other).count() == 1
+
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, 'RAW_RETENTION_DAYS': 3}
+    call_command("compact_measurements", "--system", str(other.id), stdout=io.StringIO())
+    assert Measurement.objects.filter(system=other).count() == 0
+    assert rollup_count(other) == 1
+
+@pytest.mark.django_db
+def test_rebuild_keeps_compacted_buckets(hydroponic_system1, measurements1):
+    compact_system(hydroponic_system1, 1000)
+    HourlyRollup.objects.filter(bucket__gte=hydroponic_system1.raw_compacted_before).update(count=0)
+
+    rebuild_rollups([hydroponic_system1.id])
+
+    assert rollup_count(hydroponic_system1) == 216
+
+@pytest.mark.django_db
+def test_reads_use_rollups_for_compacted_range(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    compact_system(hydroponic_system1, 1000)
+    raw = Measurement.objects.count()
+    compacted_hours = HourlyRollup.objects.filter(bucket__lt=hydroponic_system1.raw_compacted_before).count()
+
+    response = api_client.get(reverse("measurement-aggregate", args=[hydroponic_system1.id]), {"bucket": "5m"})
+    assert response.data["bucket"] == "1h"
+    assert sum(bucket["count"] for bucket in response.data["results"]) == 216
+
+    today = timezone.now().strftime("%Y-%m-%d")
+    response = api_client.get(reverse("measurement-aggregate", args=[hydroponic_system1.id]), {"bucket": "5m", "timestamp_after": today})
+    assert response.data["bucket"] == "5m"
+
+    response = api_client.get(reverse("measurement", args=[hydroponic_system1.id]), {"downsample": "lttb", "points": 5000})
+    assert response.data["count"] == compacted_hours + raw
+    assert response.data["series"]["ph"][0]["timestamp"] < hydroponic_system1.raw_compacted_before
+
+    response = api_client.get(reverse("measurement", args=[hydroponic_system1.id]))
+    assert response.data["count"] == raw
+
+@pytest.mark.django_db
+def test_value_filters_reject_compacted_range(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    compact_system(hydroponic_system1, 1000)
+
+    response = api_client.get(reverse("measurement-aggregate", args=[hydroponic_system1.id]), {"ph_min": 6})
+    assert response.status_code == 400
+
+    response = api_client.get(reverse("measurement", args=[hydroponic_system1.id]), {"downsample": "lttb", "ph_min": 6})
+    assert response.status_code == 400
+
+    today = timezone.now().strftime("%Y-%m-%d")
+    response = api_client.get(reverse("measurement-aggregate", args=[hydroponic_system1.id]), {"ph_min": 6, "timestamp_after": today})
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_invalid_dates_are_rejected_on_compacted_range(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    compact_system(hydroponic_system1, 1000)
+
+    for url in (reverse("measurement-aggregate", args=[hydroponic_system1.id]), reverse("measurement", args=[hydroponic_system1.id])):
+        response = api_client.get(url, {"ph_min": 6, "timestamp_after": "bad", "downsample": "lttb"})
+        assert response.status_code == 400
+        assert response.data["detail"] == "Invalid timestamp format. Expected format: YYYY-MM-DD."
+
+@pytest.mark.django_db
+def test_statistics_flag_compacted_range(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    compact_system(hydroponic_system1, 1000)
+    url = reverse("measurement-statistics", args=[hydroponic_system1.id])
+
+    response = api_client.get(url)
+    assert response.data["count"] == Measurement.objects.count()
+    assert response.data["truncated_before"] == hydroponic_system1.raw_compacted_before
+    assert api_client.get(url, {"ph_min": 6.5}).status_code == 400
+
+    today = timezone.now().strftime("%Y-%m-%d")
+    assert api_client.get(url, {"timestamp_after": today}).data["truncated_before"] is None
@@ -0,0 +1,168 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import io
+import threading
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from datetime import datetime, timedelta, timezone
+from HydroponicSystem_jobs.queue import claim_job, run_job
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, HourlyRollup, DailyRollup, User
+from ..changes import mark_changed
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+def readings(system, start, count, **extra):
+    return [
+        Measurement(
+            system=system,
+            ph=6.0 + i % 4 * 0.25,
+            temperature=20.0 + i % 3,
+            tds=800 + i,
+            timestamp=start + timedelta(minutes=15 * i),
+            **extra,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_ingestion_updates_rollups(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    save_measurements(readings(hydroponic_system1, start, 2))
+    save_measurements(readings(hydroponic_system1, start + timedelta(minutes=30), 2))
+
+    hourly = HourlyRollup.objects.get(system=hydroponic_system1, bucket=start)
+    assert hourly.count == 4
+    assert (hourly.ph_min, hourly.ph_max) == (6.0, 6.25)
+    assert hourly.tds_sum == 800 + 801 + 800 + 801
+    assert hourly.temperature_sum_sq == pytest.approx(20.0 ** 2 * 2 + 21.0 ** 2 * 2)
+    assert DailyRollup.objects.get(system=hydroponic_system1).count == 4
+
+@pytest.mark.django_db
+def test_duplicates_are_not_counted_twice(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement", args=[hydroponic_system1.id])
+    data = [{"ph": 6.5, "temperature": 22.5, "tds": 900, "device_id": "gw-1", "sequence": n} for n in range(3)]
+    api_client.post(url, data, format="json")
+    api_client.post(url, data, format="json")
+
+    assert DailyRollup.objects.get(system=hydroponic_system1).count == 3
+
+@pytest.mark.django_db
+def test_rebuild_rollups_matches_ingestion(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    save_measurements(readings(hydroponic_system1, start, 200))
+    fields = ("bucket", "count", "ph_min", "temperature_max", "tds_sum", "tds_sum_sq")
+    hourly = list(HourlyRollup.objects.order_by("bucket").values_list(*fields))
+    daily = list(DailyRollup.objects.order_by("bucket").values_list(*fields))
+
+    HourlyRollup.objects.update(count=0)
+    DailyRollup.objects.all().delete()
+    call_command("rebuild_rollups", "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+
+    assert list(HourlyRollup.objects.order_by("bucket").values_list(*fields)) == hourly
+    assert list(DailyRollup.objects.order_by("bucket").values_list(*fields)) == daily
+
+@pytest.mark.django_db
+def test_rebuild_keeps_compacted_hours(hydroponic_system1):
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    save_measurements(readings(hydroponic_system1, start, 8))
+    Measurement.objects.filter(timestamp__lt=start + timedelta(hours=1)).delete()
+
+    call_command("rebuild_rollups", stdout=io.StringIO())
+
+    assert list(HourlyRollup.objects.order_by("bucket").values_list("count", flat=True)) == [4, 4]
+    assert DailyRollup.objects.get(system=hydroponic_system1).count == 8
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_only_holds_off_its_own_system(user1, hydroponic_system1):
+    other = HydroponicSystem.objects.create(owner=user1, name="Test System 2")
+    start = datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+    saved = {}
+
+    def ingest(system):
+        saved[system.id] = len(save_measurements(readings(system, start, 2)))
+        connection.close()
+
+    with transaction.atomic():
+        mark_changed([hydroponic_system1.id])
+        elsewhere = threading.Thread(target=ingest, args=(other,))
+        elsewhere.start()
+        elsewhere.join(10)
+        blocked = threading.Thread(target=ingest, args=(hydroponic_system1,))
+        blocked.start()
+        blocked.join(0.5)
+        assert blocked.is_alive()
+
+    blocked.join(10)
+    assert saved == {other.id: 2, hydroponic_system1.id: 2}
+    assert DailyRollup.objects.get(system=other).count == 2
+
+@pytest.mark.django_db
+def test_load_measurements_rebuilds_rollups(tmp_path, hydroponic_system1):
+    path = tmp_path / "logger.csv"
+    path.write_text(
+        "timestamp,ph,temperature,tds\n"
+        "2023-01-01T00:00:00Z,6.5,22.0,800\n"
+        "2023-01-01T00:30:00Z,6.7,22.2,810\n"
+    )
+    call_command("load_measurements", str(path), "--system", str(hydroponic_system1.id), stdout=io.StringIO())
+
+    assert HourlyRollup.objects.get(system=hydroponic_system1).count == 2
+
+@pytest.mark.django_db
+def test_daily_aggregate_reads_rollups(api_client, user1, hydroponic_system1):
+    start = datetime(2024, 2, 15, 0, 0, tzinfo=timezone.utc)
+    save_measurements(readings(hydroponic_system1, start, 300))
+    Measurement.objects.filter(system=hydroponic_system1, timestamp__gte=start + timedelta(days=2)).delete()
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+
+    response = api_client.get(url, {"bucket": "1d", "timestamp_before": "2024-02-18"})
+
+    assert [b["count"] for b in response.data["results"]] == [96, 96, 96, 12]
+    assert response.data["results"][0]["tds"] == {"min": 800, "max": 895, "avg": pytest.approx(847.5)}
+
+@pytest.mark.django_db
+def test_rollup_and_raw_aggregates_share_the_range_end(api_client, user1, hydroponic_system1):
+    save_measurements(readings(hydroponic_system1, datetime(2024, 2, 15, 0, 0, tzinfo=timezone.utc), 300))
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-aggregate", args=[hydroponic_system1.id])
+
+    rollups = api_client.get(url, {"bucket": "1d", "timestamp_before": "2024-02-18"})
+    raw = api_client.get(url, {"bucket": "1d", "timestamp_before": "2024-02-18", "ph_min": 0})
+
+    assert [b["count"] for b in rollups.data["results"]] == [b["count"] for b in raw.data["results"]]
+
+@pytest.mark.django_db
+def test_rebuild_can_run_as_a_job(hydroponic_system1):
+    save_measurements(readings(hydroponic_system1, datetime(2024, 2, 15, 0, 0, tzinfo=timezone.utc), 8))
+    HourlyRollup.objects.all().delete()
+
+    call_command("rebuild_rollups", "--enqueue", stdout=io.StringIO())
+    assert not HourlyRollup.objects.exists()
+
+    job = run_job(claim_job())
+    assert job.result == {"rebuilt": 1}
+    assert (job.progress_done, job.progress_total) == (1, 1)
+    assert HourlyRollup.objects.filter(system=hydroponic_system1).count() == 2
@@ -0,0 +1,129 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timedelta, timezone
+from ..ingestion import save_measurements
+from ..models import HydroponicSystem, Measurement, User
+from ..response_cache import response_cache
+from .. import rolling_statistics
+
+@pytest.fixture
+def api_client():
+    response_cache().clear()
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="otheruser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+# A reading every 10 minutes for 12 hours; pH rises by 0.06 per hour.
+@pytest.fixture
+def measurements1(hydroponic_system1):
+    start = datetime(2024, 2, 15, 0, 0, tzinfo=timezone.utc)
+    return save_measurements([
+        Measurement(
+            system=hydroponic_system1,
+            ph=6.0 + 0.01 * i,
+            temperature=20.0 + i % 5,
+            tds=800 + i % 7 * 10,
+            timestamp=start + timedelta(minutes=10 * i),
+        )
+        for i in range(72)
+    ])
+
+def statistics(api_client, system, **params):
+    return api_client.get(reverse("measurement-statistics", args=[system.id]), params)
+
+
+@pytest.mark.django_db
+def test_rolling_statistics(api_client, user1, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    response = statistics(api_client, hydroponic_system1, step="1h", window="1h", percentiles="50,90")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert (response.data["method"], response.data["count"], response.data["window"]) == ("numpy", 72, "1h")
+    ph = response.data["summary"]["ph"]
+    assert (ph["min"], ph["max"]) == (6.0, pytest.approx(6.71))
+    assert ph["percentiles"]["50"] == pytest.approx(6.355)
+    assert list(ph["percentiles"]) == ["50", "90"]
+
+    series = response.data["series"]
+    assert len(series) == 12
+    assert series[0]["timestamp"] == datetime(2024, 2, 15, 1, 0, tzinfo=timezone.utc)
+    assert series[0]["count"] == 6
+    assert series[0]["ph"]["mean"] == pytest.approx(6.025)
+    assert series[0]["ph"]["rate"] is None
+    assert series[1]["ph"]["rate"] == pytest.approx(0.06)
+    assert series[1]["temperature"]["std"] == pytest.approx(1.3437, abs=1e-4)
+    assert series[0]["ph"]["percentiles"] == pytest.approx({"50": 6.025, "90": 6.045})
+    assert series[1]["ph"]["percentiles"] == pytest.approx({"50": 6.085, "90": 6.105})
+
+@pytest.mark.django_db
+def test_sql_fallback_matches_numpy(settings, monkeypatch, api_client, user1, hydroponic_system1, measurements1):
+    monkeypatch.setattr(rolling_statistics, "PERCENTILE_BLOCK_CELLS", 100)
+    api_client.force_authenticate(user=user1)
+    params = {"step": "1h", "window": "6h", "percentiles": "5,50,95", "ph_min": "6.1"}
+    in_memory = statistics(api_client, hydroponic_system1, **params).data
+
+    settings.MEASUREMENT_CONFIG = {**settings.MEASUREMENT_CONFIG, 'STATISTICS_MAX_ROWS': 10}
+    response_cache().clear()
+    in_database = statistics(api_client, hydroponic_system1, **params).data
+
+    assert (in_memory["method"], in_database["method"]) == ("numpy", "sql")
+    assert in_database["count"] == in_memory["count"] == 62
+    for metric in ("ph", "temperature", "tds"):
+        for name in ("mean", "std", "min", "max"):
+            assert in_database["summary"][metric][name] == pytest.approx(in_memory["summary"][metric][name])
+        assert in_database["summary"][metric]["percentiles"] == pytest.approx(in_memory["summary"][metric]["percentiles"])
+    assert [point["timestamp"] for point in in_database["series"]] == [point["timestamp"] for point in in_memory["series"]]
+    for sql_point, numpy_point in zip(in_database["series"], in_memory["series"]):
+        assert sql_point["count"] == numpy_point["count"]
+        for metric in ("ph", "temperature", "tds"):
+            for name in ("mean", "std", "rate"):
+                assert sql_point[metric][name] == pytest.approx(numpy_point[metric][name], nan_ok=True)
+            assert sql_point[metric]["percentiles"] == pytest.approx(numpy_point[metric]["percentiles"])
+
+@pytest.mark.django_db
+def test_statistics_are_cached_until_new_measurements(api_client, user1, hydroponic_system1, measurements1, django_capture_on_commit_callbacks):
+    api_client.force_authenticate(user=user1)
+
+    assert statistics(api_client, hydroponic_system1)["X-Cache"] == "MISS"
+    assert statistics(api_client, hydroponic_system1)["X-Cache"] == "HIT"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post(reverse("measurement", args=[hydroponic_system1.id]), {"ph": 6.5, "temperature": 22.5, "tds": 900}, format="json")
+    response = statistics(api_client, hydroponic_system1)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["count"] == 73
+
+@pytest.mark.django_db
+def test_statistics_validation_and_empty_ranges(api_client, user1, user2, hydroponic_system1, measurements1):
+    api_client.force_authenticate(user=user1)
+    assert statistics(api_client, hydroponic_system1, window="2h").status_code == status.HTTP_400_BAD_REQUEST
+    assert statistics(api_client, hydroponic_system1, percentiles="50,150").status_code == status.HTTP_400_BAD_REQUEST
+
+    empty = statistics(api_client, hydroponic_system1, timestamp_after="2025-01-01").data
+    assert (empty["count"], empty["series"], empty["summary"]["ph"]["mean"]) == (0, [], None)
+
+    api_client.force_authenticate(user=user2)
+    assert statistics(api_client, hydroponic_system1).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,122 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'HydroponicSystem.settings'
+import django
+django.setup()
+
+import json
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from datetime import datetime, timezone
+from ..models import HydroponicSystem, Measurement, User
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user1():
+    user = User.objects.create(email="newuser@example.com")
+    user.set_password("securepassword")
+    user.save()
+    return user
+
+@pytest.fixture
+def user2():
+    user = User.objects.create(email="seconduser@example.com")
+    user.set_password("securepassword2")
+    user.save()
+    return user
+
+@pytest.fixture
+def hydroponic_system1(user1):
+    return HydroponicSystem.objects.create(owner=user1, name="Test System 1", location="Greenhouse 1")
+
+
+@pytest.mark.django_db
+def test_upload_ndjson(api_client, user1, hydroponic_system1, settings):
+    settings.MEASUREMENT_CONFIG = {"UPLOAD_CHUNK_SIZE": 2}
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    rows = [
+        {"timestamp": f"2024-02-15T10:0{i}:00Z", "ph": 6.5, "temperature": 22.0, "tds": 800}
+        for i in range(5)
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n"
+    response = api_client.generic("POST", url, body, content_type="application/x-ndjson")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data == {"inserted": 5, "rejected": 0, "duplicates": 0, "errors": []}
+    first = Measurement.objects.filter(system=hydroponic_system1).order_by("timestamp").first()
+    assert first.timestamp == datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+
+@pytest.mark.django_db
+def test_upload_csv_reports_rejected_lines(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    body = (
+        "timestamp,ph,temperature,tds\n"
+        "2024-02-15T10:00:00Z,6.5,22.0,800\n"
+        "2024-02-15T10:01:00Z,30,22.0,800\n"
+        "2024-02-15T10:02:00Z,6.4,22.1,-5\n"
+        "2024-02-15T10:03:00Z,6.6,21.9,810\n"
+    )
+    response = api_client.generic("POST", url, body, content_type="text/csv")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["inserted"] == 2
+    assert response.data["rejected"] == 2
+    assert [e["line"] for e in response.data["errors"]] == [3, 4]
+    assert "ph" in response.data["errors"][0]["errors"]
+
+@pytest.mark.django_db
+def test_upload_invalid_json_line(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    body = '{"timestamp": "2024-02-15T10:00:00Z", "ph": 6.5, "temperature": 22.0, "tds": 800}\nnot json\n'
+    response = api_client.generic("POST", url, body, content_type="application/x-ndjson")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["errors"] == [{"line": 2, "errors": {"detail": "Invalid JSON."}}]
+
+@pytest.mark.django_db
+def test_upload_csv_with_byte_order_mark(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    body = (
+        "\ufefftimestamp,ph,temperature,tds\n"
+        "2024-02-15T10:00:00Z,6.5,22.0,800\n"
+    ).encode("utf-8")
+    response = api_client.generic("POST", url, body, content_type="text/csv")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Measurement.objects.get(system=hydroponic_system1).timestamp == datetime(2024, 2, 15, 10, 0, tzinfo=timezone.utc)
+
+@pytest.mark.django_db
+def test_upload_rejects_rows_without_timestamp(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    body = '{"ph": 6.5, "temperature": 22.0, "tds": 800}\n'
+    response = api_client.generic("POST", url, body, content_type="application/x-ndjson")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "timestamp" in response.data["errors"][0]["errors"]
+    assert not Measurement.objects.exists()
+
+@pytest.mark.django_db
+def test_upload_unsupported_media_type(api_client, user1, hydroponic_system1):
+    api_client.force_authenticate(user=user1)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    response = api_client.generic("POST", url, "ph;6.5", content_type="text/plain")
+
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+@pytest.mark.django_db
+def test_upload_permission_denied(api_client, user2, hydroponic_system1):
+    api_client.force_authenticate(user=user2)
+    url = reverse("measurement-upload", args=[hydroponic_system1.id])
+    response = api_client.generic("POST", url, "", content_type="text/csv")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not Measurement.objects.exists()
@@ -1,7 +1,21 @@
 from django.urls import path
 
-from .measurement_view import MeasurementAPIView
+from .measurement_view import FleetExportAPIView, MeasurementAPIView, MeasurementExportAPIView, MeasurementUploadAPIView
+from .aggregate_view import MeasurementAggregateAPIView
+from .statistics_view import MeasurementStatisticsAPIView
+from .ingest_view import FleetIngestAPIView
+from .device_key_view import DeviceKeyAPIView, DeviceKeyRevokeAPIView
+from .response_cache_view import ResponseCacheStatsAPIView
 
 urlpatterns = [
     path('systems/<int:system_id>/measurements/', MeasurementAPIView.as_view(), name="measurement"),
+    path('systems/<int:system_id>/measurements/upload/', MeasurementUploadAPIView.as_view(), name="measurement-upload"),
+    path('systems/<int:system_id>/measurements/export/', MeasurementExportAPIView.as_view(), name="measurement-export"),
+    path('systems/<int:system_id>/measurements/aggregate/', MeasurementAggregateAPIView.as_view(), name="measurement-aggregate"),
+    path('systems/<int:system_id>/measurements/statistics/', MeasurementStatisticsAPIView.as_view(), name="measurement-statistics"),
+    path('measurements/ingest/', FleetIngestAPIView.as_view(), name="measurement-ingest"),
+    path('measurements/export/', FleetExportAPIView.as_view(), name="measurement-fleet-export"),
+    path('systems/<int:system_id>/keys/', DeviceKeyAPIView.as_view(), name="device-key"),
+    path('systems/<int:system_id>/keys/<int:key_id>/', DeviceKeyRevokeAPIView.as_view(), name="device-key-revoke"),
+    path('cache/responses/', ResponseCacheStatsAPIView.as_view(), name="response-cache-stats"),
 ]
\ No newline at end of file
@@ -85,7 +85,7 @@ const Dashboard = ({ darkMode }) => {
   const fetchSystems = async () => {
     setLoading(true);
     try {
-      const res = await api.get('/systems/');
+      const res = await api.get('/systems/overview/');
       setSystems(res.data.results || res.data);
       setError('');
     } catch (err) {
@@ -206,7 +206,7 @@ const Dashboard = ({ darkMode }) => {
 
   const fetchMeasurements = async (systemId) => {
     try {
-      const response = await fetch(`http://localhost:8000/systems/${systemId}/measurements/`, {
+      const response = await fetch(`http://localhost:8000/systems/${systemId}/measurements/aggregate/?bucket=auto&format=columnar`, {
         headers: {
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         }
@@ -219,25 +219,25 @@ const Dashboard = ({ darkMode }) => {
     }
   };
 
-  const updateChartData = (measurements) => {
+  const updateChartData = (buckets) => {
     const chartData = {
-      labels: measurements.map(m => new Date(m.timestamp).toLocaleTimeString()),
+      labels: buckets.timestamps.map(t => new Date(t).toLocaleString()),
       datasets: [
         {
           label: 'pH',
-          data: measurements.map(m => m.ph),
+          data: buckets.ph.avg,
           borderColor: darkMode ? 'rgba(255, 99, 132, 1)' : 'rgba(75, 192, 192, 1)',
           tension: 0.4
         },
         {
           label: 'Temperatura (°C)',
-          data: measurements.map(m => m.temperature),
+          data: buckets.temperature.avg,
           borderColor: darkMode ? 'rgba(54, 162, 235, 1)' : 'rgba(255, 159, 64, 1)',
           tension: 0.4
         },
         {
           label: 'TDS (ppm)',
-          data: measurements.map(m => m.tds),
+          data: buckets.tds.avg,
           borderColor: darkMode ? 'rgba(75, 192, 192, 1)' : 'rgba(153, 102, 255, 1)',
           tension: 0.4
         }
@@ -554,7 +554,12 @@ const handleUpdate = async (e) => {
               <p className="mb-1"><strong>ID:</strong> {hoveredSystem.id}</p>
               <p className="mb-1"><strong>Nazwa:</strong> {hoveredSystem.name}</p>
               <p className="mb-1"><strong>Lokalizacja:</strong> {hoveredSystem.location}</p>
-              <p className="mb-0"><strong>Utworzono:</strong> {new Date(hoveredSystem.created_at).toLocaleDateString()}</p>
+              <p className={hoveredSystem.latest_measurement ? 'mb-1' : 'mb-0'}><strong>Utworzono:</strong> {new Date(hoveredSystem.created_at).toLocaleDateString()}</p>
+              {hoveredSystem.latest_measurement && (
+                <p className="mb-0">
+                  <strong>Ostatni pomiar:</strong> pH {hoveredSystem.latest_measurement.ph}, {hoveredSystem.latest_measurement.temperature}°C, {hoveredSystem.latest_measurement.tds} ppm
+                </p>
+              )}
             </div>
           </div>
         )}